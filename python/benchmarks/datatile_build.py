@@ -0,0 +1,81 @@
+"""
+Benchmark the bincount/scatter-add datatile builder: a single vectorized
+reduction of the flat bin ids of a cudf dataframe, and the same reduction
+run per partition of a dask_cudf dataframe and merged with a tree
+reduction.
+
+usage:
+    python benchmarks/datatile_build.py --rows 10000000 --bins 1000
+"""
+import argparse
+import time
+
+import cudf
+import cupy as cp
+import dask_cudf
+
+from cuxfilter.assets.numba_kernels import gpu_datatile
+from cuxfilter.charts.core.core_chart import BaseChart
+
+
+def make_chart(x, y, min_value, max_value, stride):
+    chart = BaseChart()
+    chart.x, chart.y = x, y
+    chart.min_value, chart.max_value = min_value, max_value
+    chart.stride = stride
+    return chart
+
+
+def timeit(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        cp.cuda.Device().synchronize()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows, bins, partitions, repeat):
+    df = cudf.DataFrame(
+        {
+            "active": cp.random.randint(0, bins, rows).astype("float64"),
+            "passive": cp.random.randint(0, bins, rows).astype("float64"),
+            "measure": cp.random.random(rows),
+        }
+    )
+    ddf = dask_cudf.from_cudf(df, npartitions=partitions).persist()
+    active = make_chart("active", None, 0, bins - 1, 1)
+    passive = make_chart("passive", "measure", 0, bins - 1, 1)
+
+    print(
+        f"rows={rows:,} bins={bins:,} partitions={partitions}"
+        f" (best of {repeat})"
+    )
+    for aggregate_fn in ["count", "sum", "mean", "min", "max"]:
+        scatter_time = timeit(
+            lambda: gpu_datatile._calc_data_tile_scatter(
+                df, active, passive, aggregate_fn, cumsum=True
+            ),
+            repeat,
+        )
+        partitions_time = timeit(
+            lambda: gpu_datatile._calc_data_tile_partitions(
+                ddf, active, passive, aggregate_fn, cumsum=True
+            ),
+            repeat,
+        )
+        print(
+            f"{aggregate_fn:>6}: cudf {scatter_time:8.4f}s"
+            f"  dask_cudf {partitions_time:8.4f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--bins", type=int, default=1_000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.bins, args.partitions, args.repeat)
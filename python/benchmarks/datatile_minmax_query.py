@@ -0,0 +1,58 @@
+"""
+Benchmark min/max datatile range queries: slice reduction of a
+DenseDataTile against the sparse table of a RangeMinMaxDataTile, for a
+range slider dragged over 1k, 10k and 50k active bins.
+
+usage:
+    python benchmarks/datatile_minmax_query.py --rows 50 --queries 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from cuxfilter.assets.datatiles import DenseDataTile, RangeMinMaxDataTile
+
+
+def timeit(func, queries):
+    start = time.perf_counter()
+    for index_min, index_max in queries:
+        func(index_min, index_max)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(rows, n_queries, active_bins):
+    rng = np.random.default_rng(0)
+    print(f"passive rows={rows:,}, {n_queries:,} random range queries")
+    for n_bins in active_bins:
+        tile = rng.random((rows, n_bins))
+        tile[rng.random((rows, n_bins)) < 0.5] = np.nan
+        queries = np.sort(rng.integers(0, n_bins, (n_queries, 2)), axis=1)
+
+        start = time.perf_counter()
+        dense = DenseDataTile(tile, "max", cumsum=False)
+        dense_build = time.perf_counter() - start
+        start = time.perf_counter()
+        rmq = RangeMinMaxDataTile(tile, "max")
+        rmq_build = time.perf_counter() - start
+
+        dense_time = timeit(dense.query_range, queries)
+        rmq_time = timeit(rmq.query_range, queries)
+        print(
+            f"bins={n_bins:>6,}: slice {dense_time * 1e6:9.1f}us/query"
+            f"  sparse table {rmq_time * 1e6:7.1f}us/query"
+            f"  speedup {dense_time / rmq_time:7.1f}x"
+            f"  build {dense_build:.3f}s/{rmq_build:.3f}s"
+            f"  memory {dense.nbytes / 1e6:.1f}MB/{rmq.nbytes / 1e6:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument(
+        "--bins", type=int, nargs="+", default=[1_000, 10_000, 50_000]
+    )
+    args = parser.parse_args()
+    main(args.rows, args.queries, args.bins)
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+import re
+
+_BYTE_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 10 ** 3,
+    "MB": 10 ** 6,
+    "GB": 10 ** 9,
+    "TB": 10 ** 12,
+    "KIB": 2 ** 10,
+    "MIB": 2 ** 20,
+    "GIB": 2 ** 30,
+    "TIB": 2 ** 40,
+}
+
+
+def parse_bytes(value):
+    """
+    description:
+        convert a human readable memory size to bytes
+    input:
+        - value: int/float number of bytes or str, e.g. "512MB", "2GB",
+        "1.5GiB", None means no limit
+    output:
+        - int number of bytes, or None
+    """
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None else int(value)
+    match = re.match(r"^\s*([\d.]+)\s*([a-zA-Z]*)\s*$", str(value))
+    if match is None or match.group(2).upper() not in _BYTE_UNITS:
+        raise ValueError("could not parse memory size: " + str(value))
+    number, unit = match.groups()
+    return int(float(number) * _BYTE_UNITS[unit.upper()])
+
+
+def sizeof(obj):
+    """
+    description:
+        number of bytes held by a datatile like object, supports
+        ndarrays, pandas/cudf DataFrames, objects with an nbytes attribute
+        and lists/tuples/dicts of those
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, dict):
+        return sum(sizeof(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(sizeof(value) for value in obj)
+    if hasattr(obj, "memory_usage"):
+        return int(obj.memory_usage(index=True).sum())
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    return 0
+
+
+class LRUCache:
+    """
+    Least recently used cache bounded by the total number of bytes of the
+    stored values.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Parameters
+        ----------
+        max_bytes: int or str, default None
+            memory budget of the cache, e.g. 256_000_000 or "256MB".
+            None means unbounded, 0 disables the cache
+        """
+        self.max_bytes = parse_bytes(max_bytes)
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        get a cached value and mark it as most recently used
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """
+        add a value to the cache, evicting the least recently used values
+        until it fits the memory budget. Values larger than the budget
+        are not cached.
+        """
+        nbytes = sizeof(value)
+        self.pop(key)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while (
+            self.max_bytes is not None and self.current_bytes > self.max_bytes
+        ):
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        """
+        remove a value from the cache
+        """
+        if key not in self._entries:
+            return default
+        value, nbytes = self._entries.pop(key)
+        self.current_bytes -= nbytes
+        return value
+
+    def clear(self):
+        """
+        remove all values from the cache, hit/miss counters are kept
+        """
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def info(self):
+        """
+        cache statistics as a dictionary
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "current_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
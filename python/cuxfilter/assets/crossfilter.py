@@ -0,0 +1,335 @@
+import numpy as np
+
+
+def _get_array_module(values):
+    """
+    cupy for cupy arrays, numpy otherwise, without requiring cupy
+    """
+    if type(values).__module__.split(".")[0] == "cupy":
+        import cupy
+
+        return cupy
+    return np
+
+
+class Dimension:
+    """
+    Sorted index of a column: the values in ascending order, nulls (NaN)
+    last, and the permutation mapping sorted positions to row ids. The
+    rows selected by the range filter of the dimension are the sorted
+    positions lo..hi - 1, all rows when the dimension is not filtered.
+    """
+
+    def __init__(self, values, datetime=False):
+        """
+        Parameters
+        ----------
+        values: numpy/cupy array of the column, datetimes as int64
+            nanoseconds and nulls as NaN
+        datetime: whether range bounds are datetimes
+        """
+        xp = _get_array_module(values)
+        self.permutation = xp.argsort(values)
+        self.values = values[self.permutation]
+        self.datetime = datetime
+        self.n_rows = len(values)
+        self.lo, self.hi = 0, self.n_rows
+
+    @property
+    def nbytes(self):
+        return self.permutation.nbytes + self.values.nbytes
+
+    def _to_value(self, value):
+        if self.datetime:
+            return np.datetime64(value, "ns").astype(np.int64)
+        return value
+
+    def positions(self, min_value, max_value):
+        """
+        sorted positions lo, hi of the values within [min_value, max_value]
+        """
+        xp = _get_array_module(self.values)
+        lo = int(xp.searchsorted(self.values, self._to_value(min_value)))
+        hi = int(
+            xp.searchsorted(
+                self.values, self._to_value(max_value), side="right"
+            )
+        )
+        return lo, max(lo, hi)
+
+
+def _to_numpy(values):
+    if _get_array_module(values) is np:
+        return values
+    return values.get()
+
+
+class Group:
+    """
+    Aggregate of the selected rows of a CrossFilterIndex per bin, like a
+    crossfilter.js group: the number of rows, the sum of their weights or
+    the number of their distinct values. The rows entering and leaving the
+    selection add and remove their contributions, so an update scales with
+    the size of the change instead of the number of selected rows.
+    """
+
+    def __init__(self, bin_ids, n_bins, weights=None, codes=None, n_codes=0):
+        """
+        Parameters
+        ----------
+        bin_ids: numpy/cupy int array, bin of every row, rows with a bin
+            id of n_bins or more are not aggregated
+        n_bins: number of bins
+        weights: numpy/cupy array, summed per bin if given
+        codes: numpy/cupy int array, code of the value of every row (-1
+            for nulls), whose distinct codes are counted per bin if given
+        n_codes: number of distinct codes
+        """
+        xp = _get_array_module(bin_ids)
+        self.xp = xp
+        self.bin_ids = bin_ids
+        self.n_bins = n_bins
+        self.weights = weights
+        self.codes = codes
+        self.n_codes = n_codes
+        self.values = xp.zeros(n_bins, dtype=np.float64)
+        # number of selected rows of every (bin, code) pair
+        self.pair_counts = None
+        if codes is not None:
+            self.pair_counts = xp.zeros(n_bins * n_codes, dtype=np.int32)
+
+    @property
+    def nbytes(self):
+        if self.pair_counts is None:
+            return self.values.nbytes
+        return self.values.nbytes + self.pair_counts.nbytes
+
+    def update(self, added, removed):
+        """
+        add the contributions of the rows added to the selection, and
+        remove the ones of the rows removed
+        """
+        self._add(removed, -1)
+        self._add(added, 1)
+
+    def _add(self, rows, sign):
+        if len(rows) == 0:
+            return
+        xp = self.xp
+        bins = self.bin_ids[rows].astype(np.int64)
+        valid = bins < self.n_bins
+        if self.codes is None:
+            weights = None
+            if self.weights is not None:
+                weights = self.weights[rows][valid]
+            self.values += sign * xp.bincount(
+                bins[valid], weights=weights, minlength=self.n_bins
+            )
+            return
+        codes = self.codes[rows]
+        valid &= codes >= 0
+        pairs, counts = xp.unique(
+            bins[valid] * self.n_codes + codes[valid], return_counts=True
+        )
+        before = self.pair_counts[pairs]
+        after = before + sign * counts.astype(np.int32)
+        self.pair_counts[pairs] = after
+        # pairs whose first row was added, or last row removed
+        self.values += xp.bincount(
+            pairs // self.n_codes,
+            weights=(after > 0).astype(np.float64) - (before > 0),
+            minlength=self.n_bins,
+        )
+
+    def get_values(self, rows=None):
+        """
+        aggregate of every bin as a numpy array, of the bins rows in order
+        if given
+        """
+        values = self.values
+        if rows is not None:
+            values = values[self.xp.asarray(rows, dtype=np.int64)]
+        return _to_numpy(values)
+
+
+class CrossFilterIndex:
+    """
+    Crossfilter style index of the range filters of a dataframe. Every
+    filtered column is a sorted Dimension, and every row keeps the number
+    of dimensions excluding it, a row is selected when that count is 0.
+
+    Moving the range of a dimension from [a, b] to [a', b'] only visits the
+    rows of the symmetric difference of the two ranges, found by binary
+    search in the sorted values, so the cost of an update scales with the
+    size of the change instead of the number of rows. The selection mask
+    and the number of selected rows are updated with the rows added and
+    removed, and so are the groups aggregating the selected rows.
+
+    The filters that are not indexed apply as a single boolean mask, see
+    filter_mask.
+    """
+
+    def __init__(self, n_rows):
+        """
+        Parameters
+        ----------
+        n_rows: number of rows of the dataframe
+        """
+        self.n_rows = n_rows
+        self.dimensions = {}
+        self.xp = np
+        # number of dimensions excluding each row, at most 255 dimensions,
+        # allocated with the array module of the first dimension
+        self.counts = None
+        self.selected = None
+        self.n_selected = n_rows
+        self.groups = {}
+        # mask of the filters that are not indexed, and its key
+        self.mask = None
+        self.mask_key = None
+
+    def __contains__(self, name):
+        return name in self.dimensions
+
+    @property
+    def nbytes(self):
+        if self.counts is None:
+            return 0
+        return (
+            self.counts.nbytes
+            + self.selected.nbytes
+            + (0 if self.mask is None else self.mask.nbytes)
+            + sum(dim.nbytes for dim in self.dimensions.values())
+            + sum(group.nbytes for group in self.groups.values())
+        )
+
+    def _allocate(self, values):
+        if self.counts is None:
+            self.xp = _get_array_module(values)
+            self.counts = self.xp.zeros(self.n_rows, dtype=np.uint8)
+            self.selected = self.xp.ones(self.n_rows, dtype=bool)
+
+    def add_dimension(self, name, values, datetime=False):
+        """
+        index a column under name, unfiltered
+        """
+        if len(values) != self.n_rows:
+            raise ValueError(
+                f"dimension {name} has {len(values)} values, "
+                f"expected {self.n_rows}"
+            )
+        self._allocate(values)
+        self.remove_dimension(name)
+        self.dimensions[name] = Dimension(values, datetime=datetime)
+
+    def remove_dimension(self, name):
+        """
+        clear the filter of a dimension and drop its index
+        """
+        if name in self.dimensions:
+            self.filter_all(name)
+            del self.dimensions[name]
+
+    def add_group(self, name, bin_ids, n_bins, **kwargs):
+        """
+        aggregate the selected rows per bin under name, see Group for the
+        arguments
+        """
+        self._allocate(bin_ids)
+        group = Group(bin_ids, n_bins, **kwargs)
+        group.update(self.xp.nonzero(self.selected)[0], self._empty())
+        self.groups[name] = group
+        return group
+
+    def remove_group(self, name):
+        self.groups.pop(name, None)
+
+    def filter_mask(self, mask, key=None):
+        """
+        filter the rows by mask, the boolean mask of the filters that are
+        not indexed, None selects all rows. Only the rows whose mask value
+        changes are visited
+
+        Parameters
+        ----------
+        mask: numpy/cupy bool array or None
+        key: key of the filters of mask, kept as mask_key
+
+        Returns
+        -------
+        added, removed: row ids that entered and left the selection
+        """
+        self.mask_key = key
+        if mask is None and self.mask is None:
+            return self._empty(), self._empty()
+        self._allocate(self.selected if mask is None else mask)
+        xp = self.xp
+        if mask is None:
+            excluded, included = self._empty(), xp.nonzero(~self.mask)[0]
+        elif self.mask is None:
+            excluded, included = xp.nonzero(~mask)[0], self._empty()
+        else:
+            changed = mask != self.mask
+            excluded = xp.nonzero(changed & self.mask)[0]
+            included = xp.nonzero(changed & mask)[0]
+        self.mask = mask
+        return self._update(excluded, included)
+
+    def filter_range(self, name, min_value, max_value):
+        """
+        filter dimension name to the values within [min_value, max_value],
+        nulls are excluded
+
+        Returns
+        -------
+        added, removed: row ids that entered and left the selection
+        """
+        dimension = self.dimensions[name]
+        lo, hi = dimension.positions(min_value, max_value)
+        return self._move(dimension, lo, hi)
+
+    def filter_all(self, name):
+        """
+        clear the filter of dimension name, see filter_range
+        """
+        dimension = self.dimensions[name]
+        return self._move(dimension, 0, dimension.n_rows)
+
+    def _move(self, dimension, lo, hi):
+        xp, permutation = self.xp, dimension.permutation
+        old_lo, old_hi = dimension.lo, dimension.hi
+        # old range minus new range, and new range minus old range
+        excluded = xp.concatenate(
+            [
+                permutation[old_lo : min(old_hi, lo)],
+                permutation[max(old_lo, hi) : old_hi],
+            ]
+        )
+        included = xp.concatenate(
+            [
+                permutation[lo : min(hi, old_lo)],
+                permutation[max(lo, old_hi) : hi],
+            ]
+        )
+        dimension.lo, dimension.hi = lo, hi
+        return self._update(excluded, included)
+
+    def _empty(self):
+        return self.xp.zeros(0, dtype=np.int64)
+
+    def _update(self, excluded, included):
+        """
+        count the rows newly excluded and included by a filter, and update
+        the selection and the groups with the rows whose selection changes
+        """
+        self.counts[excluded] += 1
+        removed = excluded[self.counts[excluded] == 1]
+        self.counts[included] -= 1
+        added = included[self.counts[included] == 0]
+
+        self.selected[removed] = False
+        self.selected[added] = True
+        self.n_selected += len(added) - len(removed)
+        for group in self.groups.values():
+            group.update(added, removed)
+        return added, removed
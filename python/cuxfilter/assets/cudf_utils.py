@@ -1,9 +1,223 @@
-import dask_cudf
+from collections import deque
+import threading
+import weakref
+
+import dask
+import dask.dataframe as dd
+import numpy as np
+
+# number of row subsets of the source dataframe a BinIdCache keeps track
+# of, e.g. the frames of the last filter states of a dashboard
+BIN_ID_CACHE_ROWS = 4
 
 
 def get_min_max(df, col_name):
     min, max = df[col_name].min(), df[col_name].max()
-    if isinstance(df, dask_cudf.core.DataFrame):
-        return (min.compute(), max.compute())
+    if isinstance(df, dd.DataFrame):
+        return dask.compute(min, max)
 
     return (min, max)
+
+
+def get_bin_dtype(n_bins):
+    """
+    description:
+        narrowest integer dtype holding the bin ids 0..n_bins - 1 and the
+        n_bins marker of null or out of range values
+    """
+    if n_bins < np.iinfo(np.uint8).max:
+        return np.uint8
+    if n_bins < np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.int32
+
+
+def get_n_bins(min_value, max_value, stride):
+    """
+    description:
+        number of datatile bins of a chart binning
+    """
+    return int(round((max_value - min_value) / stride)) + 1
+
+
+def get_bin_ids(df, col, min_value, max_value, stride):
+    """
+    description:
+        compute the datatile bin index of every row of df[col]
+    input:
+        - df -> cudf/pandas dataframe, not modified
+        - col, min_value, max_value, stride: column and binning of a chart
+    output:
+        - (bin_ids, n_bins): numpy/cupy array in the narrowest integer
+        dtype (see get_bin_dtype), with n_bins for null or out of range
+        values, and the number of bins
+    """
+    n_bins = get_n_bins(min_value, max_value, stride)
+    bin_ids = ((df[col] - min_value) / stride).round()
+    # comparisons with null values are False
+    valid = (bin_ids >= 0) & (bin_ids < n_bins)
+    return (
+        bin_ids.where(valid, n_bins).astype(get_bin_dtype(n_bins)).values,
+        n_bins,
+    )
+
+
+class BinIdCache:
+    """
+    Bin ids of the rows of a dataframe, the dataframe of a dashboard, per
+    chart binning, see get_bin_ids. The bin ids of a frame of rows of the
+    dataframe registered with add_rows, e.g. the rows selected by the
+    filters of the dashboard, are gathered from the cached bin ids instead
+    of binning its rows again.
+    """
+
+    def __init__(self, source, max_rows=BIN_ID_CACHE_ROWS):
+        """
+        Parameters
+        ----------
+        source: cudf.DataFrame, the dataframe of the dashboard
+        max_rows: number of registered frames kept, the oldest are
+            dropped first
+        """
+        self.source = source
+        self._bin_ids = dict()
+        self._rows = deque(maxlen=max_rows)
+        self._lock = threading.Lock()
+
+    def add_rows(self, source, df, row_ids):
+        """
+        description:
+            register df as the rows row_ids of source, source.iloc[row_ids],
+            ignored if source is not the source of the cache. df is not
+            kept alive by the cache
+        input:
+            - source: cudf.DataFrame df was gathered from
+            - df: cudf.DataFrame
+            - row_ids: numpy/cupy array of positions, see get_row_ids
+        """
+        if source is not self.source:
+            return
+        with self._lock:
+            self._rows.append((weakref.ref(df), row_ids))
+
+    def get_row_ids(self, df):
+        """
+        positions of the rows of df in the source, None if df is not a
+        registered frame
+        """
+        with self._lock:
+            for ref, row_ids in self._rows:
+                if ref() is df:
+                    return row_ids
+        return None
+
+    def get(self, df, col, min_value, max_value, stride):
+        """
+        description:
+            (bin_ids, n_bins) of the rows of df, see get_bin_ids. Computed
+            once per binning for the source, gathered with the row ids of
+            a registered frame, and computed from df otherwise
+        input:
+            - df: cudf dataframe
+            - col, min_value, max_value, stride: column and binning of a
+            chart
+        output:
+            - (bin_ids, n_bins)
+        """
+        row_ids = None
+        if df is not self.source:
+            row_ids = self.get_row_ids(df)
+            if row_ids is None:
+                return get_bin_ids(df, col, min_value, max_value, stride)
+        binning = (col, min_value, max_value, stride)
+        bin_ids = self._bin_ids.get(binning)
+        if bin_ids is None:
+            bin_ids = get_bin_ids(self.source, *binning)
+            self._bin_ids[binning] = bin_ids
+        if row_ids is None:
+            return bin_ids
+        return bin_ids[0][row_ids], bin_ids[1]
+
+
+def get_range_mask(series, min_value, max_value):
+    """
+    description:
+        boolean mask of the values of series within [min_value, max_value],
+        null values excluded, like a "@min <= x <= @max" query clause
+    input:
+        - series: cudf/dask_cudf Series
+    output:
+        - boolean Series
+    """
+    return (series >= min_value) & (series <= max_value)
+
+
+def get_dimension_values(series):
+    """
+    description:
+        values of a numeric or datetime column as a crossfilter dimension
+        (see assets/crossfilter.py), datetimes as int64 nanoseconds and
+        nulls as NaN
+    input:
+        - series: cudf/pandas Series
+    output:
+        - numpy/cupy array, None for other dtypes
+    """
+    kind = series.dtype.kind
+    if kind not in "biufM":
+        return None
+    if kind == "M":
+        series = series.astype("datetime64[ns]")
+    if kind in "bM":
+        series = series.astype("int64")
+    if series.isna().any():
+        series = series.astype("float64").fillna(np.nan)
+    return series.values
+
+
+def get_codes(series):
+    """
+    description:
+        codes of the distinct values of series, for distinct counts
+    input:
+        - series: cudf/pandas Series
+    output:
+        - (codes, n_codes): numpy/cupy int array with -1 for null values,
+        and the number of distinct values
+    """
+    codes, uniques = series.factorize()
+    return getattr(codes, "values", codes), len(uniques)
+
+
+def get_point_values(series):
+    """
+    description:
+        values of a numeric column as a float64 numpy array in host memory,
+        nulls as NaN, the coordinates of a CPU spatial index (see
+        assets/spatial.py)
+    input:
+        - series: cudf/pandas Series
+    output:
+        - float64 numpy array
+    """
+    values = series.astype("float64").fillna(np.nan).values
+    if not isinstance(values, np.ndarray):
+        # cupy array
+        values = values.get()
+    return values
+
+
+def get_row_ids(mask):
+    """
+    description:
+        positions of the selected rows of a boolean mask, a compact
+        replacement of the selected frame, see DataFrame.iloc
+    input:
+        - mask: cudf/pandas boolean Series, null values are not selected
+    output:
+        - numpy/cupy int32 array, int64 beyond 2**31 rows
+    """
+    row_ids = mask.fillna(False).values.nonzero()[0]
+    if len(mask) <= np.iinfo(np.int32).max:
+        return row_ids.astype(np.int32)
+    return row_ids
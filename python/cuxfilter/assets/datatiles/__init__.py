@@ -0,0 +1,9 @@
+from .base import BaseDataTile, to_datatile_index
+from .dense import DenseDataTile
+from .hll import HLLDataTile, estimate_distinct, hll_nbytes
+from .manager import DataTileManager
+from .pyramid import DataTilePyramid, set_query_budget
+from .quantile import QuantileDataTile, get_quantile, get_sketch_edges
+from .range_minmax import RangeMinMaxDataTile
+from .sparse import SparseDataTile, coo_to_dense
+from .store import DataTileStore, dataset_fingerprint
@@ -0,0 +1,83 @@
+import numpy as np
+
+CUMULATIVE_AGGREGATES = ["count", "sum", "mean"]
+
+
+def to_datatile_index(active_chart, values):
+    """
+    description:
+        convert values of the active chart x-axis to column indices of a
+        datatile
+    input:
+        - active_chart: chart with min_value and stride
+        - values: scalar or list of values
+    output:
+        - int or int ndarray of datatile column indices
+    """
+    if np.isscalar(values):
+        return int(
+            round((values - active_chart.min_value) / active_chart.stride)
+        )
+    if len(values) == 0:
+        return np.array([], dtype=np.int64)
+    return np.round(
+        (np.asarray(values) - active_chart.min_value) / active_chart.stride
+    ).astype(np.int64)
+
+
+class BaseDataTile:
+    """
+    Base class of the in memory datatile representations. A datatile holds
+    the aggregate of a passive chart for every (passive bin, active bin)
+    pair, queries aggregate over a set of active bins and return one value
+    per passive chart x-axis entry.
+    """
+
+    aggregate_fn: str = "count"
+    cumsum: bool = True
+    n_bins: int = 0
+    n_rows: int = 0
+
+    @property
+    def nbytes(self):
+        return 0
+
+    def query_range(self, index_min, index_max):
+        """
+        aggregate of the active bins index_min..index_max (inclusive)
+        """
+        raise NotImplementedError
+
+    def query_indices(self, indices):
+        """
+        aggregate of the listed active bins
+        """
+        raise NotImplementedError
+
+    def query_all(self):
+        """
+        aggregate of all active bins
+        """
+        return self.query_range(0, self.n_bins - 1)
+
+    def coarsen(self):
+        """
+        datatile at half the active bin resolution, active bin i of the
+        result merges the active bins 2 * i and 2 * i + 1
+        """
+        raise NotImplementedError
+
+    def to_numpy(self):
+        """
+        datatile as a (n_rows, n_bins) ndarray, cumulated along the active
+        bins if cumsum is True. Mean datatiles return [sum, count]
+        """
+        raise NotImplementedError
+
+    def _clip_range(self, index_min, index_max):
+        return max(int(index_min), 0), min(int(index_max), self.n_bins - 1)
+
+    def _empty_result(self):
+        if self.aggregate_fn in ["count", "sum"]:
+            return np.zeros(self.n_rows, dtype=np.float64)
+        return np.full(self.n_rows, np.nan)
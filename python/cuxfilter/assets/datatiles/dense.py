@@ -0,0 +1,175 @@
+import copy
+
+import numpy as np
+
+from .base import BaseDataTile
+
+
+def _count_dtype(data):
+    if data.size == 0 or data.max() <= np.iinfo(np.int32).max:
+        return np.int32
+    return np.int64
+
+
+def _value_dtype(data, dtype=None, cumsum=False):
+    # a range of a cumulated datatile is the difference of two prefix
+    # sums, which float32 can not hold precisely far from the first bin
+    if cumsum:
+        return np.float64
+    if np.dtype(dtype if dtype is not None else data.dtype) == np.float32:
+        return np.float32
+    return np.float64
+
+
+class DenseDataTile(BaseDataTile):
+    """
+    Datatile stored as one contiguous ndarray per aggregate, transposed to
+    (n_bins, n_rows) so that every active bin is a contiguous block of
+    memory. The rows of the datatile are gathered in the order of the
+    passive chart x-axis once, when the datatile is built, so queries only
+    slice or take active bins.
+
+    Cumulated datatiles are prefixed with a row of zeros, the aggregate of
+    the active bins a..b is data[b + 1] - data[a]. Counts are stored as
+    int32 (int64 if they do not fit), sums and min/max values as float64
+    (float32 if the aggregated column is float32 and the datatile is not
+    cumulated). Mean datatiles hold a sum and a count array.
+    """
+
+    def __init__(
+        self, data, aggregate_fn="count", cumsum=True, rows=None, dtype=None
+    ):
+        """
+        Parameters
+        ----------
+        data: ndarray of shape (n_rows, n_bins), 1-d for a datatile with a
+            single row, [sum, count] ndarrays for aggregate_fn="mean"
+        aggregate_fn: count/sum/mean/min/max
+        cumsum: whether data is cumulated along the active bins
+        rows: datatile row of each passive chart x-axis entry, all rows in
+            order if None
+        dtype: dtype of the aggregated column
+        """
+        if cumsum and aggregate_fn in ["min", "max"]:
+            raise ValueError(
+                "min/max datatiles can not be cumulated, set cumsum=False"
+            )
+        self.aggregate_fn = aggregate_fn
+        self.cumsum = cumsum
+        self.counts = None
+        if aggregate_fn == "mean":
+            data, counts = data
+            self.counts = self._compact(counts, rows, counts=True)
+        self.data = self._compact(
+            data, rows, counts=aggregate_fn == "count", dtype=dtype
+        )
+        self.n_bins = self.data.shape[0] - int(cumsum)
+        self.n_rows = self.data.shape[1]
+
+    def _compact(self, data, rows, counts=False, dtype=None):
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data[np.newaxis, :]
+        if rows is not None:
+            data = data[np.asarray(rows, dtype=np.int64)]
+        data = data.T
+        if self.cumsum:
+            data = np.concatenate(
+                [np.zeros((1, data.shape[1]), dtype=data.dtype), data]
+            )
+        if counts:
+            target_dtype = _count_dtype(data)
+        else:
+            target_dtype = _value_dtype(data, dtype, self.cumsum)
+        return np.ascontiguousarray(data, dtype=target_dtype)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (
+            0 if self.counts is None else self.counts.nbytes
+        )
+
+    def _reduce_range(self, data, index_min, index_max):
+        if self.cumsum:
+            return data[index_max + 1].astype(np.float64) - data[index_min]
+        return self._reduce(data[index_min : index_max + 1])
+
+    def _reduce_indices(self, data, indices):
+        if self.cumsum:
+            return self._reduce(data.take(indices + 1, axis=0)) - (
+                self._reduce(data.take(indices, axis=0))
+            )
+        return self._reduce(data.take(indices, axis=0))
+
+    def _reduce(self, block):
+        if self.aggregate_fn == "min":
+            return np.fmin.reduce(block, axis=0).astype(np.float64)
+        if self.aggregate_fn == "max":
+            return np.fmax.reduce(block, axis=0).astype(np.float64)
+        return block.sum(axis=0, dtype=np.float64)
+
+    def _finalize(self, result, counts):
+        if self.aggregate_fn == "mean":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return result / counts
+        return result
+
+    def query_range(self, index_min, index_max):
+        index_min, index_max = self._clip_range(index_min, index_max)
+        if index_min > index_max:
+            return self._empty_result()
+        return self._finalize(
+            self._reduce_range(self.data, index_min, index_max),
+            None
+            if self.counts is None
+            else self._reduce_range(self.counts, index_min, index_max),
+        )
+
+    def query_indices(self, indices):
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        indices = indices[(indices >= 0) & (indices < self.n_bins)]
+        if len(indices) == 0:
+            return self._empty_result()
+        return self._finalize(
+            self._reduce_indices(self.data, indices),
+            None
+            if self.counts is None
+            else self._reduce_indices(self.counts, indices),
+        )
+
+    def _coarsen(self, data):
+        if self.cumsum:
+            # prefix sums at every other active bin boundary
+            boundaries = np.arange(0, self.n_bins + 2, 2)
+            return data[np.minimum(boundaries, self.n_bins)]
+        even, odd = data[0::2], data[1::2]
+        if len(odd) < len(even):
+            fill_value = np.nan if self.aggregate_fn in ["min", "max"] else 0
+            odd = np.concatenate(
+                [odd, np.full((1,) + data.shape[1:], fill_value, data.dtype)]
+            )
+        if self.aggregate_fn == "min":
+            return np.fmin(even, odd)
+        if self.aggregate_fn == "max":
+            return np.fmax(even, odd)
+        if data.dtype.kind in "iu":
+            result = np.add(even, odd, dtype=np.int64)
+            return result.astype(_count_dtype(result))
+        return even + odd
+
+    def coarsen(self):
+        coarse = copy.copy(self)
+        coarse.data = self._coarsen(self.data)
+        if self.counts is not None:
+            coarse.counts = self._coarsen(self.counts)
+        coarse.n_bins = (self.n_bins + 1) // 2
+        return coarse
+
+    def _restore(self, data):
+        data = data[1:] if self.cumsum else data
+        return np.ascontiguousarray(data.T, dtype=np.float64)
+
+    def to_numpy(self):
+        if self.counts is not None:
+            return [self._restore(self.data), self._restore(self.counts)]
+        return self._restore(self.data)
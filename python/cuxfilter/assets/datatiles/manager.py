@@ -0,0 +1,293 @@
+from collections import OrderedDict
+
+from ..cache import parse_bytes, sizeof
+from .pyramid import DataTilePyramid
+
+
+def _downgrade(datatile):
+    """
+    description:
+        coarser copy of a datatile, or of a dict of datatiles, None if
+        nothing can be downgraded
+    """
+    if isinstance(datatile, dict):
+        downgraded = {
+            key: _downgrade(value) for key, value in datatile.items()
+        }
+        if all(value is None for value in downgraded.values()):
+            return None
+        return {
+            key: datatile[key] if value is None else value
+            for key, value in downgraded.items()
+        }
+    if isinstance(datatile, DataTilePyramid) and len(datatile.levels) > 1:
+        return datatile.downgrade()
+    return None
+
+
+def _resolution(datatile):
+    if isinstance(datatile, dict):
+        return max([_resolution(value) for value in datatile.values()] + [0])
+    return getattr(datatile, "resolution", 0)
+
+
+class DataTileManager:
+    """
+    Datatiles of the passive charts of a dashboard, by chart name, within a
+    memory budget, and the single owner of every datatile the dashboard
+    holds.
+
+    A datatile set with a key, e.g. the active view, passive chart and
+    filter state it was built for, is kept for reuse when its chart gets
+    another datatile, and returned by get_cached(key) until the cached
+    datatiles exceed cache_bytes, least recently used first.
+
+    Cached datatiles count against the memory budget and are dropped first
+    when the datatiles exceed it. Then the least recently queried
+    datatiles of the charts are downgraded to coarser pyramid levels, then
+    evicted, and are rebuilt on demand by the dashboard (see is_evicted).
+    Downgraded and evicted datatiles are not cached, so an evicted datatile
+    is not referenced anymore.
+
+    The most recently queried datatile is never evicted, so the budget can
+    be exceeded by a single datatile that does not fit at its coarsest
+    resolution.
+    """
+
+    def __init__(self, max_bytes=None, cache_bytes=None):
+        """
+        Parameters
+        ----------
+        max_bytes: int or str, default None
+            memory budget of the datatiles, e.g. 2_000_000_000 or "2GB".
+            None means unbounded
+        cache_bytes: int or str, default None
+            memory budget of the cached datatiles, e.g. "256MB". None means
+            bounded by max_bytes only, 0 disables the cache
+        """
+        self.max_bytes = parse_bytes(max_bytes)
+        self.cache_bytes = parse_bytes(cache_bytes)
+        # chart name -> (datatile, nbytes, key), ordered by last query
+        self._entries = OrderedDict()
+        # key -> chart name of the keyed datatiles of the charts
+        self._keys = dict()
+        # key -> (datatile, nbytes), cached datatiles by last use
+        self._cache = OrderedDict()
+        self._evicted = set()
+        self.current_bytes = 0
+        self.downgrades = 0
+        self.evictions = 0
+        self.rebuilds = 0
+        self.hits = 0
+        self.misses = 0
+        self.cache_evictions = 0
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __getitem__(self, name):
+        if name in self._evicted:
+            return None
+        return self._entries[name][0]
+
+    def __setitem__(self, name, datatile):
+        self.set(name, datatile)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, name, default=None):
+        if name in self._entries:
+            return self._entries[name][0]
+        return default
+
+    def values(self):
+        return [datatile for datatile, _, _ in self._entries.values()]
+
+    def set(self, name, datatile, key=None):
+        """
+        set the datatile of a chart, built for key if given. The previous
+        datatile of the chart is cached under its own key
+        """
+        if name in self._evicted:
+            self._evicted.discard(name)
+            self.rebuilds += 1
+        self._pop(name, replacement=datatile)
+        if key is not None:
+            self._drop_cached(key)
+            self._keys[key] = name
+        nbytes = sizeof(datatile)
+        self._entries[name] = (datatile, nbytes, key)
+        self.current_bytes += nbytes
+        self.enforce()
+
+    def get_cached(self, key):
+        """
+        datatile built for key, the datatile of a chart or a cached one,
+        None if there is none. A cached datatile stays cached until it is
+        set as the datatile of a chart
+        """
+        if key in self._keys:
+            self.hits += 1
+            return self._entries[self._keys[key]][0]
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key][0]
+        self.misses += 1
+        return None
+
+    def _drop_cached(self, key):
+        if key in self._cache:
+            _, nbytes = self._cache.pop(key)
+            self.current_bytes -= nbytes
+
+    def _pop(self, name, replacement=None):
+        """
+        remove the datatile of a chart, cached under its key unless it is
+        replacement, downgraded, or the cache is disabled
+        """
+        if name not in self._entries:
+            return
+        datatile, nbytes, key = self._entries.pop(name)
+        self.current_bytes -= nbytes
+        if key is None:
+            return
+        self._keys.pop(key, None)
+        if (
+            datatile is not None
+            and datatile is not replacement
+            and _resolution(datatile) == 0
+            and self.cache_bytes != 0
+        ):
+            self._cache[key] = (datatile, nbytes)
+            self.current_bytes += nbytes
+
+    def pop(self, name):
+        """
+        remove the datatile of a chart, it stays cached under its key
+        """
+        self._evicted.discard(name)
+        self._pop(name)
+        self.enforce()
+
+    def touch(self, name):
+        """
+        mark the datatile of a chart as most recently queried
+        """
+        if name in self._entries:
+            self._entries.move_to_end(name)
+
+    def is_evicted(self, name):
+        """
+        whether the datatile of a chart was evicted and must be rebuilt
+        """
+        return name in self._evicted
+
+    def clear(self):
+        """
+        remove all datatiles, cached ones included, counters are kept
+        """
+        self._entries.clear()
+        self._keys.clear()
+        self._cache.clear()
+        self._evicted.clear()
+        self.current_bytes = 0
+
+    def clear_cache(self):
+        """
+        remove the cached datatiles, and the keys of the datatiles of the
+        charts so they are not cached anymore, counters are kept
+        """
+        for key in list(self._cache):
+            self._drop_cached(key)
+        for name, (datatile, nbytes, _) in self._entries.items():
+            self._entries[name] = (datatile, nbytes, None)
+        self._keys.clear()
+
+    def _cached_bytes(self):
+        return sum(nbytes for _, nbytes in self._cache.values())
+
+    def _over_budget(self):
+        return (
+            self.max_bytes is not None and self.current_bytes > self.max_bytes
+        )
+
+    def enforce(self):
+        """
+        drop the least recently used cached datatiles until they fit the
+        cache budget, then the cached datatiles, downgrade, then evict,
+        the least recently queried datatiles until they fit the memory
+        budget
+        """
+        while self._cache and (
+            self._over_budget()
+            or (
+                self.cache_bytes is not None
+                and self._cached_bytes() > self.cache_bytes
+            )
+        ):
+            _, (_, nbytes) = self._cache.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.cache_evictions += 1
+        for name in list(self._entries):
+            while self._over_budget():
+                datatile, nbytes, key = self._entries[name]
+                downgraded = _downgrade(datatile)
+                if downgraded is None:
+                    break
+                new_bytes = sizeof(downgraded)
+                self.current_bytes += new_bytes - nbytes
+                # replacing the value keeps the position of the chart
+                self._entries[name] = (downgraded, new_bytes, key)
+                self.downgrades += 1
+        names = [
+            name for name, (_, nbytes, _) in self._entries.items() if nbytes
+        ]
+        for name in names[:-1]:
+            if not self._over_budget():
+                break
+            _, nbytes, key = self._entries.pop(name)
+            self.current_bytes -= nbytes
+            self._keys.pop(key, None)
+            self._evicted.add(name)
+            self.evictions += 1
+
+    def info(self):
+        """
+        memory usage of the datatiles as a dictionary
+        """
+        return {
+            "current_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "cached_bytes": self._cached_bytes(),
+            "downgrades": self.downgrades,
+            "evictions": self.evictions,
+            "rebuilds": self.rebuilds,
+            "charts": {
+                name: {
+                    "bytes": nbytes,
+                    "resolution": _resolution(datatile),
+                }
+                for name, (datatile, nbytes, _) in self._entries.items()
+            },
+            "evicted": sorted(self._evicted),
+        }
+
+    def cache_info(self):
+        """
+        statistics of the datatile cache as a dictionary, entries and
+        current_bytes count the keyed datatiles of the charts and the
+        cached ones
+        """
+        keyed_bytes = sum(
+            self._entries[name][1] for name in self._keys.values()
+        )
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.cache_evictions,
+            "entries": len(self._keys) + len(self._cache),
+            "current_bytes": keyed_bytes + self._cached_bytes(),
+            "max_bytes": self.cache_bytes,
+        }
@@ -0,0 +1,112 @@
+import copy
+import time
+
+import numpy as np
+
+from .base import BaseDataTile
+
+PYRAMID_MIN_BINS = 256
+
+
+def set_query_budget(datatile, budget):
+    """
+    description:
+        set the time budget of the range queries of a datatile, or of a
+        dict of datatiles, datatiles without levels are left as is
+    input:
+        - datatile: datatile or dict of datatiles
+        - budget: seconds, None queries the finest level
+    """
+    if isinstance(datatile, dict):
+        for value in datatile.values():
+            set_query_budget(value, budget)
+    elif isinstance(datatile, DataTilePyramid):
+        datatile.budget = budget
+
+
+class DataTilePyramid(BaseDataTile):
+    """
+    Datatile with coarser copies of itself at power-of-two coarsenings of
+    the active bins. Level l merges 2**l consecutive active bins and is
+    derived from level l - 1 by pairwise summation (fmin/fmax for min/max),
+    down to PYRAMID_MIN_BINS active bins.
+
+    Range queries are served from the finest level, or, when a budget in
+    seconds is set (while a range slider is dragged), from the finest level
+    whose last measured query time fits the budget, with the range
+    boundaries snapped to the active bins of that level. Index queries
+    always use the finest level.
+
+    A pyramid downgraded to a coarser resolution (see downgrade) drops its
+    finest levels to save memory, and answers every query at the
+    resolution of its finest remaining level.
+    """
+
+    budget = None
+    resolution = 0
+
+    def __init__(self, datatile, min_bins=PYRAMID_MIN_BINS):
+        """
+        Parameters
+        ----------
+        datatile: finest datatile, supporting coarsen()
+        min_bins: number of active bins below which no coarser level is
+            built
+        """
+        self.levels = [datatile]
+        while self.levels[-1].n_bins > min_bins:
+            self.levels.append(self.levels[-1].coarsen())
+        self.query_times = [None] * len(self.levels)
+        self.aggregate_fn = datatile.aggregate_fn
+        self.cumsum = datatile.cumsum
+        self.n_bins = datatile.n_bins
+        self.n_rows = datatile.n_rows
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def level_for_budget(self, budget):
+        """
+        finest level whose last query time fits budget, levels not queried
+        yet are assumed to fit
+        """
+        for level, query_time in enumerate(self.query_times):
+            if query_time is None or query_time <= budget:
+                return level
+        return len(self.levels) - 1
+
+    def downgrade(self):
+        """
+        copy of the pyramid without its finest level, the same pyramid if
+        only one level is left
+        """
+        if len(self.levels) == 1:
+            return self
+        downgraded = copy.copy(self)
+        downgraded.levels = self.levels[1:]
+        downgraded.query_times = self.query_times[1:]
+        downgraded.resolution = self.resolution + 1
+        return downgraded
+
+    def query_range(self, index_min, index_max):
+        level = 0
+        if self.budget is not None:
+            level = self.level_for_budget(self.budget)
+        shift = self.resolution + level
+        start = time.perf_counter()
+        result = self.levels[level].query_range(
+            index_min >> shift, index_max >> shift
+        )
+        self.query_times[level] = time.perf_counter() - start
+        return result
+
+    def query_indices(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        return self.levels[0].query_indices(indices >> self.resolution)
+
+    def to_numpy(self):
+        """
+        finest remaining level, see BaseDataTile.to_numpy
+        """
+        return self.levels[0].to_numpy()
@@ -0,0 +1,126 @@
+import re
+
+import numpy as np
+
+from .dense import DenseDataTile, _count_dtype
+
+# number of value buckets of the quantile sketch of every datatile cell
+QUANTILE_SKETCH_BUCKETS = 64
+
+
+def get_quantile(aggregate_fn):
+    """
+    description:
+        quantile computed by a quantile aggregate function, "median" or
+        "p<percentile>", e.g. "p95" or "p99.9"
+    input:
+        - aggregate_fn: str
+    output:
+        - float in [0, 1], None for other aggregate functions
+    """
+    if aggregate_fn == "median":
+        return 0.5
+    match = re.match(r"^p(\d+(\.\d+)?)$", str(aggregate_fn))
+    if match is None or float(match.group(1)) > 100:
+        return None
+    return float(match.group(1)) / 100
+
+
+def get_sketch_edges(min_value, max_value, n_buckets=QUANTILE_SKETCH_BUCKETS):
+    """
+    description:
+        edges of the value buckets of a quantile sketch, evenly spaced
+        between the min and max of the aggregated column
+    output:
+        - float64 ndarray of n_buckets + 1 edges
+    """
+    min_value, max_value = float(min_value), float(max_value)
+    if not (np.isfinite(min_value) and np.isfinite(max_value)):
+        min_value, max_value = 0.0, 1.0
+    return np.linspace(min_value, max_value, n_buckets + 1)
+
+
+class QuantileDataTile(DenseDataTile):
+    """
+    Datatile of quantile aggregates (median, p95, ...). Every cell holds a
+    fixed size sketch of the aggregated column: the number of rows per
+    value bucket, the buckets evenly splitting the min..max range of the
+    column. Sketches merge by addition, so like count datatiles they are
+    stored cumulated along the active bins and a range query takes two
+    rows per passive bin, whatever the number of active bins.
+
+    Quantiles are interpolated linearly within the bucket holding them,
+    the error is at most one bucket width, (max - min) / n_buckets, and
+    memory is n_buckets counts per cell.
+    """
+
+    def __init__(
+        self, data, edges, aggregate_fn="median", cumsum=True, rows=None
+    ):
+        """
+        Parameters
+        ----------
+        data: ndarray of shape (n_rows, n_bins, n_buckets), number of rows
+            per value bucket of every cell
+        edges: n_buckets + 1 edges of the value buckets
+        aggregate_fn: median or p<percentile>
+        cumsum: whether data is cumulated along the active bins
+        rows: datatile row of each passive chart x-axis entry, all rows in
+            order if None
+        """
+        self.quantile = get_quantile(aggregate_fn)
+        if self.quantile is None:
+            raise ValueError(
+                "aggregate_fn must be median or p<percentile>, got "
+                + str(aggregate_fn)
+            )
+        self.edges = np.asarray(edges, dtype=np.float64)
+        super().__init__(data, aggregate_fn, cumsum=cumsum, rows=rows)
+
+    def _compact(self, data, rows, counts=False, dtype=None):
+        data = np.asarray(data)
+        if rows is not None:
+            data = data[np.asarray(rows, dtype=np.int64)]
+        # (n_bins, n_rows, n_buckets), every active bin contiguous
+        data = np.moveaxis(data, 1, 0)
+        if self.cumsum:
+            data = np.concatenate([np.zeros_like(data[:1]), data])
+        return np.ascontiguousarray(data, dtype=_count_dtype(data))
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.edges.nbytes
+
+    def _finalize(self, result, counts):
+        """
+        quantile of each row of the merged sketches result
+        """
+        result = np.maximum(result, 0)
+        totals = result.sum(axis=1)
+        cumulative = result.cumsum(axis=1)
+        target = self.quantile * totals
+        # first bucket whose cumulative count reaches the target rank
+        bucket = np.minimum(
+            (cumulative < target[:, np.newaxis]).sum(axis=1),
+            result.shape[1] - 1,
+        )
+        rows = np.arange(len(result))
+        inside = result[rows, bucket]
+        before = cumulative[rows, bucket] - inside
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(
+                inside > 0, (target - before) / inside, 0.5
+            ).clip(0, 1)
+        values = self.edges[bucket] + fraction * (
+            self.edges[bucket + 1] - self.edges[bucket]
+        )
+        values[totals == 0] = np.nan
+        return values
+
+    def to_numpy(self):
+        """
+        sketches as a (n_rows, n_bins, n_buckets) ndarray, cumulated along
+        the active bins if cumsum is True
+        """
+        data = self.data[1:] if self.cumsum else self.data
+        return np.ascontiguousarray(np.moveaxis(data, 0, 1), np.float64)
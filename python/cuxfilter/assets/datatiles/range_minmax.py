@@ -0,0 +1,64 @@
+import numpy as np
+
+from .dense import DenseDataTile
+
+
+class RangeMinMaxDataTile(DenseDataTile):
+    """
+    min/max DenseDataTile with a sparse table over the active bins: level k
+    holds the min/max of the active bins i..i + 2**k - 1 for every row, so
+    the min/max of any range a..b is the reduction of two overlapping
+    blocks of level floor(log2(b - a + 1)), two row reads per query
+    whatever the width of the range.
+
+    The table holds n_bins * log2(n_bins) cells per row, level 0 being the
+    datatile itself. Empty cells are NaN and ignored, as in DenseDataTile.
+    """
+
+    def __init__(self, data, aggregate_fn="min", rows=None, dtype=None):
+        """
+        Parameters
+        ----------
+        data: ndarray of shape (n_rows, n_bins), not cumulated
+        aggregate_fn: min/max
+        rows: datatile row of each passive chart x-axis entry, all rows in
+            order if None
+        dtype: dtype of the aggregated column
+        """
+        if aggregate_fn not in ["min", "max"]:
+            raise ValueError(
+                "RangeMinMaxDataTile supports aggregate_fn min/max, got "
+                + str(aggregate_fn)
+            )
+        super().__init__(
+            data, aggregate_fn, cumsum=False, rows=rows, dtype=dtype
+        )
+        self._build_levels()
+
+    def _build_levels(self):
+        ufunc = np.fmin if self.aggregate_fn == "min" else np.fmax
+        self.levels = [self.data]
+        width = 1
+        while 2 * width <= self.n_bins:
+            level = self.levels[-1]
+            self.levels.append(ufunc(level[:-width], level[width:]))
+            width *= 2
+
+    def coarsen(self):
+        coarse = super().coarsen()
+        coarse._build_levels()
+        return coarse
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def query_range(self, index_min, index_max):
+        index_min, index_max = self._clip_range(index_min, index_max)
+        if index_min > index_max:
+            return self._empty_result()
+        k = (index_max - index_min + 1).bit_length() - 1
+        level = self.levels[k]
+        ufunc = np.fmin if self.aggregate_fn == "min" else np.fmax
+        result = ufunc(level[index_min], level[index_max - (1 << k) + 1])
+        return result.astype(np.float64)
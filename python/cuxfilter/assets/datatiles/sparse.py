@@ -0,0 +1,216 @@
+import copy
+
+import numpy as np
+
+from .base import BaseDataTile
+from .dense import _count_dtype
+
+
+def coo_to_dense(
+    passive_ids, active_ids, values, shape, aggregate_fn="count", cumsum=True
+):
+    """
+    description:
+        scatter the non-empty cells of a datatile into a dense
+        (n_passive_bins, n_active_bins) ndarray
+    input:
+        - passive_ids, active_ids: cell coordinates
+        - values: cell values, [sum, count] for aggregate_fn=mean
+        - shape: (n_passive_bins, n_active_bins)
+        - aggregate_fn: count/sum/mean/min/max
+        - cumsum: cumulate along the active bins
+    output:
+        - ndarray, [sum, count] ndarrays for aggregate_fn=mean
+    """
+    if aggregate_fn == "mean":
+        return [
+            coo_to_dense(
+                passive_ids, active_ids, values[0], shape, "sum", cumsum
+            ),
+            coo_to_dense(
+                passive_ids, active_ids, values[1], shape, "count", cumsum
+            ),
+        ]
+    fill_value = np.nan if aggregate_fn in ["min", "max"] else 0
+    result = np.full(shape, fill_value, dtype=np.float64)
+    result[passive_ids, active_ids] = values
+    if cumsum:
+        result = result.cumsum(axis=1)
+    return result
+
+
+class SparseDataTile(BaseDataTile):
+    """
+    Datatile holding only its non-empty cells, in CSR order: cells are
+    sorted by passive chart x-axis entry, then by active bin, and
+    addressed by the key row * n_bins + active_bin.
+
+    count/sum/mean values are stored as a single prefix sum over all cells,
+    the aggregate of the active bins a..b of every row is
+    prefix[searchsorted(keys, row * n_bins + b, "right")] -
+    prefix[searchsorted(keys, row * n_bins + a)], computed for all rows
+    with two vectorized binary searches. min/max values are stored as is.
+    """
+
+    def __init__(
+        self,
+        passive_ids,
+        active_ids,
+        values,
+        shape,
+        aggregate_fn="count",
+        cumsum=True,
+        rows=None,
+    ):
+        """
+        Parameters
+        ----------
+        passive_ids, active_ids: ndarrays, coordinates of the non-empty
+            cells
+        values: ndarray of the cell values, [sum, count] ndarrays for
+            aggregate_fn="mean"
+        shape: (n_passive_bins, n_active_bins)
+        aggregate_fn: count/sum/mean/min/max
+        cumsum: whether the datatile was requested cumulated, only used by
+            to_numpy, queries are always served from the prefix sums
+        rows: datatile row of each passive chart x-axis entry, all rows in
+            order if None
+        """
+        self.aggregate_fn = aggregate_fn
+        self.cumsum = cumsum and aggregate_fn not in ["min", "max"]
+        self.n_bins = int(shape[1])
+        values = list(values) if aggregate_fn == "mean" else [values]
+        positions = np.asarray(passive_ids, dtype=np.int64)
+        active_ids = np.asarray(active_ids, dtype=np.int64)
+        if rows is None:
+            self.n_rows = int(shape[0])
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            self.n_rows = len(rows)
+            lookup = np.full(int(shape[0]), -1, dtype=np.int64)
+            lookup[rows] = np.arange(len(rows))
+            positions = lookup[positions]
+            keep = positions >= 0
+            positions, active_ids = positions[keep], active_ids[keep]
+            values = [np.asarray(value)[keep] for value in values]
+
+        keys = positions * self.n_bins + active_ids
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        if aggregate_fn in ["min", "max"]:
+            self.values = [np.asarray(values[0], dtype=np.float64)[order]]
+        else:
+            value_fns = ["sum", "count"] if aggregate_fn == "mean" else []
+            self.values = [
+                self._prefix_sum(np.asarray(value)[order], value_fn)
+                for value, value_fn in zip(values, value_fns or [aggregate_fn])
+            ]
+
+    @staticmethod
+    def _prefix_sum(values, aggregate_fn):
+        prefix = np.zeros(len(values) + 1, dtype=np.float64)
+        np.cumsum(values, out=prefix[1:])
+        if aggregate_fn == "count":
+            return prefix.astype(_count_dtype(prefix))
+        return prefix
+
+    @property
+    def nnz(self):
+        return len(self.keys)
+
+    @property
+    def density(self):
+        return self.nnz / max(self.n_rows * self.n_bins, 1)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + sum(value.nbytes for value in self.values)
+
+    def _finalize(self, results):
+        if self.aggregate_fn == "mean":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return results[0] / results[1]
+        return results[0]
+
+    def _reduce_cells(self, mask):
+        """
+        aggregate of the cells selected by mask, per row
+        """
+        rows = self.keys[mask] // self.n_bins
+        if self.aggregate_fn in ["min", "max"]:
+            result = np.full(self.n_rows, np.nan)
+            ufunc = np.fmin if self.aggregate_fn == "min" else np.fmax
+            ufunc.at(result, rows, self.values[0][mask])
+            return result
+        return self._finalize(
+            [
+                np.bincount(
+                    rows, weights=np.diff(prefix)[mask], minlength=self.n_rows
+                )
+                for prefix in self.values
+            ]
+        )
+
+    def query_range(self, index_min, index_max):
+        index_min, index_max = self._clip_range(index_min, index_max)
+        if index_min > index_max:
+            return self._empty_result()
+        if self.aggregate_fn in ["min", "max"]:
+            active_ids = self.keys % self.n_bins
+            return self._reduce_cells(
+                (active_ids >= index_min) & (active_ids <= index_max)
+            )
+        row_keys = np.arange(self.n_rows, dtype=np.int64) * self.n_bins
+        lower = np.searchsorted(self.keys, row_keys + index_min, "left")
+        upper = np.searchsorted(self.keys, row_keys + index_max, "right")
+        return self._finalize(
+            [
+                prefix[upper].astype(np.float64) - prefix[lower]
+                for prefix in self.values
+            ]
+        )
+
+    def query_indices(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return self._empty_result()
+        return self._reduce_cells(np.isin(self.keys % self.n_bins, indices))
+
+    def coarsen(self):
+        coarse = copy.copy(self)
+        coarse.n_bins = (self.n_bins + 1) // 2
+        rows, active_ids = np.divmod(self.keys, self.n_bins)
+        keys = rows * coarse.n_bins + active_ids // 2
+        # keys stay sorted, merged cells are consecutive
+        starts = np.flatnonzero(np.diff(keys, prepend=-1))
+        coarse.keys = keys[starts]
+        if self.aggregate_fn in ["min", "max"]:
+            ufunc = np.fmin if self.aggregate_fn == "min" else np.fmax
+            coarse.values = [
+                ufunc.reduceat(self.values[0], starts)
+                if len(starts) > 0
+                else self.values[0]
+            ]
+        else:
+            coarse.values = [
+                np.concatenate([prefix[starts], prefix[-1:]])
+                for prefix in self.values
+            ]
+        return coarse
+
+    def to_numpy(self):
+        positions, active_ids = np.divmod(self.keys, self.n_bins)
+        if self.aggregate_fn in ["min", "max"]:
+            values = self.values[0]
+        else:
+            values = [np.diff(prefix) for prefix in self.values]
+            if self.aggregate_fn != "mean":
+                values = values[0]
+        return coo_to_dense(
+            positions,
+            active_ids,
+            values,
+            (self.n_rows, self.n_bins),
+            self.aggregate_fn,
+            self.cumsum,
+        )
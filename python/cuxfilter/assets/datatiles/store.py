@@ -0,0 +1,329 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from ..cache import parse_bytes
+from ..cudf_utils import get_min_max
+from .dense import DenseDataTile
+from .hll import HLLDataTile
+from .pyramid import DataTilePyramid
+from .quantile import QuantileDataTile
+from .range_minmax import RangeMinMaxDataTile
+from .sparse import SparseDataTile
+
+STORE_VERSION = 1
+_DATATILE_CLASSES = {
+    datatile_class.__name__: datatile_class
+    for datatile_class in [
+        DenseDataTile,
+        HLLDataTile,
+        QuantileDataTile,
+        RangeMinMaxDataTile,
+        SparseDataTile,
+    ]
+}
+
+
+def dataset_fingerprint(data):
+    """
+    description:
+        fingerprint of a dataframe from its schema, its number of rows and
+        the min/max of every numeric, boolean and datetime column
+    input:
+        - data: cudf/dask_cudf DataFrame
+    output:
+        - hex digest str
+    """
+    parts = [len(data)]
+    for column, dtype in data.dtypes.items():
+        parts.append((str(column), str(dtype)))
+        if dtype.kind in "biufmM":
+            parts.append(tuple(map(str, get_min_max(data, column))))
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _dump(value, path):
+    os.makedirs(path, exist_ok=True)
+    if isinstance(value, dict):
+        meta = {"kind": "dict", "items": {}}
+        for index, (key, item) in enumerate(value.items()):
+            meta["items"][key] = str(index)
+            _dump(item, os.path.join(path, str(index)))
+    elif isinstance(value, DataTilePyramid):
+        meta = {
+            "kind": "pyramid",
+            "levels": len(value.levels),
+            "resolution": value.resolution,
+        }
+        for index, level in enumerate(value.levels):
+            _dump(level, os.path.join(path, str(index)))
+    else:
+        meta = {
+            "kind": "datatile",
+            "class": type(value).__name__,
+            "attributes": {},
+            "arrays": {},
+        }
+        for name, attribute in vars(value).items():
+            if isinstance(attribute, np.ndarray):
+                meta["arrays"][name] = None
+                np.save(os.path.join(path, name + ".npy"), attribute)
+            elif isinstance(attribute, list):
+                meta["arrays"][name] = len(attribute)
+                for index, array in enumerate(attribute):
+                    np.save(
+                        os.path.join(path, f"{name}.{index}.npy"), array
+                    )
+            else:
+                meta["attributes"][name] = attribute
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def _disk_usage(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _load(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["kind"] == "dict":
+        return {
+            key: _load(os.path.join(path, item))
+            for key, item in meta["items"].items()
+        }
+    if meta["kind"] == "pyramid":
+        pyramid = DataTilePyramid.__new__(DataTilePyramid)
+        pyramid.levels = [
+            _load(os.path.join(path, str(index)))
+            for index in range(meta["levels"])
+        ]
+        finest = pyramid.levels[0]
+        pyramid.query_times = [None] * meta["levels"]
+        pyramid.resolution = meta["resolution"]
+        pyramid.aggregate_fn = finest.aggregate_fn
+        pyramid.cumsum = finest.cumsum
+        pyramid.n_bins = finest.n_bins
+        pyramid.n_rows = finest.n_rows
+        return pyramid
+
+    datatile = _DATATILE_CLASSES[meta["class"]].__new__(
+        _DATATILE_CLASSES[meta["class"]]
+    )
+    vars(datatile).update(meta["attributes"])
+    for name, length in meta["arrays"].items():
+        if length is None:
+            array = np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+        else:
+            array = [
+                np.load(
+                    os.path.join(path, f"{name}.{index}.npy"), mmap_mode="r"
+                )
+                for index in range(length)
+            ]
+        setattr(datatile, name, array)
+    return datatile
+
+
+class DataTileStore:
+    """
+    Persistent datatile cache. Every datatile is written to its own
+    directory of .npy files, named after a hash of the dataset fingerprint
+    and the datatile key, and is loaded back lazily as memory-mapped
+    arrays, so datatiles survive server restarts as long as the dataset and
+    the chart binning are unchanged.
+
+    The entries stay within max_bytes on disk, the least recently used
+    ones (by the modification time of their directory across restarts)
+    are removed first. submit writes an entry in a background thread, off
+    the interaction that built the datatile.
+    """
+
+    def __init__(self, path, fingerprint="", max_bytes=None):
+        """
+        Parameters
+        ----------
+        path: str
+            cache directory, created if it does not exist
+        fingerprint: str
+            fingerprint of the dataset, see dataset_fingerprint
+        max_bytes: int or str
+            disk budget of the entries, e.g. 2_000_000_000 or "2GB". None
+            means unbounded
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        os.makedirs(self.path, exist_ok=True)
+        self.fingerprint = fingerprint
+        self.max_bytes = parse_bytes(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pending = set()
+        # entry name -> nbytes, least recently used first
+        self._entries = OrderedDict()
+        entries = [
+            entry for entry in os.listdir(self.path) if len(entry) == 40
+        ]
+        for entry in sorted(
+            entries,
+            key=lambda entry: os.path.getmtime(os.path.join(self.path, entry)),
+        ):
+            nbytes = _disk_usage(os.path.join(self.path, entry))
+            self._entries[entry] = nbytes
+            self.current_bytes += nbytes
+        with self._lock:
+            self._enforce()
+
+    def _entry_name(self, key):
+        return hashlib.sha1(
+            repr((STORE_VERSION, self.fingerprint, key)).encode()
+        ).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, self._entry_name(key))
+
+    def __contains__(self, key):
+        return os.path.isdir(self._entry_path(key))
+
+    def get(self, key, default=None):
+        """
+        load a datatile, memory-mapped
+        """
+        name = self._entry_name(key)
+        path = os.path.join(self.path, name)
+        if os.path.isdir(path):
+            try:
+                datatile = _load(path)
+            except (OSError, ValueError, KeyError):
+                pass
+            else:
+                self.hits += 1
+                with self._lock:
+                    if name in self._entries:
+                        self._entries.move_to_end(name)
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return datatile
+        self.misses += 1
+        return default
+
+    def put(self, key, datatile):
+        """
+        write a datatile (or a dict of datatiles) to the store. The entry
+        is written to a temporary directory first and renamed, so
+        concurrent readers never see partial entries.
+        """
+        name = self._entry_name(key)
+        path = os.path.join(self.path, name)
+        if os.path.isdir(path):
+            return
+        temp_path = tempfile.mkdtemp(prefix=".tmp-", dir=self.path)
+        try:
+            _dump(datatile, temp_path)
+            nbytes = _disk_usage(temp_path)
+            os.rename(temp_path, path)
+        except OSError:
+            # entry written concurrently by another process, or disk full
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return
+        with self._lock:
+            self.writes += 1
+            self._entries[name] = nbytes
+            self.current_bytes += nbytes
+            self._enforce(keep=name)
+
+    def submit(self, key, datatile):
+        """
+        put a datatile in a background thread, keys already pending are
+        skipped
+
+        Returns
+        -------
+        concurrent.futures.Future, None if the key is pending
+        """
+        with self._lock:
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="cuxfilter-store"
+                )
+
+        def write():
+            try:
+                self.put(key, datatile)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        return self._pool.submit(write)
+
+    def flush(self):
+        """
+        wait for the entries submitted so far to be written
+        """
+        if self._pool is not None:
+            wait([self._pool.submit(lambda: None)])
+
+    def _enforce(self, keep=None):
+        """
+        remove the least recently used entries until the store fits
+        max_bytes, keep is never removed
+        """
+        if self.max_bytes is None:
+            return
+        for name in list(self._entries):
+            if self.current_bytes <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self.current_bytes -= self._entries.pop(name)
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        remove all datatiles from the store
+        """
+        self.flush()
+        for entry in os.listdir(self.path):
+            shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def info(self):
+        """
+        store statistics as a dictionary
+        """
+        entries = [
+            entry for entry in os.listdir(self.path) if len(entry) == 40
+        ]
+        return {
+            "path": self.path,
+            "entries": len(entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "current_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
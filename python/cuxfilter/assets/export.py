@@ -0,0 +1,110 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = ("parquet", "arrow")
+
+
+def to_arrow_table(df):
+    """
+    description:
+        pyarrow.Table of the columns of a cudf or pandas DataFrame, without
+        the index
+    input:
+        - df: cudf.DataFrame | pandas.DataFrame
+    output:
+        - pyarrow.Table
+    """
+    if hasattr(df, "to_arrow"):
+        return df.to_arrow(preserve_index=False)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def iter_chunks(data, columns, chunk_rows, row_ids=None):
+    """
+    description:
+        the rows of data, or the rows row_ids of data, and columns, as
+        dataframes of at most chunk_rows rows, gathered one chunk at a
+        time. At least one, possibly empty, chunk is returned
+    input:
+        - data: cudf.DataFrame | pandas.DataFrame
+        - columns: list of column names
+        - chunk_rows: int
+        - row_ids: integer array of row positions, all rows if None
+    output:
+        - generator of dataframes
+    """
+    positions = [data.columns.get_loc(column) for column in columns]
+    n_rows = len(data) if row_ids is None else len(row_ids)
+    for start in range(0, max(n_rows, 1), chunk_rows):
+        rows = slice(start, min(start + chunk_rows, n_rows))
+        if row_ids is not None:
+            rows = row_ids[rows]
+        yield data.iloc[rows, positions]
+
+
+def iter_partition_chunks(data, chunk_rows):
+    """
+    description:
+        the partitions of a dask dataframe computed one at a time, as
+        dataframes of at most chunk_rows rows, see iter_chunks
+    input:
+        - data: dask.dataframe.DataFrame
+        - chunk_rows: int
+    output:
+        - generator of dataframes
+    """
+    columns = list(data.columns)
+    empty = True
+    for i in range(data.npartitions):
+        partition = data.get_partition(i).compute()
+        if len(partition) > 0:
+            empty = False
+            yield from iter_chunks(partition, columns, chunk_rows)
+    if empty:
+        yield data._meta
+
+
+def write_chunks(
+    path, chunks, format="parquet", total_rows=None, progress=None
+):
+    """
+    description:
+        write dataframe chunks incrementally to a parquet file, or an arrow
+        IPC file, so only one chunk is held in memory at a time. The schema
+        is the schema of the first chunk
+    input:
+        - path: str, path of the file
+        - chunks: iterable of cudf/pandas DataFrames of the same columns
+        - format: "parquet" | "arrow"
+        - total_rows: total number of rows of chunks, if known
+        - progress: callable called with (rows_written, total_rows) after
+            every chunk
+    output:
+        - number of rows written
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"format must be one of {EXPORT_FORMATS}, got {format!r}"
+        )
+    writer = schema = None
+    n_rows = 0
+    try:
+        for chunk in chunks:
+            table = to_arrow_table(chunk)
+            if writer is None:
+                schema = table.schema
+                if format == "parquet":
+                    writer = pq.ParquetWriter(path, schema)
+                else:
+                    writer = pa.ipc.new_file(path, schema)
+            elif not table.schema.equals(schema):
+                # e.g. an object column without values in a chunk
+                table = table.cast(schema)
+            writer.write_table(table)
+            n_rows += table.num_rows
+            if progress is not None:
+                progress(n_rows, total_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
@@ -1,44 +1,23 @@
 import numpy as np
-from numba import cuda
+import cupy as cp
+import cupyx
 import pyarrow as pa
 import pandas as pd
 import io
-import gc
+import functools
 from bokeh.models import ColumnDataSource
 from typing import Type
-import dask_cudf
+import dask
+import dask.dataframe as dd
 
 from ...charts.core.core_chart import BaseChart
+from ..cudf_utils import get_bin_ids, get_min_max
+from ..datatiles.hll import HLL_PRECISION
+from ..datatiles.quantile import get_quantile, get_sketch_edges
 
-
-@cuda.jit
-def calc_cumsum_data_tile(x, arr1):
-    """
-    description:
-        cuda jit function calculate the data tile with cumulative sums
-        for a 2-col ndarray
-    input:
-        - x: ndarray(3-cols)  (col1,col2, count_col2)
-        - arr1: result array: type is int as the cells contain just
-        frequencies
-        (cuda.to_device(np.zeros(shape=(min_s,max_s)).astype(np.int32)))
-        [X X X]
-        [X X X]
-        [X X X]
-    """
-    start = cuda.grid(1)
-    stride = cuda.gridsize(1)
-
-    for i in range(start, x.shape[0], stride):
-        col1_i = int(round(x[i][0]))
-        col2_i = int(round(x[i][1]))
-        freq_i = x[i][2]
-
-        if int(x[i][0]) != -1:
-            if arr1[col2_i][col1_i] == float(0):
-                arr1[col2_i][col1_i] = freq_i
-            else:
-                arr1[col2_i][col1_i] = (arr1[col2_i][col1_i] + freq_i) / 2
+# number of partial datatiles merged by each task of the tree reduction of
+# dask dataframes
+DATATILE_SPLIT_EVERY = 8
 
 
 def get_arrow_stream(record_batch):
@@ -49,19 +28,57 @@ def get_arrow_stream(record_batch):
     return outputStream.getvalue()
 
 
+def get_arrow_tensor(result_np: np.ndarray):
+    """
+    description:
+        serialize an ndarray as an Arrow IPC tensor message. The tensor
+        wraps the ndarray memory and is written once, into a buffer
+        allocated to the exact message size, without an intermediate
+        pandas DataFrame or RecordBatch
+    input:
+        - result_np: ndarray
+    output:
+        - pyarrow.Buffer
+    """
+    tensor = pa.Tensor.from_numpy(np.ascontiguousarray(result_np))
+    buffer = pa.allocate_buffer(pa.ipc.get_tensor_size(tensor))
+    pa.ipc.write_tensor(tensor, pa.FixedSizeBufferWriter(buffer))
+    return buffer
+
+
+def read_arrow_tensor(source):
+    """
+    description:
+        map a datatile written by format_result(..., "arrow") back to an
+        ndarray without copying, the ndarray is a read-only view of the
+        message body
+    input:
+        - source: pyarrow.Buffer/bytes, or a pyarrow.NativeFile such as
+        pyarrow.memory_map(path)
+    output:
+        - ndarray
+    """
+    if not isinstance(source, pa.NativeFile):
+        source = pa.BufferReader(source)
+    return pa.ipc.read_tensor(source).to_numpy()
+
+
 def format_result(result_np: np.ndarray, return_format: str):
     """
-        format result as a pandas dataframe
+        format result as a pandas dataframe, "numpy" returns result_np as is
+        and "arrow" as an Arrow IPC tensor message (see get_arrow_tensor)
     """
+    if return_format == "numpy":
+        return result_np
+
+    elif return_format == "arrow":
+        return get_arrow_tensor(result_np)
+
     pandas_df = pd.DataFrame(result_np, dtype=np.float64)
 
     if return_format == "pandas":
         return pandas_df
 
-    elif return_format == "arrow":
-        result_pa = pa.RecordBatch.from_pandas(pandas_df, preserve_index=True)
-        return get_arrow_stream(result_pa)
-
     elif return_format == "ColumnDataSource":
         pandas_df.columns = pandas_df.columns.astype(str)
         return ColumnDataSource(pandas_df)
@@ -75,42 +92,215 @@ def calc_data_tile_for_size(
     stride_1,
     cumsum: bool = True,
     return_format="pandas",
+    active_bins=None,
 ):
-    df[col_1 + "_mod"] = (
-        ((df[col_1] - min_1) / stride_1).round().astype("int32")
-    )
-    if isinstance(df, dask_cudf.core.DataFrame):
-        groupby_result = getattr(
-            df[[col_1 + "_mod", col_1]].groupby(col_1 + "_mod"), "count"
-        )().compute()
+    """
+    description:
+        calculate the 1-d datatile of the number of rows per bin of the
+        active chart
+    input:
+        - df -> cudf/dask dataframe
+        - col_1, min_1, max_1, stride_1: active chart column and binning
+        - cumsum: bool
+        - return_format: pandas/arrow/numpy/bokeh.models.ColumnDataSource
+        - active_bins: (bin_ids, n_bins) of the active chart as returned
+        by get_bin_ids, reused instead of binning df[col_1] again
+    output:
+        - datatile in return_format, df is not modified
+    """
+    if active_bins is None and isinstance(df, dd.DataFrame):
+        result = _reduce_partitions(
+            df, (col_1, min_1, max_1, stride_1), None, None, "count"
+        )[0]
     else:
-        groupby_result = (
-            df[[col_1 + "_mod"]]
-            .groupby(col_1 + "_mod", as_index=True)
-            .agg({col_1 + "_mod": "count"})
+        if active_bins is None:
+            active_bins = get_bin_ids(df, col_1, min_1, max_1, stride_1)
+        bin_ids, max_s = active_bins
+        # a single bincount pass, rows with a null or out of range value
+        # (bin id max_s) are skipped
+        result = cp.asnumpy(
+            cp.get_array_module(bin_ids).bincount(
+                bin_ids[bin_ids < max_s], minlength=max_s
+            )
         )
+    result = result.astype(np.float64)
+    if cumsum:
+        result = np.cumsum(result)
+    return format_result(result, return_format)
 
-    max_s = int(round((max_1 - min_1) / stride_1)) + 1
-    min_s = 1
-
-    result = np.zeros(shape=(min_s, max_s)).astype(np.float64)[0]
 
-    groupby_result_array_index = groupby_result.index.to_array().astype(int)
-    groupby_result_array = groupby_result[
-        groupby_result.columns[-1]
-    ].to_array()
+def _get_values(series, valid):
+    """
+    description:
+        values of series as a numpy/cupy array, and the valid mask updated
+        to exclude null values
+    """
+    if bool(series.isna().any()):
+        valid = valid & series.notna().values
+        series = series.fillna(0)
+    return series.values, valid
 
-    del groupby_result
 
-    for index, value in np.ndenumerate(groupby_result_array_index):
-        result[value] = groupby_result_array[index[0]]
+def _splitmix64(x):
+    """
+    description:
+        splitmix64 finalizer, mixing uint64 values into well distributed
+        64-bit hashes
+    """
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
 
-    if cumsum:
-        result_np = np.cumsum(result)
 
+def _get_hash_values(series, valid):
+    """
+    description:
+        64-bit hashes of the values of series as a numpy/cupy uint64 array,
+        and the valid mask updated to exclude null values. Numeric and
+        datetime values are hashed from their bits, other dtypes from
+        their cudf/pandas row hashes
+    """
+    if series.dtype.kind in "biufmM":
+        values, valid = _get_values(series, valid)
+        if values.dtype.kind == "f":
+            # + 0.0 maps -0.0 to 0.0
+            values = values.astype(np.float64) + 0.0
+        else:
+            values = values.astype(np.int64)
+        return _splitmix64(values.view(np.uint64)), valid
+    valid = valid & series.notna().values
+    if hasattr(series, "hash_values"):
+        hashes = series.hash_values().values
     else:
-        result_np = result
-    return format_result(result_np, return_format)
+        hashes = pd.util.hash_pandas_object(series, index=False).values
+    return _splitmix64(hashes.astype(np.int64).view(np.uint64)), valid
+
+
+def _leading_zeros(x):
+    """
+    number of leading zero bits of every uint64 of x, 64 for 0
+    """
+    xp = cp.get_array_module(x)
+    zeros = xp.zeros(x.shape, dtype=np.int64)
+    for shift in [32, 16, 8, 4, 2, 1]:
+        # the top shift bits are all zero
+        top_zero = x < (np.uint64(1) << np.uint64(64 - shift))
+        zeros += top_zero * shift
+        x = xp.where(top_zero, x << np.uint64(shift), x)
+    return zeros + (x == 0)
+
+
+def _reduce_hll(flat_index, hashes, size, precision=HLL_PRECISION):
+    """
+    description:
+        HyperLogLog registers of every cell of a distinct count datatile,
+        see assets.datatiles.HLLDataTile. The first precision bits of a
+        hash select the register, the register keeps the max position of
+        the first set bit of the remaining bits
+    input:
+        - flat_index: numpy/cupy int array of cell ids per row
+        - hashes: numpy/cupy uint64 array of the hashed values per row
+        - size: total number of cells in the datatile
+        - precision: log2 of the number of registers per cell
+    output:
+        - single element list of the flat (size * 2**precision) uint8
+        registers
+    """
+    xp = cp.get_array_module(flat_index)
+    n_registers = 1 << precision
+    registers = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    rank = (
+        xp.minimum(
+            _leading_zeros(hashes << np.uint64(precision)), 64 - precision
+        )
+        + 1
+    )
+    # ranks fit in the low 7 bits of a (register id, rank) key, sorted
+    # keys hold the max rank of every register last, so the uint8
+    # registers are written once per register, without a float64
+    # scatter-max over size * 2**precision cells
+    keys = (flat_index.astype(np.int64) * n_registers + registers) << 7
+    keys = xp.unique(keys | rank)
+    register_ids = keys >> 7
+    last = xp.ones(len(keys), dtype=bool)
+    last[:-1] = register_ids[1:] != register_ids[:-1]
+    result = xp.zeros(size * n_registers, dtype=np.uint8)
+    result[register_ids[last]] = (keys[last] & 127).astype(np.uint8)
+    return [result]
+
+
+def reduce_data_tile(flat_index, values, size, aggregate_fn):
+    """
+    description:
+        reduce values into a flattened datatile in a single vectorized
+        scatter pass (bincount for count/sum/mean, ufunc.at/scatter_min/max
+        for min/max), instead of a groupby followed by a per-row kernel
+    input:
+        - flat_index: numpy/cupy int array of cell ids per row
+            (passive_bin * n_active_bins + active_bin)
+        - values: numpy/cupy array of the aggregated column per row
+        - size: total number of cells in the datatile
+        - aggregate_fn: count/sum/mean/min/max
+    output:
+        - list of flat ndarrays(numpy/cupy), [sum, count] for mean,
+        single element list for the rest. Empty cells of min/max tiles
+        are NaN
+    """
+    xp = cp.get_array_module(flat_index)
+    if aggregate_fn == "count":
+        return [xp.bincount(flat_index, minlength=size)]
+    elif aggregate_fn == "sum":
+        return [xp.bincount(flat_index, weights=values, minlength=size)]
+    elif aggregate_fn == "mean":
+        return [
+            xp.bincount(flat_index, weights=values, minlength=size),
+            xp.bincount(flat_index, minlength=size),
+        ]
+    elif aggregate_fn in ["min", "max"]:
+        values = values.astype(np.float64)
+        fill_value = np.inf if aggregate_fn == "min" else -np.inf
+        result = xp.full(size, fill_value, dtype=np.float64)
+        if xp is np:
+            ufunc = np.minimum if aggregate_fn == "min" else np.maximum
+            ufunc.at(result, flat_index, values)
+        else:
+            getattr(cupyx, "scatter_" + aggregate_fn)(
+                result, flat_index, values
+            )
+        result[xp.bincount(flat_index, minlength=size) == 0] = np.nan
+        return [result]
+    raise ValueError(
+        "aggregate_fn must be one of count, sum, mean, min or max, got "
+        + str(aggregate_fn)
+    )
+
+
+def _reduce_coo(flat_index, values, max_s, min_s, aggregate_fn):
+    """
+    description:
+        reduce values into the non-empty cells of the datatile only,
+        without allocating the (min_s, max_s) grid
+    output:
+        - (passive_bin_ids, active_bin_ids, values, (min_s, max_s)) numpy
+        arrays sorted by passive bin, then active bin. values is a list of
+        [sum, count] for aggregate_fn=mean
+    """
+    xp = cp.get_array_module(flat_index)
+    cells, cell_index = xp.unique(flat_index, return_inverse=True)
+    results = [
+        cp.asnumpy(result)
+        for result in reduce_data_tile(
+            cell_index, values, len(cells), aggregate_fn
+        )
+    ]
+    cells = cp.asnumpy(cells)
+    return (
+        cells // max_s,
+        cells % max_s,
+        results[0] if len(results) == 1 else results,
+        (min_s, max_s),
+    )
 
 
 def calc_data_tile(
@@ -120,102 +310,437 @@ def calc_data_tile(
     aggregate_fn: str = "",
     cumsum: bool = True,
     return_format="pandas",
+    active_bins=None,
+    passive_bins=None,
 ):
     """
     description:
-        cuda jit function calculate the data tile with cumulative sums for a
-        2-col ndarray
+        calculate the data tile for a passive chart, with bin-ids of the
+        active chart as columns and bin-ids of the passive chart as rows
     input:
-        - df -> cudf dataframe
+        - df -> cudf dataframe, or dask_cudf/dask dataframe, built one
+        partition at a time, see _calc_data_tile_partitions
         - active_view -> chart class
         - passive_view -> chart class
-        - aggregate_dict
+        - aggregate_fn: count/sum/mean/min/max/median/p<percentile>/nunique
         - cumsum: bool
-        - return_format: pandas/arrow/bokeh.models.ColumnDataSource
+        - return_format: pandas/arrow/numpy/bokeh.models.ColumnDataSource
+        - active_bins, passive_bins: precomputed (bin_ids, n_bins) of the
+        active and passive charts, see get_bin_ids
     output:
-        - pyarrow(2d-numpy array) -> data-tile data structure
+        - datatile in return_format, list of [sum, count] datatiles
+        for aggregate_fn=mean, [sketches, value bucket edges] for
+        median/p<percentile>, see assets.datatiles.QuantileDataTile,
+        HyperLogLog registers for nunique, see assets.datatiles.HLLDataTile
     """
-
-    col_1, min_1, max_1, stride_1 = (
-        active_view.x,
-        active_view.min_value,
-        active_view.max_value,
-        active_view.stride,
-    )
-    col_2, min_2, max_2, stride_2 = (
-        passive_view.x,
-        passive_view.min_value,
-        passive_view.max_value,
-        passive_view.stride,
+    if isinstance(df, dd.DataFrame):
+        return _calc_data_tile_partitions(
+            df, active_view, passive_view, aggregate_fn, cumsum, return_format
+        )
+    return _calc_data_tile_scatter(
+        df,
+        active_view,
+        passive_view,
+        aggregate_fn,
+        cumsum,
+        return_format,
+        active_bins=active_bins,
+        passive_bins=passive_bins,
     )
 
+
+def calc_stacked_data_tiles(df, active_bins, passives):
+    """
+    description:
+        build the count/sum/mean datatiles of several passive charts in a
+        single pass: the flat (passive bin, active bin) cell ids of every
+        chart are offset by the cells of the charts before it and stacked,
+        so all the count cells are reduced by one bincount, and all the
+        sum cells by one weighted bincount
+    input:
+        - df -> cudf/pandas dataframe
+        - active_bins: (bin_ids, n_bins) of the active chart, as returned
+        by get_bin_ids
+        - passives: list of (passive_bins, key, aggregate_fn, cumsum,
+        return_format) per passive chart, passive_bins as returned by
+        get_bin_ids, key the aggregated column, aggregate_fn count/sum/mean
+        and return_format pandas/arrow/numpy/ColumnDataSource
+    output:
+        - list of datatiles in return_format in the order of passives,
+        list of [sum, count] datatiles for aggregate_fn=mean
+    """
+    active_bin_ids, max_s = active_bins
+    xp = cp.get_array_module(active_bin_ids)
+    active_valid = active_bin_ids < max_s
+    # per reduction, the stacked cell ids and the sum weights
+    stacks = {"count": ([], None, 0), "sum": ([], [], 0)}
+    segments = []
+    for (passive_bin_ids, min_s), key, aggregate_fn, _, _ in passives:
+        values, valid = _get_values(
+            df[key], active_valid & (passive_bin_ids < min_s)
+        )
+        values = values[valid] if aggregate_fn != "count" else None
+        flat_index = passive_bin_ids[valid].astype(np.int64) * max_s
+        flat_index += active_bin_ids[valid]
+        del valid
+        reductions = {"count": ["count"], "sum": ["sum"]}.get(
+            aggregate_fn, ["sum", "count"]
+        )
+        chart_segments = []
+        for reduction in reductions:
+            indices, weights, offset = stacks[reduction]
+            indices.append(flat_index + offset)
+            if weights is not None:
+                weights.append(values)
+            chart_segments.append((reduction, offset))
+            stacks[reduction] = (indices, weights, offset + min_s * max_s)
+        segments.append(chart_segments)
+
+    results = {}
+    for reduction, (indices, weights, size) in stacks.items():
+        if size > 0:
+            results[reduction] = xp.bincount(
+                xp.concatenate(indices),
+                weights=None if weights is None else xp.concatenate(weights),
+                minlength=size,
+            )
+
+    datatiles = []
+    for ((passive_bins, _, _, cumsum, return_format), chart_segments) in zip(
+        passives, segments
+    ):
+        size = passive_bins[1] * max_s
+        datatiles.append(
+            _format_data_tile(
+                [
+                    results[reduction][offset : offset + size]
+                    for reduction, offset in chart_segments
+                ],
+                (passive_bins[1], max_s),
+                cumsum,
+                return_format,
+            )
+        )
+    return datatiles
+
+
+def _calc_data_tile_scatter(
+    df,
+    active_view: Type[BaseChart],
+    passive_view: Type[BaseChart],
+    aggregate_fn: str = "",
+    cumsum: bool = True,
+    return_format="pandas",
+    active_bins=None,
+    passive_bins=None,
+):
+    """
+    description:
+        build the datatile by turning both bin-id columns into a single
+        flat cell index and reducing the aggregated column into it in one
+        vectorized pass
+    input:
+        - df -> cudf/pandas dataframe
+        - active_view -> chart class
+        - passive_view -> chart class
+        - aggregate_fn: count/sum/mean/min/max
+        - cumsum: bool
+        - return_format: pandas/arrow/numpy/bokeh.models.ColumnDataSource,
+        or coo for the non-empty cells only, see _reduce_coo
+        - active_bins, passive_bins: (bin_ids, n_bins) as returned by
+        get_bin_ids, computed from df if not provided
+    output:
+        - datatile in return_format, list of [sum, count] datatiles
+        for aggregate_fn=mean
+    """
     key = passive_view.y if passive_view.y is not None else passive_view.x
     if len(aggregate_fn) == 0:
         aggregate_fn = passive_view.aggregate_fn
 
-    if aggregate_fn == "mean":
-        aggregate_dict = {key: ["sum", "count"]}
+    if active_bins is None:
+        active_bins = get_bin_ids(
+            df,
+            active_view.x,
+            active_view.min_value,
+            active_view.max_value,
+            active_view.stride,
+        )
+    if passive_bins is None:
+        passive_bins = get_bin_ids(
+            df,
+            passive_view.x,
+            passive_view.min_value,
+            passive_view.max_value,
+            passive_view.stride,
+        )
+    (active_bin_ids, max_s), (passive_bin_ids, min_s) = (
+        active_bins,
+        passive_bins,
+    )
+
+    valid = (active_bin_ids < max_s) & (passive_bin_ids < min_s)
+    if aggregate_fn == "nunique":
+        values, valid = _get_hash_values(df[key], valid)
     else:
-        aggregate_dict = {key: [aggregate_fn]}
+        values, valid = _get_values(df[key], valid)
+    values = values[valid] if aggregate_fn != "count" else None
+
+    flat_index = passive_bin_ids[valid].astype(np.int64) * max_s
+    flat_index += active_bin_ids[valid]
+    del valid
+
+    if get_quantile(aggregate_fn) is not None:
+        edges = get_sketch_edges(*get_min_max(df, key))
+        return [
+            _format_data_tile(
+                _reduce_sketch(flat_index, values, min_s * max_s, edges),
+                (min_s, max_s, len(edges) - 1),
+                cumsum,
+                _get_sketch_format(return_format),
+            ),
+            edges,
+        ]
+
+    if aggregate_fn == "nunique":
+        return _format_data_tile(
+            _reduce_hll(flat_index, values, min_s * max_s),
+            (min_s, max_s, 1 << HLL_PRECISION),
+            False,
+            _get_sketch_format(return_format),
+        )
 
-    check_list = []
+    if return_format == "coo":
+        return _reduce_coo(flat_index, values, max_s, min_s, aggregate_fn)
 
-    df[col_1 + "_mod"] = (
-        ((df[col_1] - min_1) / stride_1).round().astype("int32")
+    return _format_data_tile(
+        reduce_data_tile(flat_index, values, min_s * max_s, aggregate_fn),
+        (min_s, max_s),
+        cumsum,
+        return_format,
     )
-    check_list.append(col_1 + "_mod")
-    df[col_2 + "_mod"] = (
-        ((df[col_2] - min_2) / stride_2).round().astype("int32")
+
+
+def _get_sketch_format(return_format):
+    """
+    quantile sketch and distinct count datatiles are 3-d, and always dense
+    """
+    if return_format not in ["numpy", "coo"]:
+        raise ValueError(
+            "median/percentile/nunique datatiles are only available as "
+            "numpy arrays, got return_format=" + str(return_format)
+        )
+    return "numpy"
+
+
+def _reduce_sketch(flat_index, values, size, edges):
+    """
+    description:
+        count the rows of every (cell, value bucket) pair of a quantile
+        sketch datatile, see assets.datatiles.QuantileDataTile
+    input:
+        - flat_index: numpy/cupy int array of cell ids per row
+        - values: numpy/cupy array of the aggregated column per row
+        - size: total number of cells in the datatile
+        - edges: n_buckets + 1 edges of the value buckets
+    output:
+        - single element list of the flat (size * n_buckets) counts
+    """
+    xp = cp.get_array_module(flat_index)
+    n_buckets = len(edges) - 1
+    scale = 0.0
+    if edges[-1] > edges[0]:
+        scale = n_buckets / (edges[-1] - edges[0])
+    buckets = xp.clip(
+        ((values - edges[0]) * scale).astype(np.int64), 0, n_buckets - 1
+    )
+    return reduce_data_tile(
+        flat_index.astype(np.int64) * n_buckets + buckets,
+        None,
+        size * n_buckets,
+        "count",
     )
-    check_list.append(col_2 + "_mod")
-
-    groupby_results = []
-    for i in aggregate_dict[key]:
-        agg = {key: i}
-        if isinstance(df, dask_cudf.core.DataFrame):
-            temp_df = getattr(
-                df[check_list + [key]].groupby(check_list, sort=False), i
-            )()
-            temp_df = temp_df.reset_index().compute()
-            groupby_results.append(temp_df)
-        else:
-            groupby_results.append(
-                df.groupby(check_list, sort=False, as_index=False).agg(agg)
-            )
 
-    del df
-    gc.collect()
 
-    results = []
+def _format_data_tile(results, shape, cumsum, return_format):
+    """
+    description:
+        reshape the flattened datatiles returned by reduce_data_tile to
+        (passive bins, active bins), cumulate them and convert them to
+        return_format
+    output:
+        - datatile in return_format, list of [sum, count] datatiles
+        for aggregate_fn=mean
+    """
+    formatted = []
+    for result in results:
+        result = result.reshape(shape)
+        if cumsum:
+            result = result.cumsum(axis=1)
+        formatted.append(format_result(cp.asnumpy(result), return_format))
 
-    for groupby_result in groupby_results:
-        list_of_indices = list(
-            np.unique(groupby_result[check_list[-1]].to_array().astype(int))
-        )
-        groupby_as_ndarray = cuda.to_device(
-            groupby_result.to_pandas().values.astype(float)
-        )
+    if len(formatted) == 1:
+        return formatted[0]
+
+    return formatted
 
-        del groupby_result
-        gc.collect()
-        max_s = int(round((max_1 - min_1) / stride_1)) + 1
-        min_s = int(round((max_2 - min_2) / stride_2)) + 1
-        result = cuda.to_device(
-            np.zeros(shape=(min_s, max_s)).astype(np.float64)
-        )
 
-        calc_cumsum_data_tile[64, 64](groupby_as_ndarray, result)
-        if not cumsum:
-            result_np = result.copy_to_host()
+def _get_binning(chart):
+    return chart.x, chart.min_value, chart.max_value, chart.stride
+
+
+def _partition_data_tile(df, active, passive, key, aggregate_fn, edges=None):
+    """
+    description:
+        flattened, non-cumulated datatile of a single partition of a dask
+        dataframe
+    input:
+        - df -> cudf/pandas partition
+        - active, passive: (column, min_value, max_value, stride) of the
+        active and passive charts, passive is None for the datasize
+        datatile
+        - key: aggregated column, rows where it is null are skipped, None
+        for the datasize datatile
+        - aggregate_fn: count/sum/mean/min/max/nunique, or
+        median/p<percentile> with the edges of the value buckets of the
+        quantile sketches
+    output:
+        - list of flat numpy arrays, see reduce_data_tile
+    """
+    flat_index, max_s = get_bin_ids(df, *active)
+    min_s = 1
+    valid = flat_index < max_s
+    if passive is not None:
+        passive_bin_ids, min_s = get_bin_ids(df, *passive)
+        valid &= passive_bin_ids < min_s
+        flat_index = passive_bin_ids.astype(np.int64) * max_s + flat_index
+    values = None
+    if key is not None:
+        if aggregate_fn == "nunique":
+            values, valid = _get_hash_values(df[key], valid)
         else:
-            result_np = np.cumsum(result.copy_to_host(), axis=1)
+            values, valid = _get_values(df[key], valid)
+        values = values[valid] if aggregate_fn != "count" else None
+    if edges is not None:
+        results = _reduce_sketch(
+            flat_index[valid], values, min_s * max_s, edges
+        )
+    elif aggregate_fn == "nunique":
+        results = _reduce_hll(flat_index[valid], values, min_s * max_s)
+    else:
+        results = reduce_data_tile(
+            flat_index[valid], values, min_s * max_s, aggregate_fn
+        )
+    return [cp.asnumpy(result) for result in results]
 
-        result_temp = format_result(result_np, return_format)
-        if return_format == "pandas":
-            result_temp[~result_temp.index.isin(list_of_indices)] = 0
-        results.append(result_temp)
 
-    if len(results) == 1:
-        return results[0]
+def _combine_data_tiles(partials, aggregate_fn):
+    """
+    description:
+        merge flattened partial datatiles, by summing them for
+        count/sum/mean, with the NaN-ignoring fmin/fmax for min/max, and
+        the element-wise max of the HyperLogLog registers for nunique
+    """
+    ufunc = {"min": np.fmin, "max": np.fmax, "nunique": np.maximum}.get(
+        aggregate_fn, np.add
+    )
+    return [functools.reduce(ufunc, parts) for parts in zip(*partials)]
 
-    return results
+
+def _reduce_partitions(
+    df,
+    active,
+    passive,
+    key,
+    aggregate_fn,
+    edges=None,
+    split_every=DATATILE_SPLIT_EVERY,
+):
+    """
+    description:
+        build a partial datatile per partition of a dask dataframe, and
+        merge them with a tree reduction of split_every partials per task,
+        so only datatile sized arrays leave the workers, instead of
+        shuffling a groupby of the bin-id columns to a single worker
+    input:
+        - df -> dask_cudf/dask dataframe
+        - active, passive, key, aggregate_fn, edges: see
+        _partition_data_tile
+        - split_every: fan-in of the tree reduction
+    output:
+        - list of flat numpy arrays, see reduce_data_tile
+    """
+    columns = [active[0]]
+    for column in [None if passive is None else passive[0], key]:
+        if column is not None and column not in columns:
+            columns.append(column)
+    partials = [
+        dask.delayed(_partition_data_tile)(
+            partition, active, passive, key, aggregate_fn, edges
+        )
+        for partition in df[columns].to_delayed()
+    ]
+    combine = dask.delayed(_combine_data_tiles)
+    while len(partials) > 1:
+        partials = [
+            combine(partials[i : i + split_every], aggregate_fn)
+            for i in range(0, len(partials), split_every)
+        ]
+    return dask.compute(partials[0])[0]
+
+
+def _calc_data_tile_partitions(
+    df,
+    active_view: Type[BaseChart],
+    passive_view: Type[BaseChart],
+    aggregate_fn: str = "",
+    cumsum: bool = True,
+    return_format="pandas",
+):
+    """
+    description:
+        calculate the datatile of a dask_cudf/dask dataframe, see
+        _reduce_partitions. df is not modified
+    input:
+        - df -> dask_cudf/dask dataframe
+        - active_view -> chart class
+        - passive_view -> chart class
+        - aggregate_fn: count/sum/mean/min/max/median/p<percentile>/nunique
+        - cumsum: bool
+        - return_format: pandas/arrow/numpy/bokeh.models.ColumnDataSource
+    output:
+        - datatile in return_format, list of [sum, count] datatiles
+        for aggregate_fn=mean, [sketches, value bucket edges] for
+        median/p<percentile>, see assets.datatiles.QuantileDataTile,
+        HyperLogLog registers for nunique, see assets.datatiles.HLLDataTile
+    """
+    key = passive_view.y if passive_view.y is not None else passive_view.x
+    if len(aggregate_fn) == 0:
+        aggregate_fn = passive_view.aggregate_fn
+    active, passive = _get_binning(active_view), _get_binning(passive_view)
+    shape = tuple(
+        int(round((max_value - min_value) / stride)) + 1
+        for _, min_value, max_value, stride in [passive, active]
+    )
+    if get_quantile(aggregate_fn) is not None:
+        edges = get_sketch_edges(*get_min_max(df, key))
+        results = _reduce_partitions(
+            df, active, passive, key, aggregate_fn, edges
+        )
+        return [
+            _format_data_tile(
+                results,
+                shape + (len(edges) - 1,),
+                cumsum,
+                _get_sketch_format(return_format),
+            ),
+            edges,
+        ]
+    results = _reduce_partitions(df, active, passive, key, aggregate_fn)
+    if aggregate_fn == "nunique":
+        return _format_data_tile(
+            results,
+            shape + (1 << HLL_PRECISION,),
+            False,
+            _get_sketch_format(return_format),
+        )
+    return _format_data_tile(results, shape, cumsum, return_format)
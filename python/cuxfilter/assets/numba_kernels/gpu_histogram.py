@@ -1,13 +1,15 @@
 import cudf
+import cupy as cp
 import dask_cudf
 import gc
 from typing import Type
 
 from ...charts.core.core_chart import BaseChart
+from ..datatiles.quantile import get_quantile
 
 
 def calc_value_counts(
-    a_gpu, stride, min_value, data_points, custom_binning=False
+    a_gpu, stride, min_value, data_points, custom_binning=False, bin_ids=None
 ):
     """
     description:
@@ -15,9 +17,26 @@ def calc_value_counts(
     input:
         - a_gpu: gpu array(cuda ndarray) -> 1-column only
         - bins: number of bins
+        - bin_ids: (bin_ids, n_bins) of a_gpu for the custom binning, see
+        cudf_utils.get_bin_ids, counted with a bincount instead of binning
+        a_gpu again
     output:
         frequencies(ndarray), bin_edge_values(ndarray)
     """
+    if custom_binning and bin_ids is not None:
+        bin_ids, n_bins = bin_ids
+        counts = cp.get_array_module(bin_ids).bincount(
+            bin_ids[bin_ids < n_bins], minlength=n_bins
+        )
+        # only the bins holding values, like value_counts
+        index = counts.nonzero()[0]
+        return (
+            (
+                cp.asnumpy(index).astype(a_gpu.dtype),
+                cp.asnumpy(counts[index]),
+            ),
+            len(index),
+        )
     if isinstance(a_gpu, dask_cudf.core.Series):
         if not custom_binning:
             val_count = a_gpu.value_counts()
@@ -54,6 +73,13 @@ def calc_groupby(chart: Type[BaseChart], data, agg=None):
     output:
         frequencies(ndarray), bin_edge_values(ndarray)
     """
+    aggregates = {chart.y: chart.aggregate_fn} if agg is None else agg
+    if any(
+        fn == "nunique" or get_quantile(fn) is not None
+        for fn in aggregates.values()
+    ):
+        return _calc_groupby_quantiles(chart, data, aggregates)
+
     temp_df = data[[chart.x]].dropna(subset=[chart.x])
 
     if agg is None:
@@ -101,6 +127,40 @@ def calc_groupby(chart: Type[BaseChart], data, agg=None):
     return groupby_res.to_numpy().transpose()
 
 
+def _calc_groupby_quantiles(chart: Type[BaseChart], data, agg):
+    """
+    description:
+        groupby of calc_groupby with median/p<percentile> or nunique
+        aggregates, computed as exact quantiles and distinct counts.
+        dask_cudf dataframes are reduced to the grouped columns and
+        computed first
+    input:
+        - chart
+        - data
+        - agg: dict of column -> aggregate function
+    output:
+        x values and aggregates per x value (ndarray)
+    """
+    temp_df = data[[chart.x] + list(agg)].dropna(subset=[chart.x])
+    if isinstance(temp_df, dask_cudf.core.DataFrame):
+        temp_df = temp_df.compute()
+
+    groupby = temp_df.groupby(by=[chart.x], sort=True)
+    columns = []
+    for key, agg_fn in agg.items():
+        quantile = get_quantile(agg_fn)
+        if quantile is None:
+            columns.append(groupby[key].agg(agg_fn))
+        else:
+            columns.append(groupby[key].quantile(quantile))
+    groupby_res = cudf.concat(columns, axis=1).reset_index().to_pandas()
+
+    del temp_df
+    gc.collect()
+
+    return groupby_res.to_numpy().transpose()
+
+
 def aggregated_column_unique(chart: Type[BaseChart], data):
     """
     description:
@@ -0,0 +1,314 @@
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+import itertools
+import json
+import threading
+import time
+
+from .cache import sizeof
+
+DEFAULT_PROFILE_INTERACTIONS = 100
+_MISSING = object()
+
+
+def payload_nbytes(args, kwargs):
+    """
+    description:
+        number of bytes of the column data passed to a model update, the
+        dicts, lists and arrays of args and kwargs. Dataframes are skipped,
+        they are formatted server side before reaching the models
+    input:
+        - args: tuple of positional arguments
+        - kwargs: dict of keyword arguments
+    output:
+        - int
+    """
+    return sum(
+        sizeof(value)
+        for value in itertools.chain(args, kwargs.values())
+        if not hasattr(value, "memory_usage")
+    )
+
+
+class InteractionProfiler:
+    """
+    Timing spans of the interactions of a dashboard, opt-in.
+
+    instrument() wraps a method of an object, a dashboard, chart or
+    interactive image, with a span of a phase (query, datatile, render...)
+    attributed to a chart, and restore() unwraps all of them. Spans run
+    while an interaction is open, from any thread, e.g. the refresh pool,
+    are recorded in it; a span without an open interaction opens its own,
+    e.g. the render of a pan/zoom.
+
+    Spans nest: duration is the wall time of a span, self time excludes
+    the spans it runs in the same thread. The last max_interactions
+    interactions are kept.
+    """
+
+    def __init__(self, max_interactions=DEFAULT_PROFILE_INTERACTIONS):
+        """
+        Parameters
+        ----------
+        max_interactions: number of interactions kept, the oldest are
+            dropped first
+        """
+        self.enabled = False
+        self.interactions = deque(maxlen=max_interactions)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._current = None
+        self._instrumented = []
+
+    def set_max_interactions(self, max_interactions):
+        """
+        keep the last max_interactions interactions from now on
+        """
+        self.interactions = deque(self.interactions, maxlen=max_interactions)
+
+    def clear(self):
+        """
+        drop the recorded interactions
+        """
+        self.interactions.clear()
+
+    def instrument(self, obj, name, phase, chart=None, payload=False):
+        """
+        wrap the method name of obj in a span, already wrapped methods are
+        skipped
+
+        Parameters
+        ----------
+        obj: object of the method, the method is replaced on the object
+        name: method name
+        phase: phase of the span
+        chart: name of the chart the span is attributed to, None for the
+            dashboard
+        payload: record payload_nbytes of the arguments
+        """
+        method = getattr(obj, name)
+        if getattr(method, "_profiler", None) is self:
+            return
+        span = self.span
+
+        def wrapper(*args, **kwargs):
+            nbytes = payload_nbytes(args, kwargs) if payload else 0
+            with span(phase, chart, nbytes):
+                return method(*args, **kwargs)
+
+        wrapper._profiler = self
+        previous = obj.__dict__.get(name, _MISSING)
+        self._instrumented.append((obj, name, previous, wrapper))
+        setattr(obj, name, wrapper)
+
+    def restore(self):
+        """
+        unwrap the methods wrapped by instrument, in reverse order
+        """
+        while self._instrumented:
+            obj, name, previous, wrapper = self._instrumented.pop()
+            if obj.__dict__.get(name) is not wrapper:
+                # replaced since, e.g. a regenerated interactive image
+                continue
+            if previous is _MISSING:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, previous)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _open(self, name):
+        record = {
+            "id": next(self._ids),
+            "name": name,
+            "start": time.time(),
+            "duration_ms": None,
+            "payload_bytes": 0,
+            "spans": [],
+        }
+        self._current = (record, time.perf_counter())
+        return self._current
+
+    def _close(self, current):
+        record, start = current
+        record["duration_ms"] = (time.perf_counter() - start) * 1000
+        with self._lock:
+            if self._current is current:
+                self._current = None
+            self.interactions.append(record)
+
+    @contextmanager
+    def interaction(self, name):
+        """
+        record the spans run until exit as the interaction name, nested
+        interactions are part of the open one
+        """
+        current = None
+        if self.enabled:
+            with self._lock:
+                if self._current is None:
+                    current = self._open(name)
+        if current is None:
+            yield
+            return
+        try:
+            yield
+        finally:
+            self._close(current)
+
+    def run(self, name, fn):
+        """
+        run fn as the interaction name, see interaction
+        """
+        with self.interaction(name):
+            return fn()
+
+    def run_split(self, name, compute):
+        """
+        run compute, the compute step of an interaction returning its
+        apply step (see InteractionScheduler), as the interaction name.
+        The returned apply step is recorded in the same interaction, which
+        is closed once it ran
+        """
+        current = None
+        if self.enabled:
+            with self._lock:
+                if self._current is None:
+                    current = self._open(name)
+        if current is None:
+            return compute()
+        try:
+            apply = compute()
+        except Exception:
+            self._close(current)
+            raise
+        with self._lock:
+            # other interactions may run until the apply step
+            if self._current is current:
+                self._current = None
+        return partial(self._run_apply, current, apply)
+
+    def _run_apply(self, current, apply):
+        with self._lock:
+            if self._current is None:
+                self._current = current
+        try:
+            if apply is not None:
+                apply()
+        finally:
+            self._close(current)
+
+    @contextmanager
+    def span(self, phase, chart=None, payload_bytes=0):
+        """
+        time the code run until exit as a span of phase, attributed to
+        chart, with payload_bytes bytes sent to the models
+        """
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        opened = None
+        with self._lock:
+            if self._current is None and len(stack) == 0:
+                opened = self._open(chart or phase)
+            current = self._current
+        children = [0.0]
+        stack.append(children)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            if len(stack) > 0:
+                stack[-1][0] += duration
+            if current is not None:
+                record, interaction_start = current
+                span = {
+                    "phase": phase,
+                    "chart": chart,
+                    "offset_ms": (start - interaction_start) * 1000,
+                    "duration_ms": duration * 1000,
+                    "self_ms": (duration - children[0]) * 1000,
+                    "payload_bytes": payload_bytes,
+                    "thread": threading.current_thread().name,
+                }
+                with self._lock:
+                    record["spans"].append(span)
+                    record["payload_bytes"] += payload_bytes
+            if opened is not None:
+                self._close(opened)
+
+    def get_interactions(self, last=None):
+        """
+        the last recorded interactions, all if last is None, oldest first
+        """
+        interactions = list(self.interactions)
+        if last is not None:
+            interactions = interactions[-last:] if last > 0 else []
+        return interactions
+
+    def summary(self, last=None):
+        """
+        description:
+            cost of the last interactions per chart and phase, most
+            expensive (self time) first
+        input:
+            - last: number of interactions, all if None
+        output:
+            - list of dicts with chart, phase, calls, self_ms, total_ms,
+            mean_ms, max_ms and payload_bytes
+        """
+        rows = {}
+        for record in self.get_interactions(last):
+            for span in record["spans"]:
+                key = (span["chart"], span["phase"])
+                if key not in rows:
+                    rows[key] = {
+                        "chart": span["chart"],
+                        "phase": span["phase"],
+                        "calls": 0,
+                        "self_ms": 0.0,
+                        "total_ms": 0.0,
+                        "mean_ms": 0.0,
+                        "max_ms": 0.0,
+                        "payload_bytes": 0,
+                    }
+                row = rows[key]
+                row["calls"] += 1
+                row["self_ms"] += span["self_ms"]
+                row["total_ms"] += span["duration_ms"]
+                row["max_ms"] = max(row["max_ms"], span["duration_ms"])
+                row["payload_bytes"] += span["payload_bytes"]
+        for row in rows.values():
+            row["mean_ms"] = row["total_ms"] / row["calls"]
+        return sorted(rows.values(), key=lambda row: -row["self_ms"])
+
+    def to_json(self, path=None, last=None):
+        """
+        description:
+            JSON export of the last interactions, with their spans, and of
+            their summary, for offline analysis
+        input:
+            - path: str, file written if given
+            - last: number of interactions, all if None
+        output:
+            - JSON str
+        """
+        result = json.dumps(
+            {
+                "interactions": self.get_interactions(last),
+                "summary": self.summary(last),
+            },
+            indent=1,
+        )
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(result)
+        return result
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import logging
+import threading
+
+
+class _DocumentQueue:
+    """
+    events of a document waiting for their compute step
+    """
+
+    def __init__(self):
+        self.pending = OrderedDict()
+        self.running = False
+
+
+class InteractionScheduler:
+    """
+    Latest-wins queue of the interactions of a dashboard, per document
+    (browser session). Every event is submitted under a key, the name of
+    the chart it comes from, and an event still waiting in the queue of
+    its document is replaced by the next event of the same chart, so a
+    fast slider drag only computes the states the dashboard has time for
+    instead of building a backlog.
+
+    An event is split in a compute step, which does not touch the bokeh
+    models and runs in a worker thread, off the IOLoop of the document,
+    and the apply step it returns, which changes the models. The apply
+    steps of the events computed together run in a next tick callback of
+    the document, on its IOLoop, in a single doc.hold() batch, so the
+    browser receives one set of patches, and the IOLoop keeps serving the
+    sessions while the next events are computed.
+
+    Without a served document (notebooks, tests), events run immediately.
+    """
+
+    def __init__(self, executor=None):
+        """
+        Parameters
+        ----------
+        executor: concurrent.futures.Executor running the compute steps, a
+            single worker thread by default, so interactions are computed
+            one at a time
+        """
+        self._executor = executor
+        self._queues = dict()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def submit(self, key, compute, doc=None):
+        """
+        queue an event, replacing the queued event of the same key and
+        document
+
+        Parameters
+        ----------
+        key: hashable, events of the same key are coalesced
+        compute: callable without arguments, run in the worker thread,
+            returning the apply step of the event, a callable without
+            arguments run on the document thread, or None
+        doc: bokeh Document of the session, None runs the event now
+        """
+        self.submitted += 1
+        if doc is None or getattr(doc, "session_context", None) is None:
+            self._run_batch([compute])
+            return
+        with self._lock:
+            queue = self._queues.get(doc)
+            if queue is None:
+                queue = self._queues[doc] = _DocumentQueue()
+            if queue.pending.pop(key, None) is not None:
+                self.dropped += 1
+            queue.pending[key] = compute
+            if queue.running:
+                return
+            queue.running = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="cuxfilter-interactions"
+                )
+        self._executor.submit(self._compute, doc)
+
+    def _compute(self, doc):
+        """
+        compute the queued events of doc, and post their apply steps to
+        doc, until its queue is empty
+        """
+        while True:
+            with self._lock:
+                queue = self._queues.get(doc)
+                if queue is None:
+                    return
+                if len(queue.pending) == 0:
+                    # idle documents are not kept
+                    del self._queues[doc]
+                    return
+                events = list(queue.pending.values())
+                queue.pending.clear()
+            applies = []
+            for compute in events:
+                try:
+                    apply = compute()
+                except Exception:
+                    logging.exception("cuxfilter interaction failed")
+                    continue
+                if apply is not None:
+                    applies.append(apply)
+            try:
+                doc.add_next_tick_callback(
+                    partial(self._apply_batch, doc, applies)
+                )
+            except Exception:
+                # e.g. the session of the document was closed
+                logging.exception("cuxfilter interactions dropped")
+                with self._lock:
+                    self._queues.pop(doc, None)
+                return
+
+    def _apply_batch(self, doc, applies):
+        with doc.hold("combine"):
+            self.batches += 1
+            for apply in applies:
+                try:
+                    apply()
+                except Exception:
+                    logging.exception("cuxfilter interaction failed")
+
+    def _run_batch(self, events):
+        self.batches += 1
+        for compute in events:
+            apply = compute()
+            if apply is not None:
+                apply()
+
+    def info(self):
+        """
+        number of submitted events, dropped stale events, applied batches
+        and pending events as a dictionary
+        """
+        with self._lock:
+            pending = sum(
+                len(queue.pending) for queue in self._queues.values()
+            )
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "pending": pending,
+        }
@@ -0,0 +1,99 @@
+import itertools
+
+import numpy as np
+
+from .crossfilter import _get_array_module
+
+
+class RowSelection:
+    """
+    Compact set of selected rows of a dataframe of n_rows rows, for
+    selections that are not expressible as a query, e.g. lasso selections.
+    The rows are kept as int32 row ids, or as a bitmask of n_rows bits
+    when the selection holds more than 1/32 of the rows, whichever is
+    smaller, in the array module (numpy/cupy) of the mask they come from.
+
+    Every selection has a unique id in its repr, so two selections never
+    share a filter state of the dashboard.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, n_rows, row_ids=None, bitmask=None, n_selected=None):
+        """
+        Parameters
+        ----------
+        n_rows: number of rows of the dataframe
+        row_ids: sorted row ids of the selected rows, or
+        bitmask: np.packbits of the selection mask
+        n_selected: number of selected rows, counted if None
+        """
+        self.n_rows = n_rows
+        self.row_ids = row_ids
+        self.bitmask = bitmask
+        self.id = next(self._ids)
+        if n_selected is None:
+            n_selected = (
+                len(row_ids)
+                if row_ids is not None
+                else int(self.to_mask().sum())
+            )
+        self.n_selected = n_selected
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        selection of the rows of a numpy/cupy boolean mask
+        """
+        xp = _get_array_module(mask)
+        n_rows = len(mask)
+        n_selected = int(mask.sum())
+        if n_selected * 32 > n_rows:
+            return cls(
+                n_rows, bitmask=xp.packbits(mask), n_selected=n_selected
+            )
+        return cls.from_row_ids(xp.nonzero(mask)[0], n_rows)
+
+    @classmethod
+    def from_row_ids(cls, row_ids, n_rows):
+        """
+        selection of the sorted numpy/cupy row ids of a dataframe of
+        n_rows rows
+        """
+        xp = _get_array_module(row_ids)
+        if len(row_ids) * 32 > n_rows:
+            mask = xp.zeros(n_rows, dtype=bool)
+            mask[row_ids] = True
+            return cls(
+                n_rows, bitmask=xp.packbits(mask), n_selected=len(row_ids)
+            )
+        if n_rows <= np.iinfo(np.int32).max:
+            row_ids = row_ids.astype(np.int32)
+        return cls(n_rows, row_ids=row_ids)
+
+    def __len__(self):
+        return self.n_selected
+
+    def __repr__(self):
+        return (
+            f"RowSelection(id={self.id}, n_rows={self.n_rows}, "
+            f"n_selected={self.n_selected})"
+        )
+
+    @property
+    def nbytes(self):
+        if self.row_ids is not None:
+            return self.row_ids.nbytes
+        return self.bitmask.nbytes
+
+    def to_mask(self):
+        """
+        boolean mask of the n_rows rows
+        """
+        if self.bitmask is not None:
+            xp = _get_array_module(self.bitmask)
+            return xp.unpackbits(self.bitmask)[: self.n_rows].astype(bool)
+        xp = _get_array_module(self.row_ids)
+        mask = xp.zeros(self.n_rows, dtype=bool)
+        mask[self.row_ids] = True
+        return mask
@@ -0,0 +1,199 @@
+import numpy as np
+
+# average number of points per cell of a GridIndex
+POINTS_PER_CELL = 32
+MAX_CELLS_PER_AXIS = 2048
+
+
+def points_in_polygon(x, y, xs, ys):
+    """
+    description:
+        exact even-odd (crossing number) point in polygon test, vectorized
+        over the points, one pass per polygon edge
+    input:
+        - x, y: float ndarrays of the point coordinates
+        - xs, ys: vertices of the polygon, implicitly closed
+    output:
+        - boolean ndarray, NaN points are outside
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    inside = np.zeros(len(x), dtype=bool)
+    x_j, y_j = xs[-1], ys[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for x_i, y_i in zip(xs, ys):
+            crosses = (y_i > y) != (y_j > y)
+            x_cross = (x_j - x_i) * (y - y_i) / (y_j - y_i) + x_i
+            inside ^= crosses & (x < x_cross)
+            x_j, y_j = x_i, y_i
+    return inside
+
+
+def _ranges(starts, stops):
+    """
+    concatenation of arange(start, stop) for every (start, stop)
+    """
+    lengths = stops - starts
+    keep = lengths > 0
+    starts, lengths = starts[keep], lengths[keep]
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+class GridIndex:
+    """
+    Uniform grid index of a set of points for polygon (lasso) selections.
+    Points are bucketed once in cells of a grid over their bounding box,
+    and sorted by cell.
+
+    A polygon query only visits the cells of the bounding box of the
+    polygon. Cells crossed by an edge of the polygon run the exact
+    crossing test on their points, the other cells are entirely inside or
+    outside the polygon, decided by their center, and their points are
+    accepted or skipped wholesale. Small lassos on large point clouds
+    therefore only touch the points near the lasso.
+    """
+
+    def __init__(self, x, y, points_per_cell=POINTS_PER_CELL):
+        """
+        Parameters
+        ----------
+        x, y: float64 ndarrays of the point coordinates, NaN for nulls
+        points_per_cell: average number of points per cell
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.n_rows = len(self.x)
+        valid = ~(np.isnan(self.x) | np.isnan(self.y))
+        if valid.any():
+            self.x_min, self.x_max = self.x[valid].min(), self.x[valid].max()
+            self.y_min, self.y_max = self.y[valid].min(), self.y[valid].max()
+        else:
+            self.x_min = self.x_max = self.y_min = self.y_max = 0.0
+        n_axis = int(np.sqrt(max(valid.sum(), 1) / points_per_cell))
+        self.n_x = self.n_y = min(max(n_axis, 1), MAX_CELLS_PER_AXIS)
+        self.cell_width = (self.x_max - self.x_min) / self.n_x or 1.0
+        self.cell_height = (self.y_max - self.y_min) / self.n_y or 1.0
+
+        cells = np.full(self.n_rows, self.n_x * self.n_y, dtype=np.int64)
+        cell_x, cell_y = self._cells(self.x[valid], self.y[valid])
+        cells[valid] = cell_y * self.n_x + cell_x
+        # point ids sorted by cell, invalid points last, and the offset of
+        # the points of every cell
+        self.order = np.argsort(cells, kind="stable")
+        if self.n_rows <= np.iinfo(np.int32).max:
+            self.order = self.order.astype(np.int32)
+        self.offsets = np.searchsorted(
+            cells[self.order], np.arange(self.n_x * self.n_y + 1)
+        )
+
+    @property
+    def nbytes(self):
+        return (
+            self.x.nbytes
+            + self.y.nbytes
+            + self.order.nbytes
+            + self.offsets.nbytes
+        )
+
+    def _cells(self, x, y):
+        cell_x = np.floor((x - self.x_min) / self.cell_width)
+        cell_y = np.floor((y - self.y_min) / self.cell_height)
+        return (
+            np.clip(cell_x, 0, self.n_x - 1).astype(np.int64),
+            np.clip(cell_y, 0, self.n_y - 1).astype(np.int64),
+        )
+
+    def _boundary_cells(self, xs, ys, x0, y0, shape):
+        """
+        cells of the window starting at cell (x0, y0) crossed by an edge
+        of the polygon. Edges are sampled every half cell, and the cells
+        next to a sampled cell are included, a superset of the cells the
+        edges cross
+        """
+        boundary = np.zeros(shape, dtype=bool)
+        step = 0.5 * min(self.cell_width, self.cell_height)
+        x_a, y_a = xs, ys
+        x_b, y_b = np.roll(xs, -1), np.roll(ys, -1)
+        n_samples = np.ceil(np.hypot(x_b - x_a, y_b - y_a) / step)
+        n_samples = n_samples.astype(np.int64) + 1
+        edge = np.repeat(np.arange(len(xs)), n_samples)
+        t = _ranges(np.zeros(len(xs), np.int64), n_samples) / np.repeat(
+            np.maximum(n_samples - 1, 1), n_samples
+        )
+        cell_x, cell_y = self._cells(
+            x_a[edge] + t * (x_b - x_a)[edge],
+            y_a[edge] + t * (y_b - y_a)[edge],
+        )
+        boundary[cell_y - y0, cell_x - x0] = True
+        dilated = boundary.copy()
+        dilated[1:] |= boundary[:-1]
+        dilated[:-1] |= boundary[1:]
+        boundary = dilated.copy()
+        dilated[:, 1:] |= boundary[:, :-1]
+        dilated[:, :-1] |= boundary[:, 1:]
+        return dilated
+
+    def query_polygon(self, xs, ys):
+        """
+        description:
+            row ids of the points inside the polygon (xs, ys), see
+            points_in_polygon
+        input:
+            - xs, ys: vertices of the polygon, implicitly closed
+        output:
+            - sorted int ndarray of row ids
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if (
+            len(xs) < 3
+            or self.n_rows == 0
+            or xs.max() < self.x_min
+            or xs.min() > self.x_max
+            or ys.max() < self.y_min
+            or ys.min() > self.y_max
+        ):
+            return self.order[:0]
+
+        # window of the cells of the bounding box of the polygon
+        (x0, x1), (y0, y1) = self._cells(
+            np.array([xs.min(), xs.max()]), np.array([ys.min(), ys.max()])
+        )
+        shape = (y1 - y0 + 1, x1 - x0 + 1)
+        boundary = self._boundary_cells(xs, ys, x0, y0, shape)
+        window_y, window_x = np.indices(shape)
+        cells = (window_y + y0) * self.n_x + window_x + x0
+
+        # cells without edges are entirely inside or outside the polygon
+        centers_x = self.x_min + (window_x + x0 + 0.5) * self.cell_width
+        centers_y = self.y_min + (window_y + y0 + 0.5) * self.cell_height
+        inner = ~boundary
+        inner[inner] = points_in_polygon(
+            centers_x[inner], centers_y[inner], xs, ys
+        )
+
+        accepted = self.order[
+            _ranges(self.offsets[cells[inner]], self.offsets[cells[inner] + 1])
+        ]
+        candidates = self.order[
+            _ranges(
+                self.offsets[cells[boundary]],
+                self.offsets[cells[boundary] + 1],
+            )
+        ]
+        candidates = candidates[
+            points_in_polygon(self.x[candidates], self.y[candidates], xs, ys)
+        ]
+        return np.sort(np.concatenate([accepted, candidates]))
+
+    def query_polygon_mask(self, xs, ys):
+        """
+        boolean mask of the points inside the polygon (xs, ys), see
+        query_polygon
+        """
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.query_polygon(xs, ys)] = True
+        return mask
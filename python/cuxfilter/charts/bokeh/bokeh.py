@@ -29,7 +29,12 @@ def bar(
 
     add_interaction: {True, False},  default True
 
-    aggregate_fn: {'count', 'mean'},  default 'count'
+    aggregate_fn: {'count', 'mean', 'median', 'p<percentile>', 'nunique'},
+    default 'count'
+        'median' and percentiles such as 'p95' of the y column are
+        crossfiltered from quantile sketches, within one 64th of the
+        range of the y column. 'nunique' distinct counts are crossfiltered
+        from HyperLogLog sketches, with a relative error of about 6.5%
 
     width: int,  default 400
 
@@ -110,7 +115,12 @@ def line(
 
     add_interaction: {True, False},  default True
 
-    aggregate_fn: {'count', 'mean'},  default 'count'
+    aggregate_fn: {'count', 'mean', 'median', 'p<percentile>', 'nunique'},
+    default 'count'
+        'median' and percentiles such as 'p95' of the y column are
+        crossfiltered from quantile sketches, within one 64th of the
+        range of the y column. 'nunique' distinct counts are crossfiltered
+        from HyperLogLog sketches, with a relative error of about 6.5%
 
     width: int,  default 400
 
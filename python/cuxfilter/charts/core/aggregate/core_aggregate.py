@@ -1,8 +1,10 @@
+from functools import partial
 import panel as pn
 import numpy as np
 from bokeh.models import DatetimeTickFormatter
 
 from ..core_chart import BaseChart
+from ..core_widget import is_slider_drag
 from ....assets.numba_kernels import calc_groupby, calc_value_counts
 from ....layouts import chart_view
 from ...constants import (
@@ -11,7 +13,8 @@ from ...constants import (
     DATATILE_ACTIVE_COLOR,
     DATATILE_INACTIVE_COLOR,
 )
-from ....assets.cudf_utils import get_min_max
+from ....assets.cudf_utils import get_min_max, get_range_mask
+from ....assets.datatiles import get_quantile, to_datatile_index
 
 
 class BaseAggregateChart(BaseChart):
@@ -173,6 +176,9 @@ class BaseAggregateChart(BaseChart):
             else:
                 self.use_data_tiles = False
 
+        # bin ids of the custom binning, shared by the histogram and the
+        # datatiles, otherwise computed once the stride is known
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.calculate_source(dashboard_cls._cuxfilter_df.data)
         self.generate_chart()
         self.apply_mappers()
@@ -195,14 +201,37 @@ class BaseAggregateChart(BaseChart):
 
         Ouput:
         """
+        self.format_source_data(
+            self.compute_source(data, patch_update), patch_update
+        )
+
+    def compute_source(self, data, patch_update=False):
+        """
+        Description: source of the chart for data, {"X": [], "Y": []},
+            computed without touching the chart models
+
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+            patch_update: all the x-axis bins of the current source are
+                kept, bins missing from data are set to zero
+        -------------------------------------------
+
+        Ouput:
+            dict passed to format_source_data
+        """
         if self.y == self.x or self.y is None:
             # it's a histogram
+            bin_ids = None
+            if self.custom_binning and self.stride is not None:
+                bin_ids = self.get_bin_ids(data)
             df, self.data_points = calc_value_counts(
                 data[self.x],
                 self.stride,
                 self.min_value,
                 self.data_points,
                 self.custom_binning,
+                bin_ids=bin_ids,
             )
             if self.data_points > 50_000:
                 print(
@@ -213,7 +242,11 @@ class BaseAggregateChart(BaseChart):
                     "enforce custom binning for smooth crossfiltering",
                 )
         else:
-            self.aggregate_fn = "mean"
+            if (
+                self.aggregate_fn != "nunique"
+                and get_quantile(self.aggregate_fn) is None
+            ):
+                self.aggregate_fn = "mean"
             df = calc_groupby(self, data)
             if self.data_points is None:
                 self.data_points = len(df[0])
@@ -253,7 +286,51 @@ class BaseAggregateChart(BaseChart):
                 "Y": y_axis_data,
             }
 
-        self.format_source_data(dict_temp, patch_update)
+        return dict_temp
+
+    def compute_reload(self, data, patch_update=True):
+        """
+        Description: compute step of reload_chart, see
+            BaseChart.compute_reload
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+            patch_update: bool
+        -------------------------------------------
+
+        Ouput:
+            callable formatting the new source
+        """
+        return partial(
+            self.format_source_data,
+            self.compute_source(data, patch_update),
+            patch_update,
+        )
+
+    def compute_update(self, update, *args, **kwargs):
+        """
+        Description: compute step of an update of the chart, the datatile
+            queries are computed outside the document thread and reset the
+            chart in the apply step, see BaseChart.compute_update
+        -------------------------------------------
+        Input:
+            update: name of the update method
+            args, kwargs: arguments of the update method
+        -------------------------------------------
+
+        Ouput:
+            apply step, callable without arguments
+        """
+        if update == "query_chart_by_range":
+            return partial(
+                self.reset_chart, self.compute_query_by_range(*args, **kwargs)
+            )
+        if update == "query_chart_by_indices":
+            return partial(
+                self.reset_chart,
+                self.compute_query_by_indices(*args, **kwargs),
+            )
+        return super().compute_update(update, *args, **kwargs)
 
     def add_range_slider_filter(self, dashboard_cls):
         """
@@ -286,16 +363,31 @@ class BaseAggregateChart(BaseChart):
                 sizing_mode="scale_width",
             )
 
-        def filter_widget_callback(event):
+        def update(event, dragging):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles()
             query_tuple = self._xaxis_np_dt64_transform(event.new)
-            dashboard_cls._query_datatiles_by_range(query_tuple)
+            # while the slider is dragged, "value" changes are answered
+            # within the frame budget, "value_throttled" refines the
+            # charts when it is released
+            dashboard_cls._query_datatiles_by_range(
+                query_tuple, dragging=dragging
+            )
+
+        def filter_widget_callback(event):
+            # only the latest value of a fast drag is applied, a drag is
+            # told from the value_throttled of the slider when the event
+            # is received
+            dragging = is_slider_drag(self.filter_widget, event)
+            dashboard_cls._schedule(self, lambda: update(event, dragging))
 
         # add callback to filter_Widget on value change
+        throttled = hasattr(self.filter_widget, "value_throttled")
         self.filter_widget.param.watch(
-            filter_widget_callback, ["value"], onlychanged=False
+            filter_widget_callback,
+            ["value", "value_throttled"] if throttled else ["value"],
+            onlychanged=False,
         )
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
@@ -324,6 +416,27 @@ class BaseAggregateChart(BaseChart):
             query_local_variables_dict.pop(self.x + "_min", None)
             query_local_variables_dict.pop(self.x + "_max", None)
 
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data within the range of
+            the filter widget, see compute_query_dict
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        -------------------------------------------
+
+        Ouput:
+        """
+        if self.filter_widget is None or self.filter_widget.value == (
+            self.filter_widget.start,
+            self.filter_widget.end,
+        ):
+            return None
+        return get_range_mask(
+            data[self.x],
+            *self._xaxis_np_dt64_transform(self.filter_widget.value),
+        )
+
     def add_events(self, dashboard_cls):
         """
         Description:
@@ -360,6 +473,17 @@ class BaseAggregateChart(BaseChart):
         # add callback to reset chart button
         self.add_event(self.reset_event, reset_callback)
 
+    def get_datatile_indices(self):
+        """
+        datatile row of each x-axis entry of the chart
+        """
+        if self.custom_binning:
+            return np.array(self.source.data[self.data_x_axis]).astype(int)
+        return (
+            (self.source.data[self.data_x_axis] - self.min_value)
+            / self.stride
+        ).astype(int)
+
     def query_chart_by_range(self, active_chart, query_tuple, datatile):
         """
         Description:
@@ -369,79 +493,35 @@ class BaseAggregateChart(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: datatile of active chart for
-                            current chart[type: pandas df]
+                            current chart[type: DenseDataTile]
         -------------------------------------------
 
         Ouput:
         """
-        min_val, max_val = query_tuple
-        datatile_index_min = int(
-            round((min_val - active_chart.min_value) / active_chart.stride)
+        self.reset_chart(
+            self.compute_query_by_range(active_chart, query_tuple, datatile)
         )
-        datatile_index_max = int(
-            round((max_val - active_chart.min_value) / active_chart.stride)
-        )
-        if self.custom_binning:
-            datatile_indices = self.source.data[self.data_x_axis]
-        else:
-            datatile_indices = (
-                (self.source.data[self.data_x_axis] - self.min_value)
-                / self.stride
-            ).astype(int)
-
-        if datatile_index_min == 0:
-            if self.aggregate_fn == "mean":
-                datatile_result_sum = np.array(
-                    datatile[0].loc[datatile_indices, datatile_index_max]
-                )
-                datatile_result_count = np.array(
-                    datatile[1].loc[datatile_indices, datatile_index_max]
-                )
-                datatile_result = datatile_result_sum / datatile_result_count
-            elif self.aggregate_fn in ["count", "sum", "min", "max"]:
-                datatile_result = datatile.loc[
-                    datatile_indices, datatile_index_max
-                ]
-        else:
-            datatile_index_min -= 1
-            if self.aggregate_fn == "mean":
-                datatile_max0 = datatile[0].loc[
-                    datatile_indices, datatile_index_max
-                ]
-                datatile_min0 = datatile[0].loc[
-                    datatile_indices, datatile_index_min
-                ]
-                datatile_result_sum = np.array(datatile_max0 - datatile_min0)
-
-                datatile_max1 = datatile[1].loc[
-                    datatile_indices, datatile_index_max
-                ]
-                datatile_min1 = datatile[1].loc[
-                    datatile_indices, datatile_index_min
-                ]
-                datatile_result_count = np.array(datatile_max1 - datatile_min1)
-
-                datatile_result = datatile_result_sum / datatile_result_count
-            elif self.aggregate_fn in ["count", "sum"]:
-                datatile_max = datatile.loc[
-                    datatile_indices, datatile_index_max
-                ]
-                datatile_min = datatile.loc[
-                    datatile_indices, datatile_index_min
-                ]
-                datatile_result = np.array(datatile_max - datatile_min)
-            elif self.aggregate_fn in ["min", "max"]:
-                datatile_result = np.array(
-                    getattr(
-                        datatile.loc[
-                            datatile_indices,
-                            datatile_index_min:datatile_index_max,
-                        ],
-                        self.aggregate_fn,
-                    )(axis=1, skipna=True)
-                )
 
-        self.reset_chart(datatile_result)
+    def compute_query_by_range(self, active_chart, query_tuple, datatile):
+        """
+        Description: y-axis values of query_chart_by_range, queried from
+            the datatile without touching the chart models
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: datatile of active chart for
+                            current chart[type: DenseDataTile]
+        -------------------------------------------
+
+        Ouput:
+            array passed to reset_chart
+        """
+        min_val, max_val = query_tuple
+        return datatile.query_range(
+            to_datatile_index(active_chart, min_val),
+            to_datatile_index(active_chart, max_val),
+        )
 
     def query_chart_by_indices_for_mean(
         self,
@@ -461,39 +541,14 @@ class BaseAggregateChart(BaseChart):
 
         Ouput:
         """
-        if self.custom_binning:
-            datatile_indices = self.source.data[self.data_x_axis]
-        else:
-            datatile_indices = (
-                (self.source.data[self.data_x_axis] - self.min_value)
-                / self.stride
-            ).astype(int)
         if len(new_indices) == 0 or new_indices == [""]:
-            datatile_sum_0 = np.array(
-                datatile[0].loc[datatile_indices].sum(axis=1, skipna=True)
-            )
-            datatile_sum_1 = np.array(
-                datatile[1].loc[datatile_indices].sum(axis=1, skipna=True)
-            )
-            datatile_result = datatile_sum_0 / datatile_sum_1
-            return datatile_result
-
-        len_y_axis = datatile[0][0].loc[datatile_indices].shape[0]
-
-        datatile_result = np.zeros(shape=(len_y_axis,), dtype=np.float64)
-        value_sum = np.zeros(shape=(len_y_axis,), dtype=np.float64)
-        value_count = np.zeros(shape=(len_y_axis,), dtype=np.float64)
+            return datatile.query_all()
 
-        for index in new_indices:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
+        return datatile.query_indices(
+            to_datatile_index(
+                active_chart, [index for index in new_indices if index != ""]
             )
-            value_sum += datatile[0][int(index)].loc[datatile_indices]
-            value_count += datatile[1][int(index)].loc[datatile_indices]
-
-        datatile_result = value_sum / value_count
-
-        return datatile_result
+        )
 
     def query_chart_by_indices_for_count(
         self,
@@ -513,44 +568,22 @@ class BaseAggregateChart(BaseChart):
 
         Ouput:
         """
-        if self.custom_binning:
-            datatile_indices = self.source.data[self.data_x_axis]
-        else:
-            datatile_indices = (
-                (self.source.data[self.data_x_axis] - self.min_value)
-                / self.stride
-            ).astype(int)
         if len(new_indices) == 0 or new_indices == [""]:
-            datatile_result = np.array(
-                datatile.loc[datatile_indices, :].sum(axis=1, skipna=True)
-            )
-            return datatile_result
+            return datatile.query_all()
 
         if len(old_indices) == 0 or old_indices == [""]:
-            len_y_axis = datatile.loc[datatile_indices, 0].shape[0]
-            datatile_result = np.zeros(shape=(len_y_axis,), dtype=np.float64)
+            datatile_result = np.zeros(shape=(datatile.n_rows,))
         else:
-            len_y_axis = datatile.loc[datatile_indices, 0].shape[0]
             datatile_result = np.array(
                 self.get_source_y_axis(), dtype=np.float64
-            )[:len_y_axis]
-
-        for index in calc_new:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_result += np.array(
-                datatile.loc[datatile_indices, int(index)]
-            )
-
-        for index in remove_old:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_result -= np.array(
-                datatile.loc[datatile_indices, int(index)]
-            )
+            )[: datatile.n_rows]
 
+        datatile_result += datatile.query_indices(
+            to_datatile_index(active_chart, calc_new)
+        )
+        datatile_result -= datatile.query_indices(
+            to_datatile_index(active_chart, remove_old)
+        )
         return datatile_result
 
     def query_chart_by_indices_for_minmax(
@@ -565,34 +598,9 @@ class BaseAggregateChart(BaseChart):
 
         Ouput:
         """
-        if self.custom_binning:
-            datatile_indices = self.source.data[self.data_x_axis]
-        else:
-            datatile_indices = (
-                (self.source.data[self.data_x_axis] - self.min_value)
-                / self.stride
-            ).astype(int)
-
-        if len(new_indices) == 0 or new_indices == [""]:
-            # get min or max from datatile df, skipping column 0(always 0)
-            datatile_result = np.array(
-                getattr(datatile.loc[datatile_indices, 1:], self.aggregate_fn)(
-                    axis=1, skipna=True
-                )
-            )
-        else:
-            new_indices = np.array(new_indices)
-            new_indices = np.round(
-                (new_indices - active_chart.min_value) / active_chart.stride
-            ).astype(int)
-            datatile_result = np.array(
-                getattr(
-                    datatile.loc[datatile_indices, list(new_indices)],
-                    self.aggregate_fn,
-                )(axis=1, skipna=True)
-            )
-
-        return datatile_result
+        return self.query_chart_by_indices_for_mean(
+            active_chart, old_indices, new_indices, datatile, [], []
+        )
 
     def query_chart_by_indices(
         self, active_chart, old_indices, new_indices, datatile
@@ -605,10 +613,33 @@ class BaseAggregateChart(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: datatile of active chart for
-                        current chart[type: pandas df]
+                        current chart[type: DenseDataTile]
+        -------------------------------------------
+
+        Ouput:
+        """
+        self.reset_chart(
+            self.compute_query_by_indices(
+                active_chart, old_indices, new_indices, datatile
+            )
+        )
+
+    def compute_query_by_indices(
+        self, active_chart, old_indices, new_indices, datatile
+    ):
+        """
+        Description: y-axis values of query_chart_by_indices, queried from
+            the datatile without touching the chart models
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. old_indices, new_indices: previous and new selected values
+            3. datatile: datatile of active chart for
+                        current chart[type: DenseDataTile]
         -------------------------------------------
 
         Ouput:
+            array passed to reset_chart
         """
         calc_new = list(set(new_indices) - set(old_indices))
         remove_old = list(set(old_indices) - set(new_indices))
@@ -636,8 +667,13 @@ class BaseAggregateChart(BaseChart):
                 calc_new,
                 remove_old,
             )
-        elif self.aggregate_fn in ["min", "max"]:
+        elif (
+            self.aggregate_fn in ["min", "max", "nunique"]
+            or get_quantile(self.aggregate_fn) is not None
+        ):
+            # quantile sketches and distinct count registers are merged
+            # over the new indices
             datatile_result = self.query_chart_by_indices_for_minmax(
                 active_chart, old_indices, new_indices, datatile,
             )
-        self.reset_chart(datatile_result)
+        return datatile_result
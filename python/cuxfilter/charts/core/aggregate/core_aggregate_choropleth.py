@@ -6,6 +6,7 @@ from ..core_chart import BaseChart
 from ....assets.numba_kernels import calc_groupby
 from ....assets import geo_json_mapper
 from ....assets.cudf_utils import get_min_max
+from ....assets.datatiles import get_quantile, to_datatile_index
 from ...constants import CUXF_NAN_COLOR
 
 np.seterr(divide="ignore", invalid="ignore")
@@ -141,6 +142,7 @@ class BaseChoropleth(BaseChart):
             dashboard_cls._cuxfilter_df.data[self.x].dtype,
         )
 
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.calculate_source(dashboard_cls._cuxfilter_df.data)
         self.generate_chart()
         self.apply_mappers()
@@ -250,6 +252,22 @@ class BaseChoropleth(BaseChart):
             indices_string = ",".join(map(str, list_of_indices))
             query_str_dict[self.name] = f"{self.x} in ({indices_string})"
 
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data in the selected
+            regions, see compute_query_dict
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        -------------------------------------------
+
+        Ouput:
+        """
+        list_of_indices = self.get_selected_indices()
+        if len(list_of_indices) == 0 or list_of_indices == [""]:
+            return None
+        return data[self.x].isin(list(list_of_indices))
+
     def add_events(self, dashboard_cls):
         """
         Description:
@@ -317,6 +335,19 @@ class BaseChoropleth(BaseChart):
         """
         print("function to be overridden by library specific extensions")
 
+    def get_datatile_indices(self):
+        """
+        datatile row of each x-axis entry of the chart
+        """
+        return (
+            (self.source.data[self.x] - self.min_value) / self.stride
+        ).astype(int)
+
+    def _get_aggregate_fn(self, key):
+        if key == self.color_column:
+            return self.color_aggregate_fn
+        return self.elevation_aggregate_fn
+
     def query_chart_by_range(self, active_chart, query_tuple, datatile_dict):
         """
         Description:
@@ -326,103 +357,21 @@ class BaseChoropleth(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: datatile of active chart for
-                            current chart[type: pandas df]
+                            current chart[type: dict of DenseDataTile]
         -------------------------------------------
 
         Ouput:
         """
+        min_val, max_val = query_tuple
+        datatile_index_min = to_datatile_index(active_chart, min_val)
+        datatile_index_max = to_datatile_index(active_chart, max_val)
         for key in datatile_dict:
-            datatile = datatile_dict[key]
-            datatile_result = None
-            min_val, max_val = query_tuple
-            datatile_index_min = int(
-                round((min_val - active_chart.min_value) / active_chart.stride)
+            self.reset_chart(
+                datatile_dict[key].query_range(
+                    datatile_index_min, datatile_index_max
+                ),
+                key,
             )
-            datatile_index_max = int(
-                round((max_val - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_indices = (
-                (self.source.data[self.x] - self.min_value) / self.stride
-            ).astype(int)
-
-            if key == self.color_column:
-                temp_agg_function = self.color_aggregate_fn
-            elif self.elevation_column is not None:
-                temp_agg_function = self.elevation_aggregate_fn
-
-            if datatile_index_min == 0:
-
-                if temp_agg_function == "mean":
-                    datatile_result_sum = np.array(
-                        datatile[0].loc[datatile_indices, datatile_index_max]
-                    )
-                    datatile_result_count = np.array(
-                        datatile[1].loc[datatile_indices, datatile_index_max]
-                    )
-                    datatile_result = (
-                        datatile_result_sum / datatile_result_count
-                    )
-                elif temp_agg_function in ["count", "sum"]:
-                    datatile_result = datatile.loc[
-                        datatile_indices, datatile_index_max
-                    ]
-                elif temp_agg_function in ["min", "max"]:
-                    datatile_result = np.array(
-                        getattr(
-                            datatile.loc[datatile_indices, 1:],
-                            temp_agg_function,
-                        )(axis=1, skipna=True)
-                    )
-            else:
-                datatile_index_min -= 1
-                if temp_agg_function == "mean":
-                    datatile_max0 = datatile[0].loc[
-                        datatile_indices, datatile_index_max
-                    ]
-                    datatile_min0 = datatile[0].loc[
-                        datatile_indices, datatile_index_min
-                    ]
-                    datatile_result_sum = np.array(
-                        datatile_max0 - datatile_min0
-                    )
-
-                    datatile_max1 = datatile[1].loc[
-                        datatile_indices, datatile_index_max
-                    ]
-                    datatile_min1 = datatile[1].loc[
-                        datatile_indices, datatile_index_min
-                    ]
-                    datatile_result_count = np.array(
-                        datatile_max1 - datatile_min1
-                    )
-
-                    datatile_result = (
-                        datatile_result_sum / datatile_result_count
-                    )
-                elif temp_agg_function in ["count", "sum"]:
-                    datatile_max = datatile.loc[
-                        datatile_indices, datatile_index_max
-                    ]
-                    datatile_min = datatile.loc[
-                        datatile_indices, datatile_index_min
-                    ]
-                    datatile_result = np.array(datatile_max - datatile_min)
-                elif temp_agg_function in ["min", "max"]:
-                    datatile_result = np.array(
-                        getattr(
-                            datatile.loc[
-                                datatile_indices,
-                                datatile_index_min:datatile_index_max,
-                            ],
-                            temp_agg_function,
-                        )(axis=1, skipna=True)
-                    )
-
-            if datatile_result is not None:
-                if isinstance(datatile_result, np.ndarray):
-                    self.reset_chart(datatile_result, key)
-                else:
-                    self.reset_chart(np.array(datatile_result), key)
 
     def query_chart_by_indices_for_mean(
         self,
@@ -442,39 +391,14 @@ class BaseChoropleth(BaseChart):
 
         Ouput:
         """
-        datatile_indices = (
-            (self.source.data[self.x] - self.min_value) / self.stride
-        ).astype(int)
         if len(new_indices) == 0 or new_indices == [""]:
-            datatile_sum_0 = np.array(
-                datatile[0].loc[datatile_indices].sum(axis=1, skipna=True)
-            )
-            datatile_sum_1 = np.array(
-                datatile[1].loc[datatile_indices].sum(axis=1, skipna=True)
-            )
-            datatile_result = datatile_sum_0 / datatile_sum_1
-            return datatile_result
-
-        len_y_axis = datatile[0][0].loc[datatile_indices].shape[0]
+            return datatile.query_all()
 
-        datatile_result = np.zeros(shape=(len_y_axis,), dtype=np.float64)
-        value_sum = np.zeros(shape=(len_y_axis,), dtype=np.float64)
-        value_count = np.zeros(shape=(len_y_axis,), dtype=np.float64)
-
-        for index in new_indices:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            value_sum += np.array(
-                datatile[0][int(index)].loc[datatile_indices]
+        return datatile.query_indices(
+            to_datatile_index(
+                active_chart, [index for index in new_indices if index != ""]
             )
-            value_count += np.array(
-                datatile[1][int(index)].loc[datatile_indices]
-            )
-
-        datatile_result = value_sum / value_count
-
-        return datatile_result
+        )
 
     def query_chart_by_indices_for_count(
         self,
@@ -495,39 +419,22 @@ class BaseChoropleth(BaseChart):
 
         Ouput:
         """
-        datatile_indices = (
-            (self.source.data[self.x] - self.min_value) / self.stride
-        ).astype(int)
         if len(new_indices) == 0 or new_indices == [""]:
-            datatile_result = np.array(
-                datatile.loc[datatile_indices, :].sum(axis=1, skipna=True)
-            )
-            return datatile_result
+            return datatile.query_all()
 
         if len(old_indices) == 0 or old_indices == [""]:
-            len_y_axis = datatile[0].loc[datatile_indices].shape[0]
-            datatile_result = np.zeros(shape=(len_y_axis,), dtype=np.float64)
+            datatile_result = np.zeros(shape=(datatile.n_rows,))
         else:
-            len_y_axis = datatile[0].loc[datatile_indices].shape[0]
             datatile_result = np.array(
                 self.source.data[key], dtype=np.float64
-            )[:len_y_axis]
+            )[: datatile.n_rows]
 
-        for index in calc_new:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_result += np.array(
-                datatile.loc[datatile_indices, int(index)]
-            )
-
-        for index in remove_old:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_result -= np.array(
-                datatile.loc[datatile_indices, int(index)]
-            )
+        datatile_result += datatile.query_indices(
+            to_datatile_index(active_chart, calc_new)
+        )
+        datatile_result -= datatile.query_indices(
+            to_datatile_index(active_chart, remove_old)
+        )
         return datatile_result
 
     def query_chart_by_indices_for_minmax(
@@ -547,30 +454,9 @@ class BaseChoropleth(BaseChart):
 
         Ouput:
         """
-        datatile_indices = (
-            (self.source.data[self.x] - self.min_value) / self.stride
-        ).astype(int)
-
-        if len(new_indices) == 0 or new_indices == [""]:
-            # get min or max from datatile df, skipping column 0(always 0)
-            datatile_result = np.array(
-                getattr(datatile.loc[datatile_indices, 1:], temp_agg_function)(
-                    axis=1, skipna=True
-                )
-            )
-        else:
-            new_indices = np.array(new_indices)
-            new_indices = np.round(
-                (new_indices - active_chart.min_value) / active_chart.stride
-            ).astype(int)
-            datatile_result = np.array(
-                getattr(
-                    datatile.loc[datatile_indices, list(new_indices)],
-                    temp_agg_function,
-                )(axis=1, skipna=True)
-            )
-
-        return datatile_result
+        return self.query_chart_by_indices_for_mean(
+            active_chart, old_indices, new_indices, datatile, [], []
+        )
 
     def query_chart_by_indices(
         self, active_chart, old_indices, new_indices, datatile_dict
@@ -583,25 +469,22 @@ class BaseChoropleth(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: datatile of active chart for
-                        current chart[type: pandas df]
+                        current chart[type: dict of DenseDataTile]
         -------------------------------------------
 
         Ouput:
         """
-        for key in datatile_dict:
-            datatile = datatile_dict[key]
-            calc_new = list(set(new_indices) - set(old_indices))
-            remove_old = list(set(old_indices) - set(new_indices))
+        calc_new = list(set(new_indices) - set(old_indices))
+        remove_old = list(set(old_indices) - set(new_indices))
 
-            if "" in calc_new:
-                calc_new.remove("")
-            if "" in remove_old:
-                remove_old.remove("")
+        if "" in calc_new:
+            calc_new.remove("")
+        if "" in remove_old:
+            remove_old.remove("")
 
-            if key == self.color_column:
-                temp_agg_function = self.color_aggregate_fn
-            elif self.elevation_column is not None:
-                temp_agg_function = self.elevation_aggregate_fn
+        for key in datatile_dict:
+            datatile = datatile_dict[key]
+            temp_agg_function = self._get_aggregate_fn(key)
 
             if temp_agg_function == "mean":
                 datatile_result = self.query_chart_by_indices_for_mean(
@@ -622,7 +505,12 @@ class BaseChoropleth(BaseChart):
                     remove_old,
                     key,
                 )
-            elif temp_agg_function in ["min", "max"]:
+            elif (
+                temp_agg_function in ["min", "max", "nunique"]
+                or get_quantile(temp_agg_function) is not None
+            ):
+                # quantile sketches and distinct count registers are merged
+                # over the new indices
                 datatile_result = self.query_chart_by_indices_for_minmax(
                     active_chart,
                     old_indices,
@@ -630,7 +518,4 @@ class BaseChoropleth(BaseChart):
                     datatile,
                     temp_agg_function,
                 )
-            if isinstance(datatile_result, np.ndarray):
-                self.reset_chart(datatile_result, key)
-            else:
-                self.reset_chart(np.array(datatile_result), key)
+            self.reset_chart(datatile_result, key)
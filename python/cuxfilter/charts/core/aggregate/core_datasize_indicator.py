@@ -1,5 +1,6 @@
 from ..core_chart import BaseChart
 from ....layouts import chart_view
+from ....assets.datatiles import to_datatile_index
 
 
 class BaseDataSizeIndicator(BaseChart):
@@ -69,28 +70,16 @@ class BaseDataSizeIndicator(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: datatile of active chart for current
-                        chart[type:pandas df]
+                        chart[type: DenseDataTile]
         -------------------------------------------
 
         Ouput:
         """
         min_val, max_val = query_tuple
-
-        datatile_index_min = int(
-            round((min_val - active_chart.min_value) / active_chart.stride)
-        )
-        datatile_index_max = int(
-            round((max_val - active_chart.min_value) / active_chart.stride)
-        )
-
-        if datatile_index_min == 0:
-            datatile_result = datatile.loc[datatile_index_max].values
-        else:
-            datatile_index_min -= 1
-            datatile_max_values = datatile.loc[datatile_index_max].values
-            datatile_min_values = datatile.loc[datatile_index_min].values
-            datatile_result = datatile_max_values - datatile_min_values
-
+        datatile_result = datatile.query_range(
+            to_datatile_index(active_chart, min_val),
+            to_datatile_index(active_chart, max_val),
+        )[0]
         self.reset_chart(datatile_result)
 
     def query_chart_by_indices_for_count(
@@ -112,25 +101,19 @@ class BaseDataSizeIndicator(BaseChart):
         Ouput:
         """
         if len(new_indices) == 0 or new_indices == [""]:
-            datatile_result = datatile.cumsum().values[-1]
-            return datatile_result
+            return datatile.query_all()[0]
 
         if len(old_indices) == 0 or old_indices == [""]:
             datatile_result = 0
         else:
             datatile_result = self.get_source_y_axis()
 
-        for index in calc_new:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_result += datatile.loc[int(index)][0]
-
-        for index in remove_old:
-            index = int(
-                round((index - active_chart.min_value) / active_chart.stride)
-            )
-            datatile_result -= datatile.loc[int(index)][0]
+        datatile_result += datatile.query_indices(
+            to_datatile_index(active_chart, calc_new)
+        )[0]
+        datatile_result -= datatile.query_indices(
+            to_datatile_index(active_chart, remove_old)
+        )[0]
 
         return datatile_result
 
@@ -145,7 +128,7 @@ class BaseDataSizeIndicator(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: datatile of active chart for
-                        current chart[type:pandas df]
+                        current chart[type: DenseDataTile]
         -------------------------------------------
 
         Ouput:
@@ -0,0 +1,45 @@
+import dask.dataframe as dd
+
+from ...assets.cudf_utils import get_bin_ids
+
+
+class BinIdMixin:
+    """
+    Datatile bin ids of the rows of the dataframe of the dashboard for the
+    binning (x, min_value, max_value, stride) of a chart or widget, kept
+    in the bin id cache of the dashboard, see cudf_utils.BinIdCache
+    """
+
+    _bin_id_cache = None
+
+    def compute_bin_ids(self, bin_id_cache):
+        """
+        Description: materialize the datatile bin id of every row of the
+            dataframe of the dashboard for the binning of the chart, in
+            the bin id cache of the dashboard, reused by get_bin_ids
+        -----------------------------------------------------------------
+        Input:
+            bin_id_cache: cudf_utils.BinIdCache
+        """
+        self._bin_id_cache = bin_id_cache
+        data = bin_id_cache.source
+        if self.stride and data[self.x].dtype.kind in "biuf":
+            self.get_bin_ids(data)
+
+    def get_bin_ids(self, data):
+        """
+        Description: (bin_ids, n_bins) of the rows of data for the binning
+            of the chart, see cudf_utils.get_bin_ids. The bin ids of the
+            dataframe of the dashboard are computed once per binning, and
+            gathered for the filtered frames of the dashboard, see
+            cudf_utils.BinIdCache. None for dask dataframes
+        -----------------------------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if isinstance(data, dd.DataFrame):
+            return None
+        binning = (self.x, self.min_value, self.max_value, self.stride)
+        if self._bin_id_cache is None:
+            return get_bin_ids(data, *binning)
+        return self._bin_id_cache.get(data, *binning)
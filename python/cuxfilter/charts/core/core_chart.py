@@ -1,5 +1,6 @@
 import cudf
 import dask_cudf
+from functools import partial
 import logging
 import panel as pn
 from bokeh.models import ColumnDataSource
@@ -7,9 +8,12 @@ from panel.config import panel_extension
 from typing import Dict
 
 from ...assets import datetime as dt
+from ...assets.cudf_utils import get_point_values
+from ...assets.spatial import GridIndex
+from .core_bin_ids import BinIdMixin
 
 
-class BaseChart:
+class BaseChart(BinIdMixin):
     chart_type: str = None
     x: str = None
     y: str = None
@@ -26,6 +30,7 @@ class BaseChart:
     _library_specific_params: Dict[str, str] = {}
     stride = None
     stride_type = int
+    _spatial_index = None
     min_value: float = 0.0
     max_value: float = 0.0
     x_label_map = {}
@@ -238,3 +243,80 @@ class BaseChart:
         """
         # print('function to be overridden by library specific extensions')
         return -1
+
+    def get_datatile_indices(self):
+        """
+        datatile row of each x-axis entry of the chart, None maps all
+        datatile rows in order
+        """
+        return None
+
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data passing the current
+            filter of the chart, the clause of compute_query_dict. None if
+            the chart does not filter data
+        -----------------------------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        """
+        return None
+
+    def compute_reload(self, data, patch_update=False):
+        """
+        Description: compute step of reload_chart(data, patch_update): the
+            new source of the chart, computed without touching its
+            bokeh/panel models. Charts without a separate compute step
+            reload in the apply step
+        -----------------------------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+            patch_update: bool
+        -----------------------------------------------------------------
+        Ouput:
+            apply step, callable without arguments applying the new source
+            to the models
+        """
+        return partial(self.reload_chart, data, patch_update)
+
+    def compute_update(self, update, *args, **kwargs):
+        """
+        Description: split an update of the chart, the method update
+            (reload_chart, query_chart_by_range or query_chart_by_indices)
+            called with args and kwargs, in a compute step run now, which
+            does not touch the models and can run outside the document
+            thread, and an apply step changing the models, returned to be
+            run on the document thread, see DashBoard._update_charts
+        -----------------------------------------------------------------
+        Input:
+            update: name of the update method
+            args, kwargs: arguments of the update method
+        -----------------------------------------------------------------
+        Ouput:
+            apply step, callable without arguments
+        """
+        if update == "reload_chart":
+            return self.compute_reload(*args, **kwargs)
+        return partial(getattr(self, update), *args, **kwargs)
+
+    def get_spatial_index(self, data, x, y):
+        """
+        Description: grid index of the points of the x and y columns of
+            data for lasso selections, see assets/spatial.py. Built once
+            per dataframe and columns, datetimes as int64
+        -----------------------------------------------------------------
+        Input:
+            data: cudf.DataFrame
+            x, y: column names
+        -----------------------------------------------------------------
+        Ouput:
+            GridIndex
+        """
+        cached = self._spatial_index
+        if cached is None or cached[0] is not data or cached[1] != (x, y):
+            index = GridIndex(
+                get_point_values(self._to_xaxis_type(data[x])),
+                get_point_values(self._to_yaxis_type(data[y])),
+            )
+            cached = self._spatial_index = (data, (x, y), index)
+        return cached[2]
@@ -8,9 +8,30 @@ from typing import Dict
 
 from ...layouts import chart_view
 from ...assets import datetime as dt
-
-
-class BaseWidget:
+from .core_bin_ids import BinIdMixin
+
+
+def is_slider_drag(widget, event):
+    """
+    Description: whether a value event of a slider is part of a drag. A
+        dragged slider sends its value, and its value_throttled once it
+        is released, so the value of a drag is ahead of value_throttled.
+        A value set programmatically, or the value_throttled event of the
+        release, is not a drag
+    -----------------------------------------------------------------
+    Input:
+        widget: panel slider
+        event: param event of widget.value or widget.value_throttled
+    -----------------------------------------------------------------
+    Ouput:
+        bool
+    """
+    if event.name != "value" or "value_throttled" not in widget.param:
+        return False
+    return event.new != widget.value_throttled
+
+
+class BaseWidget(BinIdMixin):
     chart_type: str = None
     x: str = None
     color: str = None
@@ -132,3 +153,14 @@ class BaseWidget:
         # No reload functionality, added function for consistency
         # with other charts
         return -1
+
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data passing the current
+            filter of the chart, the clause of compute_query_dict. None if
+            the chart does not filter data
+        -----------------------------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        """
+        return None
@@ -1,10 +1,10 @@
 from typing import Tuple
 import dask_cudf
 import cudf
-import cuspatial
 import dask.dataframe as dd
 
 from ..core_chart import BaseChart
+from ....assets.cudf_utils import get_range_mask
 from ....layouts import chart_view
 from ...constants import CUXF_DEFAULT_COLOR_PALETTE
 
@@ -225,17 +225,10 @@ class BaseGraph(BaseChart):
         """
 
         def lasso_callback(xs, ys):
-            # convert datetime to int64 since, point_in_polygon does not
-            # support datetime
-            indices = cuspatial.point_in_polygon(
-                self._to_xaxis_type(self.nodes[self.node_x]),
-                self._to_yaxis_type(self.nodes[self.node_y]),
-                cudf.Series([0], index=["selection"]),
-                [0],
-                xs,
-                ys,
-            )
-            nodes = self.source[indices.selection]
+            row_ids = self.get_spatial_index(
+                self.nodes, self.node_x, self.node_y
+            ).query_polygon(xs, ys)
+            nodes = self.nodes.iloc[row_ids]
             edges = None
 
             if self.inspect_neighbors._active:
@@ -248,34 +241,16 @@ class BaseGraph(BaseChart):
             dashboard_cls._reload_charts(data=nodes, ignore_cols=[self.name])
 
             # reload graph chart separately as it has an extra edges argument
-            self.reload_chart(nodes=nodes, edges=edges)
+            dashboard_cls._update_charts(
+                [(self, "reload_chart", (), {"nodes": nodes, "edges": edges})]
+            )
             del nodes, edges
 
         def box_callback(xmin, xmax, ymin, ymax):
             self.x_range = (xmin, xmax)
             self.y_range = (ymin, ymax)
 
-            query = (
-                f"@{self.node_x}_min<={self.node_x}<=@{self.node_x}_max"
-                + f" and @{self.node_y}_min<={self.node_y}<=@{self.node_y}_max"
-            )
-            temp_str_dict = {
-                **dashboard_cls._query_str_dict,
-                **{self.name: query},
-            }
-            temp_local_dict = {
-                **dashboard_cls._query_local_variables_dict,
-                **{
-                    self.node_x + "_min": xmin,
-                    self.node_x + "_max": xmax,
-                    self.node_y + "_min": ymin,
-                    self.node_y + "_max": ymax,
-                },
-            }
-            nodes = dashboard_cls._query(
-                dashboard_cls._generate_query_str(temp_str_dict),
-                temp_local_dict,
-            )
+            nodes = dashboard_cls._filter(include_charts=[self])
 
             edges = None
 
@@ -289,10 +264,12 @@ class BaseGraph(BaseChart):
             dashboard_cls._reload_charts(data=nodes, ignore_cols=[self.name])
 
             # reload graph chart separately as it has an extra edges argument
-            self.reload_chart(nodes=nodes, edges=edges)
+            dashboard_cls._update_charts(
+                [(self, "reload_chart", (), {"nodes": nodes, "edges": edges})]
+            )
             del nodes, edges
 
-        def selection_callback(event):
+        def update(event):
             if dashboard_cls._active_view != self.name:
                 # reset previous active view and
                 # set current chart as active view
@@ -314,6 +291,13 @@ class BaseGraph(BaseChart):
                 ys = self._to_yaxis_type(event.geometry["y"])
                 lasso_callback(xs, ys)
 
+        def selection_callback(event):
+            if event.geometry["type"] == "poly" and not event.final:
+                # lasso selections are applied when they are completed
+                return
+            # only the latest selection of a fast drag is applied
+            dashboard_cls._schedule(self, lambda: update(event))
+
         return selection_callback
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
@@ -349,6 +333,23 @@ class BaseGraph(BaseChart):
             ]:
                 query_local_variables_dict.pop(key, None)
 
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data within the selected box,
+            see compute_query_dict
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        -------------------------------------------
+
+        Ouput:
+        """
+        if self.x_range is None or self.y_range is None:
+            return None
+        return get_range_mask(
+            data[self.node_x], *self.x_range
+        ) & get_range_mask(data[self.node_y], *self.y_range)
+
     def add_events(self, dashboard_cls):
         """
         Description:
@@ -388,7 +389,7 @@ class BaseGraph(BaseChart):
             self.y_range = None
             dashboard_cls._query_str_dict.pop(self.name, None)
 
-            nodes = dashboard_cls._query(dashboard_cls._generate_query_str())
+            nodes = dashboard_cls._filter()
             dashboard_cls._reload_charts(nodes)
             # reload graph chart separately as it has an extra edges argument
             self.reload_chart(nodes=nodes)
@@ -404,6 +405,7 @@ class BaseGraph(BaseChart):
         datatile=None,
         query="",
         local_dict={},
+        data=None,
     ):
         """
         Description:
@@ -413,15 +415,51 @@ class BaseGraph(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
+        -------------------------------------------
+
+        Ouput:
+        """
+        self.reload_chart(
+            self.compute_query_by_range(
+                active_chart, query_tuple, datatile, query, local_dict, data
+            )
+        )
+
+    def compute_query_by_range(
+        self,
+        active_chart: BaseChart,
+        query_tuple,
+        datatile=None,
+        query="",
+        local_dict={},
+        data=None,
+    ):
+        """
+        Description: rows of query_chart_by_range
+
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
         -------------------------------------------
 
         Ouput:
+            rows reloaded by the chart
         """
         min_val, max_val = query_tuple
+        if data is not None:
+            return data
         final_query = f"@min_val<={active_chart.x}<=@max_val"
         if len(query) > 0:
             final_query += f" and {query}"
-        self.reload_chart(self.nodes.query(final_query, local_dict),)
+        return self.nodes.query(final_query, local_dict)
 
     def query_chart_by_indices(
         self,
@@ -431,6 +469,7 @@ class BaseGraph(BaseChart):
         datatile=None,
         query="",
         local_dict={},
+        data=None,
     ):
         """
         Description:
@@ -440,12 +479,55 @@ class BaseGraph(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
         -------------------------------------------
 
         Ouput:
         """
+        self.reload_chart(
+            self.compute_query_by_indices(
+                active_chart,
+                old_indices,
+                new_indices,
+                datatile,
+                query,
+                local_dict,
+                data,
+            )
+        )
+
+    def compute_query_by_indices(
+        self,
+        active_chart: BaseChart,
+        old_indices,
+        new_indices,
+        datatile=None,
+        query="",
+        local_dict={},
+        data=None,
+    ):
+        """
+        Description: rows of query_chart_by_indices
+
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
+        -------------------------------------------
+
+        Ouput:
+            rows reloaded by the chart
+        """
         if "" in new_indices:
             new_indices.remove("")
+        if data is not None:
+            return data
         if len(new_indices) == 0:
             # case: all selected indices were reset
             # reset the chart
@@ -460,11 +542,33 @@ class BaseGraph(BaseChart):
             if len(query) > 0:
                 final_query += f" and {query}"
 
-        self.reload_chart(
-            self.nodes.query(final_query, local_dict)
-            if len(final_query) > 0
-            else self.nodes
-        )
+        if len(final_query) > 0:
+            return self.nodes.query(final_query, local_dict)
+        return self.nodes
+
+    def compute_update(self, update, *args, **kwargs):
+        """
+        Description: compute step of an update of the chart, the queried
+            rows are reloaded in a compute and an apply step, see
+            BaseChart.compute_update
+        -------------------------------------------
+        Input:
+            update: name of the update method
+            args, kwargs: arguments of the update method
+        -------------------------------------------
+
+        Ouput:
+            apply step, callable without arguments
+        """
+        if update == "query_chart_by_range":
+            return self.compute_reload(
+                self.compute_query_by_range(*args, **kwargs)
+            )
+        if update == "query_chart_by_indices":
+            return self.compute_reload(
+                self.compute_query_by_indices(*args, **kwargs)
+            )
+        return super().compute_update(update, *args, **kwargs)
 
     def add_selection_geometry_event(self, callback):
         """
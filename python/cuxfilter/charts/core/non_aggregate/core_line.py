@@ -1,9 +1,10 @@
 import panel as pn
 
 from .core_non_aggregate import BaseNonAggregate
+from ..core_widget import is_slider_drag
 from ....layouts import chart_view
 from ...constants import BOOL_MAP, CUDF_DATETIME_TYPES
-from ....assets.cudf_utils import get_min_max
+from ....assets.cudf_utils import get_min_max, get_range_mask
 
 
 class BaseLine(BaseNonAggregate):
@@ -169,16 +170,31 @@ class BaseLine(BaseNonAggregate):
                 sizing_mode="scale_width",
             )
 
-        def filter_widget_callback(event):
+        def update(event, dragging):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles()
             query_tuple = self._xaxis_np_dt64_transform(event.new)
-            dashboard_cls._query_datatiles_by_range(query_tuple)
+            # while the slider is dragged, "value" changes are answered
+            # within the frame budget, "value_throttled" refines the
+            # charts when it is released
+            dashboard_cls._query_datatiles_by_range(
+                query_tuple, dragging=dragging
+            )
+
+        def filter_widget_callback(event):
+            # only the latest value of a fast drag is applied, a drag is
+            # told from the value_throttled of the slider when the event
+            # is received
+            dragging = is_slider_drag(self.filter_widget, event)
+            dashboard_cls._schedule(self, lambda: update(event, dragging))
 
         # add callback to filter_Widget on value change
+        throttled = hasattr(self.filter_widget, "value_throttled")
         self.filter_widget.param.watch(
-            filter_widget_callback, ["value"], onlychanged=False
+            filter_widget_callback,
+            ["value", "value_throttled"] if throttled else ["value"],
+            onlychanged=False,
         )
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
@@ -210,6 +226,27 @@ class BaseLine(BaseNonAggregate):
             for key in [self.x + "_min", self.x + "_max"]:
                 query_local_variables_dict.pop(key, None)
 
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data within the range of
+            the filter widget, see compute_query_dict
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        -------------------------------------------
+
+        Ouput:
+        """
+        if self.filter_widget is None or self.filter_widget.value == (
+            self.filter_widget.start,
+            self.filter_widget.end,
+        ):
+            return None
+        return get_range_mask(
+            data[self.x],
+            *self._xaxis_np_dt64_transform(self.filter_widget.value),
+        )
+
     def add_events(self, dashboard_cls):
         """
         Description:
@@ -1,10 +1,10 @@
 from typing import Tuple
-import cudf
-import cuspatial
 import dask_cudf
 import dask.dataframe as dd
 
 from ..core_chart import BaseChart
+from ....assets.cudf_utils import get_range_mask
+from ....assets.selection import RowSelection
 from ....layouts import chart_view
 
 
@@ -21,6 +21,9 @@ class BaseNonAggregate(BaseChart):
     reset_event = None
     x_range: Tuple = None
     y_range: Tuple = None
+    # rows of the lasso selection, not expressible as a query, applied by
+    # the dashboard as a mask, see compute_filter_mask
+    selection: RowSelection = None
     aggregate_col = None
     use_data_tiles = False
 
@@ -84,60 +87,44 @@ class BaseNonAggregate(BaseChart):
         """
 
         def lasso_callback(xs, ys):
-            # convert datetime to int64 since, point_in_polygon does not
-            # support datetime
-            indices = cuspatial.point_in_polygon(
-                self._to_xaxis_type(self.source[self.x]),
-                self._to_yaxis_type(self.source[self.y]),
-                cudf.Series([0], index=["selection"]),
-                [0],
-                xs,
-                ys,
-            )
-            temp_data = self.source[indices.selection]
+            # row ids of the selection refer to the dashboard dataframe
+            data = dashboard_cls._cuxfilter_df.data
+            row_ids = self.get_spatial_index(
+                data, self.x, self.y
+            ).query_polygon(xs, ys)
+            # the selected rows are kept as row ids in the filter state of
+            # the dashboard, instead of a copy of the selected frame
+            self.x_range = None
+            self.y_range = None
+            self.selection = RowSelection.from_row_ids(row_ids, len(data))
+
+            temp_data = dashboard_cls._filter(include_charts=[self])
             # reload all charts with new queried data (cudf.DataFrame only)
             dashboard_cls._reload_charts(
-                data=temp_data, ignore_cols=[self.name]
+                ignore_cols=[self.name], include_charts=[self]
+            )
+            dashboard_cls._update_charts(
+                [(self, "reload_chart", (temp_data, False), {})]
             )
-            self.reload_chart(temp_data, False)
             del temp_data
-            del indices
 
         def box_callback(xmin, xmax, ymin, ymax):
             self.x_range = (xmin, xmax)
             self.y_range = (ymin, ymax)
+            self.selection = None
 
-            query = (
-                f"@{self.x}_min<={self.x}<=@{self.x}_max"
-                + f" and @{self.y}_min<={self.y}<=@{self.y}_max"
-            )
-            temp_str_dict = {
-                **dashboard_cls._query_str_dict,
-                **{self.name: query},
-            }
-            temp_local_dict = {
-                **dashboard_cls._query_local_variables_dict,
-                **{
-                    self.x + "_min": xmin,
-                    self.x + "_max": xmax,
-                    self.y + "_min": ymin,
-                    self.y + "_max": ymax,
-                },
-            }
-
-            temp_data = dashboard_cls._query(
-                dashboard_cls._generate_query_str(temp_str_dict),
-                temp_local_dict,
-            )
+            temp_data = dashboard_cls._filter(include_charts=[self])
 
             # reload all charts with new queried data (cudf.DataFrame only)
             dashboard_cls._reload_charts(
-                data=temp_data, ignore_cols=[self.name]
+                ignore_cols=[self.name], include_charts=[self]
+            )
+            dashboard_cls._update_charts(
+                [(self, "reload_chart", (temp_data, False), {})]
             )
-            self.reload_chart(temp_data, False)
             del temp_data
 
-        def selection_callback(event):
+        def update(event):
             self.test_event = event
             if dashboard_cls._active_view != self.name:
                 # reset previous active view and
@@ -160,6 +147,13 @@ class BaseNonAggregate(BaseChart):
                 ys = self._to_yaxis_type(event.geometry["y"])
                 lasso_callback(xs, ys)
 
+        def selection_callback(event):
+            if event.geometry["type"] == "poly" and not event.final:
+                # lasso selections are applied when they are completed
+                return
+            # only the latest selection of a fast drag is applied
+            dashboard_cls._schedule(self, lambda: update(event))
+
         return selection_callback
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
@@ -173,7 +167,19 @@ class BaseNonAggregate(BaseChart):
 
         Ouput:
         """
-        if self.x_range is not None and self.y_range is not None:
+        range_keys = [
+            self.x + "_min",
+            self.x + "_max",
+            self.y + "_min",
+            self.y + "_max",
+        ]
+        for key in range_keys:
+            query_local_variables_dict.pop(key, None)
+        if self.selection is not None:
+            # not a query, kept by the dashboard with the row selections of
+            # the charts, see DashBoard._selection_dict
+            query_str_dict.pop(self.name, None)
+        elif self.x_range is not None and self.y_range is not None:
             query_str_dict[self.name] = (
                 f"@{self.x}_min<={self.x}<=@{self.x}_max"
                 + f" and @{self.y}_min<={self.y}<=@{self.y}_max"
@@ -187,13 +193,27 @@ class BaseNonAggregate(BaseChart):
             query_local_variables_dict.update(temp_local_dict)
         else:
             query_str_dict.pop(self.name, None)
-            for key in [
-                self.x + "_min",
-                self.x + "_max",
-                self.y + "_min",
-                self.y + "_max",
-            ]:
-                query_local_variables_dict.pop(key, None)
+
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data within the selected box,
+            or of the lasso selection, see compute_query_dict
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        -------------------------------------------
+
+        Ouput:
+        """
+        if self.selection is not None:
+            return type(data[self.x])(
+                self.selection.to_mask(), index=data.index
+            )
+        if self.x_range is None or self.y_range is None:
+            return None
+        return get_range_mask(data[self.x], *self.x_range) & get_range_mask(
+            data[self.y], *self.y_range
+        )
 
     def add_events(self, dashboard_cls):
         """
@@ -232,7 +252,9 @@ class BaseNonAggregate(BaseChart):
                 dashboard_cls._reset_current_view(new_active_view=self)
             self.x_range = None
             self.y_range = None
+            self.selection = None
             dashboard_cls._query_str_dict.pop(self.name, None)
+            dashboard_cls._selection_dict.pop(self.name, None)
             dashboard_cls._reload_charts()
 
         # add callback to reset chart button
@@ -245,6 +267,7 @@ class BaseNonAggregate(BaseChart):
         datatile=None,
         query="",
         local_dict={},
+        data=None,
     ):
         """
         Description:
@@ -254,17 +277,51 @@ class BaseNonAggregate(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
         -------------------------------------------
 
         Ouput:
         """
+        self.reload_chart(
+            self.compute_query_by_range(
+                active_chart, query_tuple, datatile, query, local_dict, data
+            ), False
+        )
+
+    def compute_query_by_range(
+        self,
+        active_chart: BaseChart,
+        query_tuple,
+        datatile=None,
+        query="",
+        local_dict={},
+        data=None,
+    ):
+        """
+        Description: rows of query_chart_by_range
+
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
+        -------------------------------------------
+
+        Ouput:
+            rows reloaded by the chart
+        """
         min_val, max_val = query_tuple
+        if data is not None:
+            return data
         final_query = "@min_val<=" + active_chart.x + "<=@max_val"
         if len(query) > 0:
             final_query += " and " + query
-        self.reload_chart(
-            self.source.query(final_query, local_dict), False,
-        )
+        return self.source.query(final_query, local_dict)
 
     def query_chart_by_indices(
         self,
@@ -274,6 +331,7 @@ class BaseNonAggregate(BaseChart):
         datatile=None,
         query="",
         local_dict={},
+        data=None,
     ):
         """
         Description:
@@ -283,12 +341,55 @@ class BaseNonAggregate(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
+        -------------------------------------------
+
+        Ouput:
+        """
+        self.reload_chart(
+            self.compute_query_by_indices(
+                active_chart,
+                old_indices,
+                new_indices,
+                datatile,
+                query,
+                local_dict,
+                data,
+            ), False
+        )
+
+    def compute_query_by_indices(
+        self,
+        active_chart: BaseChart,
+        old_indices,
+        new_indices,
+        datatile=None,
+        query="",
+        local_dict={},
+        data=None,
+    ):
+        """
+        Description: rows of query_chart_by_indices
+
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
         -------------------------------------------
 
         Ouput:
+            rows reloaded by the chart
         """
         if "" in new_indices:
             new_indices.remove("")
+        if data is not None:
+            return data
         if len(new_indices) == 0:
             # case: all selected indices were reset
             # reset the chart
@@ -303,12 +404,33 @@ class BaseNonAggregate(BaseChart):
             if len(query) > 0:
                 final_query += f" and {query}"
 
-        self.reload_chart(
-            self.source.query(final_query, local_dict)
-            if len(final_query) > 0
-            else self.source,
-            False,
-        )
+        if len(final_query) > 0:
+            return self.source.query(final_query, local_dict)
+        return self.source
+
+    def compute_update(self, update, *args, **kwargs):
+        """
+        Description: compute step of an update of the chart, the queried
+            rows are reloaded in a compute and an apply step, see
+            BaseChart.compute_update
+        -------------------------------------------
+        Input:
+            update: name of the update method
+            args, kwargs: arguments of the update method
+        -------------------------------------------
+
+        Ouput:
+            apply step, callable without arguments
+        """
+        if update == "query_chart_by_range":
+            return self.compute_reload(
+                self.compute_query_by_range(*args, **kwargs), False
+            )
+        if update == "query_chart_by_indices":
+            return self.compute_reload(
+                self.compute_query_by_indices(*args, **kwargs), False
+            )
+        return super().compute_update(update, *args, **kwargs)
 
     def add_selection_geometry_event(self, callback):
         """
@@ -3,6 +3,7 @@ import dask_cudf
 from typing import Tuple
 
 from ..core_chart import BaseChart
+from ....assets.cudf_utils import get_range_mask
 from ....layouts import chart_view
 
 
@@ -159,7 +160,7 @@ class BaseStackedLine(BaseChart):
 
         """
 
-        def selection_callback(event):
+        def update(event):
             xmin, xmax = self._xaxis_dt_transform(
                 (event.geometry["x0"], event.geometry["x1"])
             )
@@ -171,28 +172,20 @@ class BaseStackedLine(BaseChart):
 
             self.x_range = (xmin, xmax)
 
-            query = f"@{self.x}_min<={self.x}<=@{self.x}_max"
-            temp_str_dict = {
-                **dashboard_cls._query_str_dict,
-                **{self.name: query},
-            }
-            temp_local_dict = {
-                **dashboard_cls._query_local_variables_dict,
-                **{self.x + "_min": xmin, self.x + "_max": xmax},
-            }
-
-            temp_data = dashboard_cls._query(
-                dashboard_cls._generate_query_str(temp_str_dict),
-                temp_local_dict,
-            )
+            temp_data = dashboard_cls._filter(include_charts=[self])
             # reload all charts with new queried data (cudf.DataFrame only)
             dashboard_cls._reload_charts(
-                data=temp_data, ignore_cols=[self.name]
+                ignore_cols=[self.name], include_charts=[self]
+            )
+            dashboard_cls._update_charts(
+                [(self, "reload_chart", (temp_data, False), {})]
             )
-            self.reload_chart(temp_data, False)
-            # self.reload_chart(temp_data, False)
             del temp_data
 
+        def selection_callback(event):
+            # only the latest selection of a fast drag is applied
+            dashboard_cls._schedule(self, lambda: update(event))
+
         return selection_callback
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
@@ -220,6 +213,21 @@ class BaseStackedLine(BaseChart):
             for key in [self.x + "_min", self.x + "_max"]:
                 query_local_variables_dict.pop(key, None)
 
+    def compute_filter_mask(self, data):
+        """
+        Description: boolean mask of the rows of data within the selected
+            x range, see compute_query_dict
+        -------------------------------------------
+        Input:
+            data: cudf.DataFrame | dask_cudf.DataFrame
+        -------------------------------------------
+
+        Ouput:
+        """
+        if self.x_range is None or self.y_range is None:
+            return None
+        return get_range_mask(data[self.x], *self.x_range)
+
     def add_events(self, dashboard_cls):
         """
         Description:
@@ -271,6 +279,7 @@ class BaseStackedLine(BaseChart):
         datatile=None,
         query="",
         local_dict={},
+        data=None,
     ):
         """
         Description:
@@ -280,17 +289,51 @@ class BaseStackedLine(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
+        -------------------------------------------
+
+        Ouput:
+        """
+        self.reload_chart(
+            self.compute_query_by_range(
+                active_chart, query_tuple, datatile, query, local_dict, data
+            ), False
+        )
+
+    def compute_query_by_range(
+        self,
+        active_chart: BaseChart,
+        query_tuple,
+        datatile=None,
+        query="",
+        local_dict={},
+        data=None,
+    ):
+        """
+        Description: rows of query_chart_by_range
+
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
         -------------------------------------------
 
         Ouput:
+            rows reloaded by the chart
         """
         min_val, max_val = query_tuple
+        if data is not None:
+            return data
         final_query = f"@min_val<={active_chart.x}<=@max_val"
         if len(query) > 0:
             final_query += f" and {query}"
-        self.reload_chart(
-            self.source.query(final_query, local_dict), False,
-        )
+        return self.source.query(final_query, local_dict)
 
     def query_chart_by_indices(
         self,
@@ -300,6 +343,7 @@ class BaseStackedLine(BaseChart):
         datatile=None,
         query="",
         local_dict={},
+        data=None,
     ):
         """
         Description:
@@ -309,12 +353,55 @@ class BaseStackedLine(BaseChart):
             1. active_chart: chart object of active_chart
             2. query_tuple: (min_val, max_val) of the query [type: tuple]
             3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
         -------------------------------------------
 
         Ouput:
         """
+        self.reload_chart(
+            self.compute_query_by_indices(
+                active_chart,
+                old_indices,
+                new_indices,
+                datatile,
+                query,
+                local_dict,
+                data,
+            ), False
+        )
+
+    def compute_query_by_indices(
+        self,
+        active_chart: BaseChart,
+        old_indices,
+        new_indices,
+        datatile=None,
+        query="",
+        local_dict={},
+        data=None,
+    ):
+        """
+        Description: rows of query_chart_by_indices
+
+        -------------------------------------------
+        Input:
+            1. active_chart: chart object of active_chart
+            2. query_tuple: (min_val, max_val) of the query [type: tuple]
+            3. datatile: None in case of Gpu Geo Scatter charts
+            4. data: rows selected by all the charts, active chart
+                included, reloaded as is instead of querying the chart
+                source with query if given
+        -------------------------------------------
+
+        Ouput:
+            rows reloaded by the chart
+        """
         if "" in new_indices:
             new_indices.remove("")
+        if data is not None:
+            return data
         if len(new_indices) == 0:
             # case: all selected indices were reset
             # reset the chart
@@ -329,12 +416,33 @@ class BaseStackedLine(BaseChart):
             if len(query) > 0:
                 final_query += f" and {query}"
 
-        self.reload_chart(
-            self.source.query(final_query, local_dict)
-            if len(final_query) > 0
-            else self.source,
-            False,
-        )
+        if len(final_query) > 0:
+            return self.source.query(final_query, local_dict)
+        return self.source
+
+    def compute_update(self, update, *args, **kwargs):
+        """
+        Description: compute step of an update of the chart, the queried
+            rows are reloaded in a compute and an apply step, see
+            BaseChart.compute_update
+        -------------------------------------------
+        Input:
+            update: name of the update method
+            args, kwargs: arguments of the update method
+        -------------------------------------------
+
+        Ouput:
+            apply step, callable without arguments
+        """
+        if update == "query_chart_by_range":
+            return self.compute_reload(
+                self.compute_query_by_range(*args, **kwargs), False
+            )
+        if update == "query_chart_by_indices":
+            return self.compute_reload(
+                self.compute_query_by_indices(*args, **kwargs), False
+            )
+        return super().compute_update(update, *args, **kwargs)
 
     def add_selection_geometry_event(self, callback):
         """
@@ -118,6 +118,13 @@ class InteractiveImage(object):
         self.update_chart()
 
     def update_chart(self, **kwargs):
+        self.update_source(self.render(**kwargs))
+
+    def render(self, **kwargs):
+        """
+        Renders the image of the current ranges of the plot, with kwargs
+        updating the callback arguments, without updating the datasource
+        """
         dict_temp = {
             "xmin": self.p.x_range.start,
             "ymin": self.p.y_range.start,
@@ -127,15 +134,22 @@ class InteractiveImage(object):
             "h": self.p.plot_height,
         }
         self.kwargs.update(kwargs)
-        self.update_image(dict_temp)
+        return self.render_image(dict_temp)
 
     _callbacks = {}
 
     def __init__(
-        self, bokeh_plot, callback, delay=200, timeout=10000, **kwargs
+        self,
+        bokeh_plot,
+        callback,
+        delay=200,
+        timeout=10000,
+        on_update=None,
+        **kwargs,
     ):
         self.p = bokeh_plot
         self.callback = callback
+        self.on_update = on_update
         self.kwargs = kwargs
         self.ref = str(uuid.uuid4())
         self.timeout = timeout
@@ -177,6 +191,13 @@ class InteractiveImage(object):
         """
         Updates image with data returned by callback
         """
+        self.update_source(self.render_image(ranges))
+
+    def render_image(self, ranges):
+        """
+        Renders the image of ranges with the callback, returns the new data
+        of the image datasource
+        """
         x_range = (ranges["xmin"], ranges["xmax"])
         y_range = (ranges["ymin"], ranges["ymax"])
         dh = y_range[1] - y_range[0]
@@ -192,8 +213,16 @@ class InteractiveImage(object):
             dw=[dw],
             dh=[dh],
         )
+        return new_data
 
+    def update_source(self, new_data):
+        """
+        Updates the image datasource with the rendered image, then calls
+        on_update, e.g. the legend of the chart
+        """
         self.ds.data.update(new_data)
+        if self.on_update is not None:
+            self.on_update()
 
     def _repr_html_(self):
         self.doc = Document()
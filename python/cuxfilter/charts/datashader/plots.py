@@ -11,6 +11,7 @@ from .custom_extensions import (
 )
 
 from distutils.version import LooseVersion
+from functools import partial
 import datashader as ds
 from datashader import transfer_functions as tf
 from datashader.colors import Hot
@@ -153,6 +154,7 @@ class Scatter(BaseScatter):
     constant_limit = None
     color_bar = None
     legend_added = False
+    legend_stale = False
 
     def format_source_data(self, data):
         """
@@ -190,6 +192,15 @@ class Scatter(BaseScatter):
                 self.chart.add_layout(self.color_bar, self.legend_position)
                 self.legend_added = True
 
+    def update_legend(self):
+        """
+        render the legend if the color limits changed with the last
+        rendered image, called once the image is updated
+        """
+        if self.legend_stale:
+            self.legend_stale = False
+            self.render_legend()
+
     def generate_InteractiveImage_callback(self):
         """
         Description:
@@ -229,7 +240,8 @@ class Scatter(BaseScatter):
                     float(cp.nanmin(agg.data)),
                     float(cp.nanmax(agg.data)),
                 ]
-                self.render_legend()
+                # rendered once the image is updated, see update_legend
+                self.legend_stale = True
 
             span = {"span": self.constant_limit}
             if self.pixel_shade_type == "eq_hist":
@@ -305,6 +317,7 @@ class Scatter(BaseScatter):
             self.generate_InteractiveImage_callback(),
             data_source=self.source,
             timeout=self.timeout,
+            on_update=self.update_legend,
             x_dtype=self.x_dtype,
             y_dtype=self.y_dtype,
         )
@@ -339,10 +352,30 @@ class Scatter(BaseScatter):
 
         Ouput:
         """
-        if data is not None:
-            if len(data) == 0:
-                data = cudf.DataFrame({k: cp.nan for k in data.columns})
-            self.interactive_image.update_chart(data_source=data)
+        self.compute_reload(data, patch_update)()
+
+    def compute_reload(self, data=None, patch_update=False):
+        """
+        Description: compute step of reload_chart, the image of the new
+            data is rendered without updating the image datasource, see
+            BaseChart.compute_reload
+        -------------------------------------------
+        Input:
+
+        -------------------------------------------
+
+        Ouput:
+            callable updating the image datasource
+        """
+        if data is None:
+            # nothing to reload
+            return lambda: None
+        if len(data) == 0:
+            data = cudf.DataFrame({k: cp.nan for k in data.columns})
+        return partial(
+            self.interactive_image.update_source,
+            self.interactive_image.render(data_source=data),
+        )
 
     def add_selection_geometry_event(self, callback):
         """
@@ -458,6 +491,7 @@ class Graph(BaseGraph):
     constant_limit_edges = None
     color_bar = None
     legend_added = False
+    legend_stale = False
 
     def compute_colors(self):
         if self.node_color_palette is None:
@@ -502,6 +536,15 @@ class Graph(BaseGraph):
                 self.chart.add_layout(self.color_bar, self.legend_position)
                 self.legend_added = True
 
+    def update_legend(self):
+        """
+        render the legend if the color limits changed with the last
+        rendered image, called once the image is updated
+        """
+        if self.legend_stale:
+            self.legend_stale = False
+            self.render_legend()
+
     def nodes_plot(self, canvas, nodes, name=None):
         """
         plot nodes(scatter)
@@ -526,7 +569,8 @@ class Graph(BaseGraph):
                 float(cp.nanmin(agg.data)),
                 float(cp.nanmax(agg.data)),
             ]
-            self.render_legend()
+            # rendered once the image is updated, see update_legend
+            self.legend_stale = True
 
         span = {"span": self.constant_limit_nodes}
         if self.node_pixel_shade_type == "eq_hist":
@@ -773,6 +817,7 @@ class Graph(BaseGraph):
             self.generate_InteractiveImage_callback(),
             data_source=self.nodes,
             timeout=self.timeout,
+            on_update=self.update_legend,
             x_dtype=self.x_dtype,
             y_dtype=self.y_dtype,
         )
@@ -807,29 +852,49 @@ class Graph(BaseGraph):
 
         Ouput:
         """
-        if nodes is not None:
-            if len(nodes) == 0:
-                nodes = cudf.DataFrame({k: cp.nan for k in self.nodes.columns})
+        self.compute_reload(nodes, edges, patch_update)()
 
-            # update connected_edges value for datashaded edges
-            # if display edge toggle is active
-            if self.display_edges._active:
-                self.connected_edges = calc_connected_edges(
-                    nodes,
-                    self.edges if edges is None else edges,
-                    self.node_x,
-                    self.node_y,
-                    self.node_id,
-                    self.edge_source,
-                    self.edge_target,
-                    self.edge_aggregate_col,
-                    self.x_dtype,
-                    self.y_dtype,
-                    self.edge_render_type,
-                    self.curve_params,
-                )
+    def compute_reload(self, nodes, edges=None, patch_update=False):
+        """
+        Description: compute step of reload_chart, the image of the new
+            data is rendered without updating the image datasource, see
+            BaseChart.compute_reload
+        -------------------------------------------
+        Input:
+
+        -------------------------------------------
+
+        Ouput:
+            callable updating the image datasource
+        """
+        if nodes is None:
+            # nothing to reload
+            return lambda: None
+        if len(nodes) == 0:
+            nodes = cudf.DataFrame({k: cp.nan for k in self.nodes.columns})
+
+        # update connected_edges value for datashaded edges
+        # if display edge toggle is active
+        if self.display_edges._active:
+            self.connected_edges = calc_connected_edges(
+                nodes,
+                self.edges if edges is None else edges,
+                self.node_x,
+                self.node_y,
+                self.node_id,
+                self.edge_source,
+                self.edge_target,
+                self.edge_aggregate_col,
+                self.x_dtype,
+                self.y_dtype,
+                self.edge_render_type,
+                self.curve_params,
+            )
 
-            self.interactive_image.update_chart(data_source=nodes)
+        return partial(
+            self.interactive_image.update_source,
+            self.interactive_image.render(data_source=nodes),
+        )
 
     def add_selection_geometry_event(self, callback):
         """
@@ -1087,10 +1152,30 @@ class Line(BaseLine):
 
         Ouput:
         """
-        if data is not None:
-            if len(data) == 0:
-                data = cudf.DataFrame({k: cp.nan for k in data.columns})
-            self.interactive_image.update_chart(data_source=data)
+        self.compute_reload(data, patch_update)()
+
+    def compute_reload(self, data, patch_update=False):
+        """
+        Description: compute step of reload_chart, the image of the new
+            data is rendered without updating the image datasource, see
+            BaseChart.compute_reload
+        -------------------------------------------
+        Input:
+
+        -------------------------------------------
+
+        Ouput:
+            callable updating the image datasource
+        """
+        if data is None:
+            # nothing to reload
+            return lambda: None
+        if len(data) == 0:
+            data = cudf.DataFrame({k: cp.nan for k in data.columns})
+        return partial(
+            self.interactive_image.update_source,
+            self.interactive_image.render(data_source=data),
+        )
 
     def add_selection_geometry_event(self, callback):
         """
@@ -1370,10 +1455,30 @@ class StackedLines(BaseStackedLine):
 
         Ouput:
         """
-        if data is not None:
-            if len(data) == 0:
-                data = cudf.DataFrame({k: cp.nan for k in data.columns})
-            self.interactive_image.update_chart(data_source=data)
+        self.compute_reload(data, patch_update)()
+
+    def compute_reload(self, data, patch_update=False):
+        """
+        Description: compute step of reload_chart, the image of the new
+            data is rendered without updating the image datasource, see
+            BaseChart.compute_reload
+        -------------------------------------------
+        Input:
+
+        -------------------------------------------
+
+        Ouput:
+            callable updating the image datasource
+        """
+        if data is None:
+            # nothing to reload
+            return lambda: None
+        if len(data) == 0:
+            data = cudf.DataFrame({k: cp.nan for k in data.columns})
+        return partial(
+            self.interactive_image.update_source,
+            self.interactive_image.render(data_source=data),
+        )
 
     def add_selection_geometry_event(self, callback):
         """
@@ -39,19 +39,25 @@ def choropleth(
         column name from the gpu dataframe on which elevation scale
         is based on
 
-    color_aggregate_fn: {'count', 'mean', 'sum', 'min', 'max', 'std'},
-    default "count"
+    color_aggregate_fn: {'count', 'mean', 'sum', 'min', 'max', 'std',
+    'median', 'p<percentile>', 'nunique'}, default "count"
         aggregate function to be applied on the color column
-        while performing groupby aggregation by `column x`
+        while performing groupby aggregation by `column x`. 'median' and
+        percentiles such as 'p95' are crossfiltered from quantile
+        sketches, within one 64th of the range of the color column, and
+        'nunique' from HyperLogLog sketches, within about 6.5%
 
     color_factor: float, default 1
         factor to be multiplied to each value of color column before mapping
         the color
 
-    elevation_aggregate_fn: {'count', 'mean', 'sum', 'min', 'max', 'std'},
-    default "count"
+    elevation_aggregate_fn: {'count', 'mean', 'sum', 'min', 'max', 'std',
+    'median', 'p<percentile>', 'nunique'}, default "count"
         aggregate function to be applied on the elevation column
-        while performing groupby aggregation by `column x`
+        while performing groupby aggregation by `column x`. 'median' and
+        percentiles such as 'p95' are crossfiltered from quantile
+        sketches, within one 64th of the range of the elevation column, and
+        'nunique' from HyperLogLog sketches, within about 6.5%
 
     elevation_factor: float, default 1
         factor to be multiplied to each value of elevation column before
@@ -1,11 +1,12 @@
 from ..core import BaseWidget
+from ..core.core_widget import is_slider_drag
 from ..core.aggregate import BaseDataSizeIndicator
 from ..constants import (
     CUDF_DATETIME_TYPES,
     DATATILE_ACTIVE_COLOR,
     DATATILE_INACTIVE_COLOR,
 )
-from ...assets.cudf_utils import get_min_max
+from ...assets.cudf_utils import get_min_max, get_range_mask
 import panel as pn
 import dask_cudf
 
@@ -42,6 +43,7 @@ class RangeSlider(BaseWidget):
         )
 
         self.generate_widget()
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.add_events(dashboard_cls)
 
     def generate_widget(self):
@@ -76,15 +78,32 @@ class RangeSlider(BaseWidget):
         add events
         """
 
-        def widget_callback(event):
+        def update(event, dragging):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles()
 
             query_tuple = self._xaxis_np_dt64_transform(event.new)
-            dashboard_cls._query_datatiles_by_range(query_tuple)
+            # while the slider is dragged, "value" changes are answered
+            # within the frame budget, "value_throttled" refines the
+            # charts when it is released
+            dashboard_cls._query_datatiles_by_range(
+                query_tuple, dragging=dragging
+            )
 
-        self.chart.param.watch(widget_callback, ["value"], onlychanged=False)
+        def widget_callback(event):
+            # only the latest value of a fast drag is applied, a drag is
+            # told from the value_throttled of the slider when the event
+            # is received
+            dragging = is_slider_drag(self.chart, event)
+            dashboard_cls._schedule(self, lambda: update(event, dragging))
+
+        throttled = hasattr(self.chart, "value_throttled")
+        self.chart.param.watch(
+            widget_callback,
+            ["value", "value_throttled"] if throttled else ["value"],
+            onlychanged=False,
+        )
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
         """
@@ -107,6 +126,21 @@ class RangeSlider(BaseWidget):
             query_local_variables_dict.pop(self.x + "_min", None)
             query_local_variables_dict.pop(self.x + "_max", None)
 
+    def compute_filter_mask(self, data):
+        """
+        boolean mask of the rows of data within the selected range,
+        see compute_query_dict
+
+        Parameters:
+        -----------
+
+        data:
+            cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if self.chart.value == (self.chart.start, self.chart.end):
+            return None
+        return get_range_mask(data[self.x], *self.chart.value)
+
 
 class DateRangeSlider(BaseWidget):
     _datatile_loaded_state: bool = False
@@ -152,6 +186,7 @@ class DateRangeSlider(BaseWidget):
             del _series
         self.compute_stride()
         self.generate_widget()
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.add_events(dashboard_cls)
 
     def generate_widget(self):
@@ -184,15 +219,32 @@ class DateRangeSlider(BaseWidget):
         add events
         """
 
-        def widget_callback(event):
+        def update(event, dragging):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles()
             query_tuple = self._xaxis_np_dt64_transform(event.new)
-            dashboard_cls._query_datatiles_by_range(query_tuple)
+            # while the slider is dragged, "value" changes are answered
+            # within the frame budget, "value_throttled" refines the
+            # charts when it is released
+            dashboard_cls._query_datatiles_by_range(
+                query_tuple, dragging=dragging
+            )
+
+        def widget_callback(event):
+            # only the latest value of a fast drag is applied, a drag is
+            # told from the value_throttled of the slider when the event
+            # is received
+            dragging = is_slider_drag(self.chart, event)
+            dashboard_cls._schedule(self, lambda: update(event, dragging))
 
         # add callback to filter_Widget on value change
-        self.chart.param.watch(widget_callback, ["value"], onlychanged=False)
+        throttled = hasattr(self.chart, "value_throttled")
+        self.chart.param.watch(
+            widget_callback,
+            ["value", "value_throttled"] if throttled else ["value"],
+            onlychanged=False,
+        )
 
     def compute_query_dict(self, query_str_dict, query_local_variables_dict):
         """
@@ -215,6 +267,21 @@ class DateRangeSlider(BaseWidget):
             query_local_variables_dict.pop(self.x + "_min", None)
             query_local_variables_dict.pop(self.x + "_max", None)
 
+    def compute_filter_mask(self, data):
+        """
+        boolean mask of the rows of data within the selected range,
+        see compute_query_dict
+
+        Parameters:
+        -----------
+
+        data:
+            cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if self.chart.value == (self.chart.start, self.chart.end):
+            return None
+        return get_range_mask(data[self.x], *self.chart.value)
+
 
 class IntSlider(BaseWidget):
     _datatile_loaded_state: bool = False
@@ -242,6 +309,7 @@ class IntSlider(BaseWidget):
         self.max_value = int(max)
 
         self.generate_widget()
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.add_events(dashboard_cls)
 
     def generate_widget(self):
@@ -289,12 +357,15 @@ class IntSlider(BaseWidget):
         add events
         """
 
-        def widget_callback(event):
+        def update(event):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles()
             dashboard_cls._query_datatiles_by_indices([], [event.new])
 
+        def widget_callback(event):
+            dashboard_cls._schedule(self, lambda: update(event))
+
         # add callback to filter_Widget on value change
         self.chart.param.watch(widget_callback, ["value"], onlychanged=False)
         # self.add_reset_event(dashboard_cls)
@@ -317,6 +388,21 @@ class IntSlider(BaseWidget):
             query_str_dict.pop(self.name, None)
             query_local_variables_dict.pop(self.x + "_value", None)
 
+    def compute_filter_mask(self, data):
+        """
+        boolean mask of the rows of data equal to the selected value,
+        see compute_query_dict
+
+        Parameters:
+        -----------
+
+        data:
+            cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if len(str(self.chart.value)) == 0:
+            return None
+        return data[self.x] == self.chart.value
+
 
 class FloatSlider(BaseWidget):
     _datatile_loaded_state: bool = False
@@ -343,6 +429,7 @@ class FloatSlider(BaseWidget):
             dashboard_cls._cuxfilter_df.data, self.x
         )
         self.generate_widget()
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.add_events(dashboard_cls)
 
     def generate_widget(self):
@@ -390,13 +477,16 @@ class FloatSlider(BaseWidget):
         add events
         """
 
-        def widget_callback(event):
+        def update(event):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles(cumsum=False)
 
             dashboard_cls._query_datatiles_by_indices([], [event.new])
 
+        def widget_callback(event):
+            dashboard_cls._schedule(self, lambda: update(event))
+
         # add callback to filter_Widget on value change
         self.chart.param.watch(widget_callback, ["value"], onlychanged=False)
         # self.add_reset_event(dashboard_cls)
@@ -419,6 +509,21 @@ class FloatSlider(BaseWidget):
             query_str_dict.pop(self.name, None)
             query_local_variables_dict.pop(self.x + "_value", None)
 
+    def compute_filter_mask(self, data):
+        """
+        boolean mask of the rows of data equal to the selected value,
+        see compute_query_dict
+
+        Parameters:
+        -----------
+
+        data:
+            cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if len(str(self.chart.value)) == 0:
+            return None
+        return data[self.x] == self.chart.value
+
 
 class DropDown(BaseWidget):
     value = None
@@ -438,6 +543,7 @@ class DropDown(BaseWidget):
 
         self.calc_list_of_values(dashboard_cls._cuxfilter_df.data)
         self.generate_widget()
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
         self.add_events(dashboard_cls)
 
     def calc_list_of_values(self, data):
@@ -501,12 +607,15 @@ class DropDown(BaseWidget):
         add events
         """
 
-        def widget_callback(event):
+        def update(event):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles(cumsum=False)
             dashboard_cls._query_datatiles_by_indices([], [event.new])
 
+        def widget_callback(event):
+            dashboard_cls._schedule(self, lambda: update(event))
+
         # add callback to filter_Widget on value change
         self.chart.param.watch(widget_callback, ["value"], onlychanged=False)
         # self.add_reset_event(dashboard_cls)
@@ -529,6 +638,21 @@ class DropDown(BaseWidget):
             query_str_dict.pop(self.name, None)
             query_local_variables_dict.pop(self.x + "_value", None)
 
+    def compute_filter_mask(self, data):
+        """
+        boolean mask of the rows of data equal to the selected value,
+        see compute_query_dict
+
+        Parameters:
+        -----------
+
+        data:
+            cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if len(str(self.chart.value)) == 0:
+            return None
+        return data[self.x] == self.chart.value
+
 
 class MultiSelect(BaseWidget):
     value = None
@@ -549,6 +673,7 @@ class MultiSelect(BaseWidget):
         self.calc_list_of_values(dashboard_cls._cuxfilter_df.data)
 
         self.generate_widget()
+        self.compute_bin_ids(dashboard_cls._get_bin_id_cache())
 
         self.add_events(dashboard_cls)
 
@@ -616,11 +741,19 @@ class MultiSelect(BaseWidget):
         add events
         """
 
-        def widget_callback(event):
+        # value of the last applied update, the selection the incremental
+        # query starts from when intermediate values are dropped
+        applied = [self.chart.value]
+
+        def update(event):
             if dashboard_cls._active_view != self.name:
                 dashboard_cls._reset_current_view(new_active_view=self)
                 dashboard_cls._calc_data_tiles(cumsum=False)
-            dashboard_cls._query_datatiles_by_indices(event.old, event.new)
+            dashboard_cls._query_datatiles_by_indices(applied[0], event.new)
+            applied[0] = event.new
+
+        def widget_callback(event):
+            dashboard_cls._schedule(self, lambda: update(event))
 
         # add callback to filter_Widget on value change
         self.chart.param.watch(widget_callback, ["value"], onlychanged=False)
@@ -644,6 +777,21 @@ class MultiSelect(BaseWidget):
             indices_string = ",".join(map(str, self.chart.value))
             query_str_dict[self.name] = f"{self.x} in ({indices_string})"
 
+    def compute_filter_mask(self, data):
+        """
+        boolean mask of the rows of data among the selected values,
+        see compute_query_dict
+
+        Parameters:
+        -----------
+
+        data:
+            cudf.DataFrame | dask_cudf.DataFrame
+        """
+        if len(self.chart.value) == 0 or self.chart.value == [""]:
+            return None
+        return data[self.x].isin(list(self.chart.value))
+
 
 class DataSizeIndicator(BaseDataSizeIndicator):
     """
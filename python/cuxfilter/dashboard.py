@@ -1,4 +1,4 @@
-from typing import Dict, Type, Union
+from typing import Dict, Union
 import bokeh.embed.util as u
 import panel as pn
 import uuid
@@ -6,12 +6,47 @@ from panel.io.server import get_server
 from bokeh.embed import server_document
 import os
 import urllib
+import dask.dataframe as dd
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+import threading
 
 from .charts.core import BaseChart, BaseWidget, ViewDataFrame
-from .datatile import DataTile
+from .datatile import calc_data_tiles
 from .layouts import single_feature
+from .layouts.visibility import is_visible, watch_visibility
 from .charts.panel_widgets import data_size_indicator
 from .assets import screengrab, get_open_port
+from .assets.cache import LRUCache
+from .assets.crossfilter import CrossFilterIndex
+from .assets.export import (
+    EXPORT_FORMATS,
+    iter_chunks,
+    iter_partition_chunks,
+    write_chunks,
+)
+from .assets.scheduler import InteractionScheduler
+from .assets.selection import RowSelection
+from .assets.profiler import (
+    DEFAULT_PROFILE_INTERACTIONS,
+    InteractionProfiler,
+)
+from .assets.cudf_utils import (
+    BinIdCache,
+    get_codes,
+    get_dimension_values,
+    get_n_bins,
+    get_range_mask,
+    get_row_ids,
+)
+from .assets.datatiles import (
+    DataTileManager,
+    DataTileStore,
+    dataset_fingerprint,
+    hll_nbytes,
+    set_query_budget,
+)
 from .themes import light
 from IPython.core.display import Image, display
 from IPython.display import publish_display_data
@@ -25,9 +60,29 @@ EXEC_MIME = "application/vnd.holoviews_exec.v0+json"
 HTML_MIME = "text/html"
 
 DEFAULT_NOTEBOOK_URL = "http://localhost:8888"
+DEFAULT_DATATILE_CACHE_SIZE = "256MB"
+DEFAULT_FILTER_CACHE_SIZE = "128MB"
+DEFAULT_DATATILE_STORE_SIZE = "2GB"
+DEFAULT_FRAME_BUDGET = 1 / 30
+DEFAULT_REFRESH_WORKERS = 1
+DEFAULT_EXPORT_CHUNK_ROWS = 1_000_000
 
 CUXF_BASE_CHARTS = (BaseChart, BaseWidget, ViewDataFrame)
 
+# chart methods timed by the profiler, and their phase
+_PROFILED_CHART_METHODS = [
+    ("reload_chart", "reload"),
+    ("query_chart_by_range", "query_by_range"),
+    ("query_chart_by_indices", "query_by_indices"),
+    ("reset_chart", "reset"),
+    ("compute_update", "compute"),
+]
+
+
+def _run_all(callables):
+    for fn in callables:
+        fn()
+
 
 def _get_host(url):
     parsed_url = urllib.parse.urlparse(url)
@@ -121,9 +176,12 @@ class DashBoard:
     """
 
     _charts: Dict[str, Union[CUXF_BASE_CHARTS]]
-    _data_tiles: Dict[str, Type[DataTile]]
+    _data_tiles: DataTileManager
+    _datatile_cumsum: bool = True
     _query_str_dict: Dict[str, str]
     _query_local_variables_dict = {}
+    # filters not expressible as a query, e.g. lasso selections
+    _selection_dict: Dict[str, RowSelection]
     _active_view: str = ""
     _dashboard = None
     _theme = None
@@ -141,11 +199,56 @@ class DashBoard:
         title="Dashboard",
         data_size_widget=True,
         warnings=False,
+        datatile_cache_size=DEFAULT_DATATILE_CACHE_SIZE,
+        datatile_store=None,
+        datatile_store_size=DEFAULT_DATATILE_STORE_SIZE,
+        frame_budget=DEFAULT_FRAME_BUDGET,
+        datatile_memory_limit=None,
+        filter_cache_size=DEFAULT_FILTER_CACHE_SIZE,
+        refresh_workers=DEFAULT_REFRESH_WORKERS,
     ):
         self._cuxfilter_df = dataframe
+        self._frame_budget = frame_budget
         self._charts = dict()
-        self._data_tiles = dict()
+        self._data_tiles = DataTileManager(
+            datatile_memory_limit, datatile_cache_size
+        )
+        # charts whose distinct count datatiles would not fit in the
+        # datatile memory limit, updated by exact queries instead
+        self._datatile_fallbacks = set()
+        self._datatile_store = None
+        if datatile_store is not None:
+            self._datatile_store = DataTileStore(
+                datatile_store,
+                dataset_fingerprint(dataframe.data),
+                max_bytes=datatile_store_size,
+            )
         self._query_str_dict = dict()
+        self._selection_dict = dict()
+        self._filter_masks = dict()
+        self._filter_cache = LRUCache(filter_cache_size)
+        self._data_source = dataframe.data
+        self._data_generation = 0
+        self._reload_states = dict()
+        self._deferred_reloads = dict()
+        self._layout_roots = []
+        self._visibility_watchers = dict()
+        self._crossfilter = None
+        self._bin_id_cache = None
+        self._scheduler = InteractionScheduler()
+        # apply steps of the interaction computed by the current thread,
+        # see _apply
+        self._compute_context = threading.local()
+        self._profiler = InteractionProfiler()
+        self._export_pool = None
+        self._refresh_workers = max(refresh_workers, 1)
+        self._refresh_pool = None
+        self._refresh_lock = threading.RLock()
+        if refresh_workers > 1:
+            self._refresh_pool = ThreadPoolExecutor(
+                max_workers=refresh_workers,
+                thread_name_prefix="cuxfilter-refresh",
+            )
         self.data_size_widget = data_size_widget
         if self.data_size_widget:
             temp_chart = data_size_indicator()
@@ -208,7 +311,7 @@ class DashBoard:
         >>> d.add_charts([line_chart_2])
 
         """
-        self._data_tiles = {}
+        self._data_tiles.clear()
         if len(self._active_view) > 0:
             self._charts[self._active_view].datatile_loaded_state = False
             self._active_view = ""
@@ -229,6 +332,15 @@ class DashBoard:
 
     def _reinit_all_charts(self):
         self._query_str_dict = dict()
+        self._selection_dict = dict()
+        self._filter_masks = dict()
+        self._filter_cache.clear()
+        self._reload_states = dict()
+        self._deferred_reloads = dict()
+        self._unwatch_visibility()
+        self._crossfilter = None
+        self._data_tiles.clear_cache()
+        self._datatile_fallbacks = set()
         if self.data_size_widget:
             temp_chart = data_size_indicator()
             self._charts[temp_chart.name] = temp_chart
@@ -238,19 +350,26 @@ class DashBoard:
             self._charts[chart].source = None
             self._charts[chart].initiate_chart(self)
             self._charts[chart]._initialized = True
+        if self._profiler.enabled:
+            self._instrument()
 
     def _query(self, query_str, local_dict=None):
         """
         Query the cudf.DataFrame, inplace or create a copy based on the
-        value of inplace.
+        value of inplace. The query of the crossfiltered state of the
+        dashboard, _generate_query_str(), is answered from the cached row
+        ids of _filter.
         """
-        local_dict = local_dict or self._query_local_variables_dict
-        if len(query_str) > 0:
-            return self._cuxfilter_df.data.query(
-                query_str, local_dict=local_dict
-            )
-        else:
+        if len(query_str) == 0:
             return self._cuxfilter_df.data
+        if (
+            local_dict is None
+            and len(self._selection_dict) == 0
+            and query_str == self._generate_query_str()
+        ):
+            return self._filter()
+        local_dict = local_dict or self._query_local_variables_dict
+        return self._cuxfilter_df.data.query(query_str, local_dict=local_dict)
 
     def _generate_query_str(self, query_dict=None, ignore_chart=""):
         """
@@ -274,15 +393,592 @@ class DashBoard:
 
         return return_query_str
 
-    def export(self):
+    def _compute_query_dict(self, chart):
+        """
+        Store the current filter of chart, its query clause in
+        _query_str_dict, or its row selection in _selection_dict for
+        selections that are not expressible as a query.
+        """
+        chart.compute_query_dict(
+            self._query_str_dict, self._query_local_variables_dict
+        )
+        selection = getattr(chart, "selection", None)
+        if selection is None:
+            self._selection_dict.pop(chart.name, None)
+        else:
+            self._selection_dict[chart.name] = selection
+
+    def _get_chart_state(self, chart):
+        """
+        Query clause of chart, the values of its local variables and its
+        row selection. The clause is "" for a row selection, None if chart
+        does not filter the dataframe.
+        """
+        query_dict, local_dict = {}, {}
+        chart.compute_query_dict(query_dict, local_dict)
+        selection = getattr(chart, "selection", None)
+        clause = query_dict.get(chart.name)
+        if selection is not None:
+            # RowSelection reprs are unique
+            clause = ""
+            local_dict["selection"] = selection
+        return (
+            clause,
+            tuple(sorted((key, repr(val)) for key, val in local_dict.items())),
+        )
+
+    def _get_chart_mask(self, chart):
+        """
+        Boolean mask of the rows selected by chart, None if it selects all
+        rows. Masks are cached per chart, and recomputed only when the
+        query clause or the local variables of the chart change.
+        """
+        state = self._get_chart_state(chart)
+        cached = self._filter_masks.get(chart.name)
+        if (
+            cached is None
+            or cached[0] is not self._cuxfilter_df.data
+            or cached[1] != state
+        ):
+            mask = None
+            if state[0] is not None:
+                mask = chart.compute_filter_mask(self._cuxfilter_df.data)
+            cached = (self._cuxfilter_df.data, state, mask)
+            self._filter_masks[chart.name] = cached
+        return cached[2]
+
+    def _get_filter_charts(
+        self, ignore_chart="", include_charts=(), ignore_names=()
+    ):
+        """
+        Charts filtering the crossfiltered state of the dashboard, the
+        charts of _query_str_dict and _selection_dict other than
+        ignore_chart and the charts named in ignore_names, plus
+        include_charts.
+        """
+        ignore_name = (
+            ignore_chart.name
+            if isinstance(ignore_chart, CUXF_BASE_CHARTS)
+            else ignore_chart
+        )
+        charts = {
+            name: self._charts[name]
+            for name in list(self._query_str_dict) + list(self._selection_dict)
+            if name != ignore_name
+            and name not in ignore_names
+            and name in self._charts
+        }
+        charts.update({chart.name: chart for chart in include_charts})
+        return list(charts.values())
+
+    def _get_filter_mask(
+        self, ignore_chart="", include_charts=(), ignore_names=()
+    ):
+        """
+        Boolean mask of the rows selected by the charts of
+        _get_filter_charts, None if all rows are selected.
+        """
+        mask = None
+        for chart in self._get_filter_charts(
+            ignore_chart, include_charts, ignore_names
+        ):
+            chart_mask = self._get_chart_mask(chart)
+            if chart_mask is not None:
+                mask = chart_mask if mask is None else mask & chart_mask
+        return mask
+
+    def _get_data_generation(self):
+        """
+        Number of times the dataframe of the dashboard was replaced, the
+        caches derived from the previous dataframe are cleared.
+        """
+        if self._data_source is not self._cuxfilter_df.data:
+            self._data_source = self._cuxfilter_df.data
+            self._data_generation += 1
+            self._filter_cache.clear()
+        return self._data_generation
+
+    def _get_filter_state(
+        self, ignore_chart="", include_charts=(), ignore_names=()
+    ):
+        """
+        Canonical form of the filter state of the charts of
+        _get_filter_charts: the sorted (chart name, clause, local variable
+        values) of the charts filtering the dataframe. Key of the filter
+        cache and of the datatile cache, so both agree on the rows a state
+        selects.
+        """
+        states = [
+            (chart.name,) + self._get_chart_state(chart)
+            for chart in self._get_filter_charts(
+                ignore_chart, include_charts, ignore_names
+            )
+        ]
+        return tuple(sorted(state for state in states if state[1] is not None))
+
+    def _filter(self, ignore_chart="", include_charts=()):
+        """
+        Rows of the dataframe selected by the crossfiltered state of the
+        dashboard, see _get_filter_mask. Equivalent to querying the
+        dataframe with _generate_query_str, without parsing the query, and
+        keeping the rows of the selections of _selection_dict.
+
+        The row ids of the result are cached by the sorted per-chart
+        clauses and local variable values, so the same filter state is
+        evaluated once, whichever interaction asks for it.
+        """
+        data = self._cuxfilter_df.data
+        if isinstance(data, dd.DataFrame):
+            mask = self._get_filter_mask(ignore_chart, include_charts)
+            return data if mask is None else data[mask]
+        row_ids = self._get_filter_row_ids(ignore_chart, include_charts)
+        if row_ids is None:
+            return data
+        result = data.iloc[row_ids]
+        # the charts gather the bin ids of the rows instead of binning them
+        self._get_bin_id_cache().add_rows(data, result, row_ids)
+        return result
+
+    def _get_bin_id_cache(self):
+        """
+        Bin id cache of the dataframe of the dashboard, shared by the
+        charts, with the row ids of the frames returned by _filter, see
+        cudf_utils.BinIdCache.
+        """
+        data = self._cuxfilter_df.data
+        if self._bin_id_cache is None or self._bin_id_cache.source is not data:
+            self._bin_id_cache = BinIdCache(data)
+        return self._bin_id_cache
+
+    def _get_filter_row_ids(self, ignore_chart="", include_charts=()):
+        """
+        Row ids of the rows selected by the crossfiltered state of the
+        dashboard, cached by filter state, see _filter. None if all the
+        rows are selected, cudf.DataFrame only.
+        """
+        self._get_data_generation()
+        key = self._get_filter_state(ignore_chart, include_charts)
+        if len(key) == 0:
+            return None
+        row_ids = self._filter_cache.get(key)
+        if row_ids is None:
+            mask = self._get_filter_mask(ignore_chart, include_charts)
+            if mask is None:
+                return None
+            row_ids = get_row_ids(mask)
+            self._filter_cache.put(key, row_ids)
+        return row_ids
+
+    def _filter_by_indices(self, active_chart, indices):
+        """
+        Rows selected by the other charts and by the indices selected on
+        the x column of active_chart, all indices if none is selected.
+        """
+        data = self._filter(ignore_chart=active_chart)
+        indices = [index for index in indices if index != ""]
+        if len(indices) == 0:
+            return data
+        return data[data[active_chart.x].isin(indices)]
+
+    def _get_crossfilter_index(self, active_chart):
+        """
+        Crossfilter index of the range filtered charts, with a dimension
+        for the x column of active_chart. Rebuilt when the dataframe
+        changes, None for dask_cudf dataframes and columns that can not be
+        indexed.
+        """
+        data = self._cuxfilter_df.data
+        if isinstance(data, dd.DataFrame) or active_chart.x not in data:
+            return None
+        if self._crossfilter is None or self._crossfilter[0] is not data:
+            # the index, and the chart state of the range of every
+            # dimension, see _update_crossfilter
+            self._crossfilter = (data, CrossFilterIndex(len(data)), dict())
+        index = self._crossfilter[1]
+        if active_chart.name not in index:
+            values = get_dimension_values(data[active_chart.x])
+            if values is None:
+                return None
+            index.add_dimension(
+                active_chart.name,
+                values,
+                datetime=data[active_chart.x].dtype.kind == "M",
+            )
+        return index
+
+    def _update_crossfilter(self, active_chart, query_tuple):
+        """
+        Filter the crossfilter index of active_chart to query_tuple, see
+        _get_crossfilter_index. The dimension of another chart keeps its
+        range while the filter of the chart is the range it was last
+        queried with, and is cleared once the chart is reset or filtered
+        otherwise. The filters of the other charts apply as the mask of the
+        index, recombined only when their state changes. None if
+        active_chart can not be indexed.
+        """
+        index = self._get_crossfilter_index(active_chart)
+        if index is None:
+            return None
+        states = self._crossfilter[2]
+        indexed = set()
+        for name in index.dimensions:
+            if name == active_chart.name:
+                continue
+            state = None
+            if name in self._query_str_dict or name in self._selection_dict:
+                state = self._get_chart_state(self._charts[name])
+            # a range clause, neither None (no filter) nor "" (a row
+            # selection)
+            if state is not None and state[0] and states.get(name) == state:
+                indexed.add(name)
+            else:
+                index.filter_all(name)
+        index.filter_range(active_chart.name, *query_tuple)
+        states[active_chart.name] = self._get_chart_state(active_chart)
+        key = self._get_filter_state(
+            ignore_chart=active_chart, ignore_names=indexed
+        )
+        if key != index.mask_key:
+            mask = self._get_filter_mask(
+                ignore_chart=active_chart, ignore_names=indexed
+            )
+            if mask is not None:
+                mask = mask.fillna(False).values
+            index.filter_mask(mask, key)
+        return index
+
+    def _filter_by_range(self, active_chart, query_tuple):
+        """
+        Rows selected by the other charts and by query_tuple on the x
+        column of active_chart. The range filters of the charts go through
+        the crossfilter index, so a slider step only updates the rows
+        whose selection changes, see _update_crossfilter.
+        """
+        index = self._update_crossfilter(active_chart, query_tuple)
+        if index is None:
+            data = self._filter(ignore_chart=active_chart)
+            return data[get_range_mask(data[active_chart.x], *query_tuple)]
+        return self._cuxfilter_df.data[index.selected]
+
+    def _get_crossfilter_groups(self, active_chart, query_tuple):
+        """
+        Distinct counts of the datatile fallback charts (see
+        _exceeds_datatile_limit) after filtering the crossfilter index of
+        active_chart to query_tuple, by chart name, in the order of their
+        x-axis. They are crossfilter groups of the index, updated with the
+        rows whose selection changes instead of reloading the charts from
+        the selected rows. Charts that can not be grouped are left out.
+        """
+        charts = [
+            chart
+            for chart in self._charts.values()
+            if chart.name in self._datatile_fallbacks
+            and chart.name != active_chart.name
+            and getattr(chart, "aggregate_dict", None) is None
+            and getattr(chart, "aggregate_fn", None) == "nunique"
+        ]
+        if len(charts) == 0:
+            return {}
+        index = self._update_crossfilter(active_chart, query_tuple)
+        if index is None:
+            return {}
+        groups = {}
+        for chart in charts:
+            group = self._get_crossfilter_group(index, chart)
+            if group is not None:
+                groups[chart.name] = group.get_values(
+                    chart.get_datatile_indices()
+                )
+        return groups
+
+    def _get_crossfilter_group(self, index, chart):
+        """
+        Crossfilter group of the distinct values of the y column of chart
+        per bin, created the first time, None if its binning can not be
+        computed or if it would not fit in the datatile memory limit.
+        """
+        name = (
+            chart.name,
+            chart.x,
+            chart.y,
+            chart.min_value,
+            chart.max_value,
+            chart.stride,
+        )
+        if name in index.groups:
+            return index.groups[name]
+        for other in list(index.groups):
+            # previous binning of the chart
+            if other[0] == chart.name:
+                index.remove_group(other)
+        data = self._cuxfilter_df.data
+        bins = None
+        if chart.stride is not None and data[chart.x].dtype.kind in "biuf":
+            bins = chart.get_bin_ids(data)
+        if bins is None:
+            return None
+        codes, n_codes = get_codes(data[chart.y])
+        if bins[1] * n_codes * 4 > self._data_tiles.max_bytes:
+            return None
+        return index.add_group(
+            name, bins[0], bins[1], codes=codes, n_codes=n_codes
+        )
+
+    def _datatile_cache_key(self, passive_chart, filter_state, cumsum):
+        """
+        Key of the datatile of passive_chart for the current active view.
+        """
+        aggregate_fn = getattr(passive_chart, "aggregate_dict", None)
+        if aggregate_fn is None:
+            aggregate_fn = passive_chart.aggregate_fn
+        else:
+            aggregate_fn = tuple(sorted(aggregate_fn.items()))
+        return (
+            self._active_view,
+            passive_chart.name,
+            aggregate_fn,
+            filter_state,
+            cumsum,
+        )
+
+    def _datatile_store_key(self, passive_chart, cache_key):
+        """
+        Key of a datatile in the persistent datatile store, the datatile
+        cache key and the binning of the active and passive charts. None if
+        the store is disabled, or if the filter state holds a row
+        selection, whose id only exists in this session.
+        """
+        if self._datatile_store is None or any(
+            clause == "" for _, clause, _ in cache_key[3]
+        ):
+            return None
+        return (
+            cache_key,
+            tuple(
+                (
+                    chart.x,
+                    chart.y,
+                    str(chart.min_value),
+                    str(chart.max_value),
+                    str(chart.stride),
+                    getattr(chart, "custom_binning", False),
+                )
+                for chart in [self._charts[self._active_view], passive_chart]
+            ),
+        )
+
+    def _get_stored_datatile(self, store_key):
+        """
+        datatile from the persistent datatile store, None if store_key is
+        None (see _datatile_store_key) or the store does not hold it
+        """
+        if store_key is None:
+            return None
+        return self._datatile_store.get(store_key)
+
+    def datatile_cache_info(self):
+        """
+        Statistics of the datatile cache of the dashboard, the datatiles
+        kept by filter state and active view for reuse, which count
+        against datatile_memory_limit, see datatile_memory_info.
+
+        Returns
+        -------
+        dict
+            hits, misses, evictions, entries, current_bytes and max_bytes,
+            and the statistics of the persistent datatile store under
+            "store" (None if disabled)
+        """
+        info = self._data_tiles.cache_info()
+        info["store"] = (
+            None
+            if self._datatile_store is None
+            else self._datatile_store.info()
+        )
+        return info
+
+    def filter_cache_info(self):
+        """
+        Statistics of the cache of the rows selected by the filter states
+        of the dashboard.
+
+        Returns
+        -------
+        dict
+            hits, misses, evictions, entries, current_bytes and max_bytes
+        """
+        return self._filter_cache.info()
+
+    def datatile_memory_info(self):
+        """
+        Memory usage of the datatiles of the charts of the dashboard and
+        of the datatile cache, bounded by datatile_memory_limit.
+
+        Returns
+        -------
+        dict
+            current_bytes, max_bytes, cached_bytes (the part of
+            current_bytes held by the datatile cache), the number of
+            downgrades, evictions and rebuilds, the bytes and resolution
+            (number of times the active bins were halved) of the datatile
+            of each chart under "charts", and the evicted charts under
+            "evicted"
+        """
+        return self._data_tiles.info()
+
+    def enable_profiling(self, max_interactions=DEFAULT_PROFILE_INTERACTIONS):
+        """
+        Start timing the interactions of the dashboard, see profile.
+
+        Parameters
+        ----------
+        max_interactions: int, default 100
+            number of interactions kept, the oldest are dropped first
+        """
+        self._profiler.set_max_interactions(max_interactions)
+        self._profiler.enabled = True
+        self._instrument()
+
+    def disable_profiling(self):
+        """
+        Stop timing the interactions of the dashboard, the recorded
+        interactions are kept.
+        """
+        self._profiler.enabled = False
+        self._profiler.restore()
+
+    def profile(self, last=None, path=None):
+        """
+        Cost of the interactions recorded since enable_profiling, per chart
+        and phase.
+
+        The phases are "query" (filtering the dataframe), "_query"
+        (DashBoard._query, which filters through the "query" phase for the
+        crossfiltered state), "datatiles" and
+        "datatile" (building all the datatiles of an active chart, and the
+        datatile of each chart, or the dense count/sum/mean datatiles of
+        all the charts in one stacked pass, attributed to the active
+        chart), "reload", "query_by_range",
+        "query_by_indices" and "reset" (the chart updates), "compute"
+        (the compute steps of the chart updates run in the refresh pool),
+        "render" (datashader images) and "model_update" (changes of the
+        bokeh/panel models, with the bytes of column data sent). While the
+        dashboard is served, the patches of an interaction are serialized
+        once its document hold is released, after its spans.
+
+        Parameters
+        ----------
+        last: int, default None
+            only the last interactions, all the recorded ones if None
+        path: str, default None
+            also write the JSON export of the interactions and their spans
+            to path, for offline analysis
+
+        Returns
+        -------
+        pandas.DataFrame
+            a row per chart (missing for the dashboard) and phase with calls,
+            self_ms (excluding nested spans), total_ms, mean_ms, max_ms
+            and payload_bytes, most expensive first
+        """
+        if path is not None:
+            self._profiler.to_json(path, last)
+        return pd.DataFrame(
+            self._profiler.summary(last),
+            columns=[
+                "chart",
+                "phase",
+                "calls",
+                "self_ms",
+                "total_ms",
+                "mean_ms",
+                "max_ms",
+                "payload_bytes",
+            ],
+        )
+
+    def _instrument(self):
+        """
+        Wrap the methods timed by the profiler in spans. Wrapped methods
+        are skipped, so it runs again for charts added or regenerated
+        since.
+        """
+        profiler = self._profiler
+        for name in [
+            "_filter",
+            "_filter_by_range",
+            "_filter_by_indices",
+        ]:
+            profiler.instrument(self, name, "query")
+        profiler.instrument(self, "_query", "_query")
+        profiler.instrument(self, "_calc_data_tiles", "datatiles")
+        for chart in self._charts.values():
+            for name, phase in _PROFILED_CHART_METHODS:
+                if hasattr(chart, name):
+                    # reset_chart is also a model update
+                    profiler.instrument(
+                        chart, name, phase, chart.name, phase == "reset"
+                    )
+            if hasattr(chart, "format_source_data"):
+                profiler.instrument(
+                    chart,
+                    "format_source_data",
+                    "model_update",
+                    chart.name,
+                    True,
+                )
+            image = getattr(chart, "interactive_image", None)
+            if image is not None:
+                profiler.instrument(
+                    image, "render_image", "render", chart.name
+                )
+                profiler.instrument(
+                    image, "update_source", "model_update", chart.name, True
+                )
+
+    def export(
+        self,
+        path=None,
+        columns=None,
+        format="parquet",
+        chunk_rows=DEFAULT_EXPORT_CHUNK_ROWS,
+        progress=None,
+        background=False,
+    ):
         """
         Export the cudf.DataFrame based on the current filtered state of
         the dashboard.
 
-        Also prints the query string of the current state of the dashboard.
+        Without path, returns the filtered dataframe and prints the query
+        string of the current state of the dashboard. With path, the
+        selected rows are written to a file chunk by chunk, gathering only
+        chunk_rows rows of the requested columns at a time.
+
+        Parameters
+        ----------
+        path: str, optional
+            path of the parquet or arrow IPC file to write, None returns
+            the filtered dataframe instead, default None
+        columns: list of str, optional
+            columns to export, all the columns if None, default None
+        format: {"parquet", "arrow"}
+            file format when path is given, default "parquet"
+        chunk_rows: int
+            maximum number of rows gathered and written at a time,
+            default 1_000_000
+        progress: callable, optional
+            called with (rows_written, total_rows) after every chunk
+            written, total_rows is None for dask_cudf dataframes
+        background: bool
+            write the file in a background thread and return a
+            concurrent.futures.Future of the number of rows written, the
+            dashboard stays interactive meanwhile. The rows exported are
+            the ones selected when export is called, default False
+
         Returns
         -------
-        cudf.DataFrame
+        cudf.DataFrame without path, the number of rows written with path,
+        a concurrent.futures.Future of it if background
 
         Examples
         --------
@@ -310,25 +1006,67 @@ class DashBoard:
         >>> queried_df = d.export()
         final query 2<=key<=4
 
+        >>> d.export("selection.parquet", columns=["key"])
+        3
 
         """
+        if path is not None and format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"format must be one of {EXPORT_FORMATS}, got {format!r}"
+            )
         # Compute query for currently active chart, and consider its
         # current state as final state
-        if self._active_view == "":
-            print("no querying done, returning original dataframe")
-            # return self._backup_data
-            return self._cuxfilter_df.data
-        else:
-            self._charts[self._active_view].compute_query_dict(
-                self._query_str_dict, self._query_local_variables_dict
+        if self._active_view != "":
+            self._compute_query_dict(self._charts[self._active_view])
+        if path is not None:
+            return self._export_file(
+                path, columns, format, chunk_rows, progress, background
             )
 
+        if self._active_view == "":
+            print("no querying done, returning original dataframe")
+            data = self._cuxfilter_df.data
+        elif (
+            len(self._generate_query_str()) > 0
+            or len(self._selection_dict) > 0
+        ):
             if len(self._generate_query_str()) > 0:
                 print("final query", self._generate_query_str())
-                return self._query(self._generate_query_str())
-            else:
-                print("no querying done, returning original dataframe")
-                return self._cuxfilter_df.data
+            for name, selection in self._selection_dict.items():
+                print("row selection", name, selection)
+            data = self._filter()
+        else:
+            print("no querying done, returning original dataframe")
+            data = self._cuxfilter_df.data
+        return data if columns is None else data[list(columns)]
+
+    def _export_file(
+        self, path, columns, format, chunk_rows, progress, background
+    ):
+        """
+        Write the rows selected by the current filter state to path, see
+        export. The selection is evaluated here, the chunks are gathered
+        and written by the writer, in the background if requested.
+        """
+        data = self._cuxfilter_df.data
+        columns = list(data.columns) if columns is None else list(columns)
+        if isinstance(data, dd.DataFrame):
+            chunks = iter_partition_chunks(self._filter()[columns], chunk_rows)
+            total_rows = None
+        else:
+            row_ids = self._get_filter_row_ids()
+            total_rows = len(data) if row_ids is None else len(row_ids)
+            chunks = iter_chunks(data, columns, chunk_rows, row_ids)
+        write = partial(
+            write_chunks, path, chunks, format, total_rows, progress
+        )
+        if not background:
+            return write()
+        if self._export_pool is None:
+            self._export_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="cuxfilter-export"
+            )
+        return self._export_pool.submit(write)
 
     def __str__(self):
         return self.__repr__()
@@ -365,9 +1103,7 @@ class DashBoard:
         **kwargs,
     ):
         return get_server(
-            panel=self._dashboard.generate_dashboard(
-                self.title, self._charts, self._theme
-            ),
+            panel=self._generate_dashboard(),
             port=port,
             websocket_origin=websocket_origin,
             loop=loop,
@@ -478,9 +1214,7 @@ class DashBoard:
             port = get_open_port()
 
         self.server = _create_app(
-            self._dashboard.generate_dashboard(
-                self.title, self._charts, self._theme
-            ),
+            self._generate_dashboard(),
             notebook_url=self._notebook_url,
             port=port,
             service_proxy=service_proxy,
@@ -581,47 +1315,356 @@ class DashBoard:
             self.server._stopped = True
             self.server._tornado.stop()
 
-    def _reload_charts(self, data=None, include_cols=[], ignore_cols=[]):
+    def _reload_charts(
+        self, data=None, include_cols=[], ignore_cols=[], include_charts=()
+    ):
         """
         Reload charts with current self._cuxfilter_df.data state.
+
+        Without data, charts are reloaded with the rows selected by the
+        crossfiltered state of the dashboard plus include_charts, and only
+        if their last reload was for another filter state or dataframe,
+        the only inputs of a chart that change between reloads. The active
+        view, which also reloads itself, is always reloaded. Reloads of
+        hidden charts (see _is_visible) are deferred until they are shown.
         """
-        if data is None:
-            # get current data as per the active queries
-            data = self._query(self._generate_query_str())
         if len(include_cols) == 0:
             include_cols = list(self._charts.keys())
+        state = None
+        if data is None:
+            state = (
+                self._get_data_generation(),
+                self._get_filter_state(include_charts=include_charts),
+            )
+        reload_data = data
+        updates = []
         # reloading charts as per current data state
-        for chart in self._charts.values():
-            if chart.name not in ignore_cols and chart.name in include_cols:
-                self._charts[chart.name].reload_chart(data, patch_update=True)
+        for chart in list(self._charts.values()):
+            if chart.name in ignore_cols or chart.name not in include_cols:
+                continue
+            if (
+                state is not None
+                and chart.name != self._active_view
+                and self._reload_states.get(chart.name) == state
+            ):
+                continue
+            if not self._is_visible(chart):
+                self._defer_reload(chart, data, include_charts)
+                continue
+            if reload_data is None:
+                # get current data as per the active queries
+                reload_data = self._filter(include_charts=include_charts)
+            self._deferred_reloads.pop(chart.name, None)
+            self._unwatch_visibility([chart.name])
+            updates.append(
+                (
+                    chart,
+                    "reload_chart",
+                    (reload_data,),
+                    {"patch_update": True},
+                )
+            )
+        self._update_charts(updates)
+        for chart, *_ in updates:
+            self._reload_states[chart.name] = state
 
-    def _calc_data_tiles(self, cumsum=True):
+    def _defer_reload(self, chart, data, include_charts):
         """
-        Calculate data tiles for all aggregate type charts.
+        Defer the reload of a hidden chart until it is shown, only the
+        latest deferred reload of a chart is kept.
         """
-        # query_str = self._generate_query_str(self._charts[self._active_view])
+        self._reload_states.pop(chart.name, None)
+        self._deferred_reloads[chart.name] = (data, include_charts)
+        if chart.name not in self._visibility_watchers:
+            self._visibility_watchers[chart.name] = watch_visibility(
+                chart.chart, self._layout_roots, self._reload_deferred_charts
+            )
 
+    def _unwatch_visibility(self, names=None):
+        """
+        Remove the visibility watchers of the charts names, of all the
+        charts if None, see _defer_reload.
+        """
+        if names is None:
+            names = list(self._visibility_watchers)
+        for name in names:
+            unwatch = self._visibility_watchers.pop(name, None)
+            if unwatch is not None:
+                unwatch()
+
+    def _is_visible(self, chart):
+        """
+        Whether chart is rendered: its model is not hidden or zero-size,
+        and not in an inactive tab or a collapsed card of the served
+        layout, see layouts.visibility.is_visible.
+        """
+        return is_visible(chart.chart, self._layout_roots)
+
+    def _generate_dashboard(self):
+        """
+        Generate the served layout of the dashboard. The visibility of the
+        charts is checked against it, so the watchers of the deferred
+        charts are moved to its layouts.
+        """
+        template = self._dashboard.generate_dashboard(
+            self.title, self._charts, self._theme
+        )
+        self._layout_roots = [template]
+        self._unwatch_visibility()
+        for name in self._deferred_reloads:
+            self._visibility_watchers[name] = watch_visibility(
+                self._charts[name].chart,
+                self._layout_roots,
+                self._reload_deferred_charts,
+            )
+        return template
+
+    def _reload_deferred_charts(self):
+        """
+        Apply the deferred reloads of the charts that are now shown.
+        """
+        for name, (data, include_charts) in list(
+            self._deferred_reloads.items()
+        ):
+            chart = self._charts.get(name)
+            if chart is not None and self._is_visible(chart):
+                self._reload_charts(
+                    data, include_cols=[name], include_charts=include_charts
+                )
+
+    def _calc_data_tiles(self, cumsum=True, charts=None):
+        """
+        Calculate data tiles for all aggregate type charts, or only for
+        charts if given.
+        """
         # NO DATATILES for scatter types, as they are essentially all
         # points in the dataset
-        query = self._generate_query_str(
-            ignore_chart=self._charts[self._active_view]
-        )
+        active_chart = self._charts[self._active_view]
+        filter_state = self._get_filter_state(ignore_chart=active_chart)
+        self._datatile_cumsum = cumsum
+        # the datatile of the active chart from a previous active view
+        self._data_tiles.pop(active_chart.name)
 
         if "scatter" not in self._active_view:
+            missing_charts = []
+            # computed before the build, which may set the y column of a
+            # chart, e.g. the color column of a choropleth
+            store_keys = dict()
             for chart in list(self._charts.values()):
+                if charts is not None and chart not in charts:
+                    continue
+                self._datatile_fallbacks.discard(chart.name)
                 if not chart.use_data_tiles:
                     self._data_tiles[chart.name] = None
+                elif self._exceeds_datatile_limit(active_chart, chart):
+                    # not built, queried exactly from the filtered data
+                    self._datatile_fallbacks.add(chart.name)
+                    self._data_tiles[chart.name] = None
                 elif self._active_view != chart.name:
-                    self._data_tiles[chart.name] = DataTile(
-                        self._charts[self._active_view],
-                        chart,
-                        dtype="pandas",
-                        cumsum=cumsum,
-                    ).calc_data_tile(self._query(query).copy())
+                    cache_key = self._datatile_cache_key(
+                        chart, filter_state, cumsum
+                    )
+                    store_keys[chart.name] = self._datatile_store_key(
+                        chart, cache_key
+                    )
+                    datatile = self._data_tiles.get_cached(cache_key)
+                    if datatile is None:
+                        datatile = self._get_stored_datatile(
+                            store_keys[chart.name]
+                        )
+                    if datatile is None:
+                        missing_charts.append(chart)
+                        self._data_tiles[chart.name] = None
+                    else:
+                        self._data_tiles.set(chart.name, datatile, cache_key)
+
+            if len(missing_charts) > 0:
+                # filter once, and compute all missing datatiles in a
+                # single pass over the filtered data
+                datatiles = calc_data_tiles(
+                    self._filter(ignore_chart=active_chart),
+                    active_chart,
+                    missing_charts,
+                    dtype="array",
+                    cumsum=cumsum,
+                    pyramid=True,
+                    profiler=self._profiler,
+                )
+                for chart in missing_charts:
+                    cache_key = self._datatile_cache_key(
+                        chart, filter_state, cumsum
+                    )
+                    self._data_tiles.set(
+                        chart.name, datatiles[chart.name], cache_key
+                    )
+                    if store_keys[chart.name] is not None:
+                        # written in the background, off the interaction
+                        self._datatile_store.submit(
+                            store_keys[chart.name], datatiles[chart.name]
+                        )
+
+        self._apply(
+            partial(
+                setattr,
+                self._charts[self._active_view],
+                "datatile_loaded_state",
+                True,
+            )
+        )
 
-        self._charts[self._active_view].datatile_loaded_state = True
+    def _exceeds_datatile_limit(self, active_chart, passive_chart):
+        """
+        Whether the distinct count (nunique) datatiles of passive_chart
+        for active_chart, whose size grows with the number of active and
+        passive bins times 2**HLL_PRECISION registers, are estimated to be
+        larger than the datatile memory limit.
+        """
+        if (
+            self._data_tiles.max_bytes is None
+            or active_chart.name == passive_chart.name
+            or getattr(active_chart, "stride", None) is None
+            or getattr(passive_chart, "stride", None) is None
+        ):
+            return False
+        aggregate_fns = getattr(passive_chart, "aggregate_dict", None)
+        if aggregate_fns is None:
+            aggregate_fns = [getattr(passive_chart, "aggregate_fn", None)]
+        else:
+            aggregate_fns = aggregate_fns.values()
+        n_datatiles = sum(fn == "nunique" for fn in aggregate_fns)
+        if n_datatiles == 0:
+            return False
+        nbytes = n_datatiles * hll_nbytes(
+            get_n_bins(
+                passive_chart.min_value,
+                passive_chart.max_value,
+                passive_chart.stride,
+            ),
+            get_n_bins(
+                active_chart.min_value,
+                active_chart.max_value,
+                active_chart.stride,
+            ),
+        )
+        return nbytes > self._data_tiles.max_bytes
+
+    def _use_data_tiles(self, chart):
+        """
+        Whether chart is updated from its datatile, see
+        _exceeds_datatile_limit.
+        """
+        return (
+            chart.use_data_tiles and chart.name not in self._datatile_fallbacks
+        )
+
+    def _get_datatile(self, chart):
+        """
+        Datatile of chart, rebuilt if it was evicted by the datatile memory
+        limit, and marked as queried.
+        """
+        if self._data_tiles.is_evicted(chart.name):
+            self._calc_data_tiles(self._datatile_cumsum, charts=[chart])
+        self._data_tiles.touch(chart.name)
+        return self._data_tiles[chart.name]
 
-    def _query_datatiles_by_range(self, query_tuple):
+    def _schedule(self, chart, callback):
+        """
+        Run callback, the dashboard update of an interaction with chart,
+        through the interaction scheduler: while the dashboard is served,
+        an update still waiting in the queue of its session is replaced by
+        the next update of the same chart, and the queued updates of a
+        session run together in a single document hold.
+
+        The update is computed in the worker thread of the scheduler, off
+        the document thread, and the changes of the chart models it makes
+        are applied on the document thread afterwards, see _apply.
+
+        While profiling, the update is recorded as an interaction of chart.
+        """
+        compute = partial(self._compute_interaction, callback)
+        if self._profiler.enabled:
+            self._instrument()
+            compute = partial(self._profiler.run_split, chart.name, compute)
+        self._scheduler.submit(chart.name, compute, doc=pn.state.curdoc)
+
+    def _compute_interaction(self, callback):
+        """
+        Run callback, collecting the changes of the chart models it makes
+        (see _apply) in its apply step, returned to be run on the document
+        thread.
+        """
+        applies = []
+        self._compute_context.applies = applies
+        try:
+            callback()
+        finally:
+            self._compute_context.applies = None
+        return partial(_run_all, applies)
+
+    def _apply(self, apply):
+        """
+        Run apply, a callable changing the chart models, now, or in the
+        apply step of the interaction computed by the current thread, see
+        _compute_interaction.
+        """
+        applies = getattr(self._compute_context, "applies", None)
+        if applies is None:
+            apply()
+        else:
+            applies.append(apply)
+
+    def _update_charts(self, updates):
+        """
+        Run updates, a list of (chart, update, args, kwargs) calling the
+        update method of chart (reload_chart, query_chart_by_range or
+        query_chart_by_indices) with args and kwargs.
+
+        With refresh_workers > 1 the compute steps of the updates (see
+        BaseChart.compute_update), which do not touch the models, run in
+        parallel in the refresh thread pool, and their apply steps run
+        here, on the document thread, serially and in order. Refreshes
+        are serialized: the compute steps of a refresh are all done before
+        the next one starts, even if an update fails.
+
+        In an interaction computed by the scheduler, the compute steps run
+        in its worker thread and the apply steps are deferred to the
+        document thread, see _apply.
+        """
+        computing = getattr(self._compute_context, "applies", None)
+        if self._refresh_pool is None or len(updates) < 2:
+            for chart, update, args, kwargs in updates:
+                if computing is not None and hasattr(chart, "compute_update"):
+                    self._apply(chart.compute_update(update, *args, **kwargs))
+                else:
+                    self._apply(
+                        partial(getattr(chart, update), *args, **kwargs)
+                    )
+            return
+        with self._refresh_lock:
+            futures = [
+                self._refresh_pool.submit(
+                    chart.compute_update, update, *args, **kwargs
+                )
+                if hasattr(chart, "compute_update")
+                else None
+                for chart, update, args, kwargs in updates
+            ]
+            try:
+                for (chart, update, args, kwargs), future in zip(
+                    updates, futures
+                ):
+                    if future is None:
+                        # charts without a compute step, e.g. the data
+                        # table, are updated on the document thread
+                        self._apply(
+                            partial(getattr(chart, update), *args, **kwargs)
+                        )
+                    else:
+                        self._apply(future.result())
+            finally:
+                wait([future for future in futures if future is not None])
+
+    def _query_datatiles_by_range(self, query_tuple, dragging=False):
         """
         Update each chart using the updated values after querying
         the datatiles using query_tuple.
@@ -629,79 +1672,105 @@ class DashBoard:
         ----------
         query_tuple: tuple
             (min_val, max_val) of the query
+        dragging: bool
+            True while the range slider is dragged, the datatiles are then
+            queried at the finest resolution that keeps all of them within
+            frame_budget, and at full resolution once it is released
 
         """
+        budget = None
+        if dragging and self._frame_budget is not None:
+            n_datatiles = sum(
+                self._use_data_tiles(chart)
+                and chart.name != self._active_view
+                for chart in self._charts.values()
+            )
+            # datatiles are queried refresh_workers at a time
+            n_rounds = -(-max(n_datatiles, 1) // self._refresh_workers)
+            budget = self._frame_budget / n_rounds
+
+        active_chart = self._charts[self._active_view]
+        groups = self._get_crossfilter_groups(active_chart, query_tuple)
+        data = None
+        updates = []
         for chart in self._charts.values():
             if (
                 self._active_view != chart.name
                 and "widget" not in chart.chart_type
             ):
+                # updated outside _reload_charts
+                self._reload_states.pop(chart.name, None)
+                if (
+                    data is None
+                    and not self._use_data_tiles(chart)
+                    and chart.name not in groups
+                ):
+                    # rows selected by all the charts, filtered once for
+                    # all the charts without datatiles
+                    data = self._filter_by_range(active_chart, query_tuple)
                 if chart.chart_type == "view_dataframe":
-                    chart.query_chart_by_range(
-                        self._charts[self._active_view],
-                        query_tuple,
-                        self._cuxfilter_df.data,
-                        self._generate_query_str(
-                            self._charts[self._active_view]
-                        ),
-                        self._query_local_variables_dict,
-                    )
+                    update = ("reload_chart", (data, False), {})
+                elif chart.name in groups:
+                    update = ("reset_chart", (groups[chart.name],), {})
+                elif chart.name in self._datatile_fallbacks:
+                    update = ("reload_chart", (data,), {"patch_update": True})
                 elif not chart.use_data_tiles:
-                    chart.query_chart_by_range(
-                        self._charts[self._active_view],
-                        query_tuple,
-                        self._data_tiles[chart.name],
-                        self._generate_query_str(
-                            ignore_chart=self._charts[self._active_view]
-                        ),
-                        self._query_local_variables_dict,
+                    update = (
+                        "query_chart_by_range",
+                        (active_chart, query_tuple),
+                        {"data": data},
                     )
                 else:
-                    chart.query_chart_by_range(
-                        self._charts[self._active_view],
-                        query_tuple,
-                        self._data_tiles[chart.name],
+                    datatile = self._get_datatile(chart)
+                    set_query_budget(datatile, budget)
+                    update = (
+                        "query_chart_by_range",
+                        (active_chart, query_tuple, datatile),
+                        {},
                     )
+                updates.append((chart, *update))
+        self._update_charts(updates)
 
     def _query_datatiles_by_indices(self, old_indices, new_indices):
         """
         Update each chart using the updated values after querying the
         datatiles using new_indices.
         """
+        active_chart = self._charts[self._active_view]
+        data = None
+        updates = []
         for chart in self._charts.values():
             if (
                 self._active_view != chart.name
                 and "widget" not in chart.chart_type
             ):
+                # updated outside _reload_charts
+                self._reload_states.pop(chart.name, None)
+                if data is None and not self._use_data_tiles(chart):
+                    data = self._filter_by_indices(active_chart, new_indices)
                 if chart.chart_type == "view_dataframe":
-                    chart.query_chart_by_indices(
-                        self._charts[self._active_view],
-                        old_indices,
-                        new_indices,
-                        self._cuxfilter_df.data,
-                        self._generate_query_str(
-                            ignore_chart=self._charts[self._active_view]
-                        ),
-                        self._query_local_variables_dict,
-                    )
+                    update = ("reload_chart", (data, False), {})
+                elif chart.name in self._datatile_fallbacks:
+                    update = ("reload_chart", (data,), {"patch_update": True})
                 elif not chart.use_data_tiles:
-                    chart.query_chart_by_indices(
-                        self._charts[self._active_view],
-                        old_indices,
-                        new_indices,
-                        self._data_tiles[chart.name],
-                        self._generate_query_str(
-                            ignore_chart=self._charts[self._active_view]
-                        ),
-                        self._query_local_variables_dict,
+                    update = (
+                        "query_chart_by_indices",
+                        (active_chart, old_indices, list(new_indices)),
+                        {"data": data},
                     )
                 else:
-                    chart.query_chart_by_indices(
-                        self._charts[self._active_view],
-                        old_indices,
-                        new_indices,
-                        self._data_tiles[chart.name],
+                    update = (
+                        "query_chart_by_indices",
+                        (
+                            active_chart,
+                            old_indices,
+                            list(new_indices),
+                            self._get_datatile(chart),
+                        ),
+                        {},
                     )
+                updates.append((chart, *update))
+        self._update_charts(updates)
 
     def _reset_current_view(self, new_active_view: CUXF_BASE_CHARTS):
         """
@@ -711,26 +1780,37 @@ class DashBoard:
             self._active_view = new_active_view.name
             return -1
 
-        self._charts[self._active_view].compute_query_dict(
-            self._query_str_dict, self._query_local_variables_dict
-        )
+        self._compute_query_dict(self._charts[self._active_view])
 
         # resetting the loaded state
-        self._charts[self._active_view].datatile_loaded_state = False
+        self._apply(
+            partial(
+                setattr,
+                self._charts[self._active_view],
+                "datatile_loaded_state",
+                False,
+            )
+        )
+        # the previous active view reloaded itself outside _reload_charts
+        self._reload_states.pop(self._active_view, None)
 
         # switching the active view
         self._active_view = new_active_view.name
 
         self._query_str_dict.pop(self._active_view, None)
+        self._selection_dict.pop(self._active_view, None)
+        active_chart = self._charts[self._active_view]
         if (
-            "widget" not in self._charts[self._active_view].chart_type
-            and self._charts[self._active_view].use_data_tiles
+            "widget" not in active_chart.chart_type
+            and active_chart.use_data_tiles
         ):
-            self._charts[self._active_view].reload_chart(
-                data=self._query(
-                    self._generate_query_str(
-                        ignore_chart=self._charts[self._active_view]
+            self._update_charts(
+                [
+                    (
+                        active_chart,
+                        "reload_chart",
+                        (self._filter(ignore_chart=active_chart),),
+                        {"patch_update": True},
                     )
-                ),
-                patch_update=True,
+                ]
             )
@@ -162,6 +162,13 @@ class DataFrame:
         title="Dashboard",
         data_size_widget=True,
         warnings=False,
+        datatile_cache_size="256MB",
+        datatile_store=None,
+        datatile_store_size="2GB",
+        frame_budget=1 / 30,
+        datatile_memory_limit=None,
+        filter_cache_size="128MB",
+        refresh_workers=1,
     ):
         """
         Creates a cuxfilter.DashBoard object
@@ -185,6 +192,56 @@ class DataFrame:
             flag to disable or enable runtime warnings related to layouts,
             default False
 
+        datatile_cache_size: int or str
+            memory budget of the least recently used cache of datatiles,
+            which avoids recomputing datatiles when switching back to a
+            recently used active chart under unchanged filters,
+            e.g. 512_000_000 or "512MB". 0 disables the cache,
+            default "256MB"
+
+        datatile_store: str
+            opt-in directory where datatiles are persisted as memory-mapped
+            .npy files, keyed by a fingerprint of the dataset (schema,
+            number of rows and per-column min/max) and the chart binning,
+            so that they are reused after a server restart instead of
+            being recomputed. None disables the store, default None
+
+        datatile_store_size: int or str
+            disk budget of the datatile store, e.g. 10_000_000_000 or
+            "10GB". The least recently used datatiles are removed from the
+            store to stay within it, None means unbounded, default "2GB"
+
+        frame_budget: float
+            time in seconds the charts may take to update while a range
+            slider is dragged. Datatiles with many bins are then queried at
+            a coarser resolution that fits the budget, and at full
+            resolution once the slider is released. None always queries
+            the full resolution, default 1 / 30
+
+        datatile_memory_limit: int or str
+            memory budget of the datatiles of the charts, e.g.
+            2_000_000_000 or "2GB". The least recently queried datatiles
+            are downgraded to a coarser resolution, then evicted and
+            rebuilt on demand, to stay within the budget, see
+            DashBoard.datatile_memory_info. Datatiles kept for inactive
+            views by the datatile cache count against the budget, and are
+            dropped first. None means unbounded, default None
+
+        filter_cache_size: int or str
+            memory budget of the least recently used cache of the rows
+            selected by each filter state of the dashboard, stored as row
+            ids, which avoids filtering the data again for a filter state
+            evaluated by a previous interaction, see
+            DashBoard.filter_cache_info. 0 disables the cache,
+            default "128MB"
+
+        refresh_workers: int
+            number of threads computing the new sources of the charts
+            after an interaction. With more than 1, the aggregations of the
+            charts run in parallel, and only the updates of their plots
+            are applied one chart at a time. 1 updates the charts one
+            after the other, default 1
+
         Examples
         --------
         >>> import cudf
@@ -213,5 +270,18 @@ class DataFrame:
             notebook_assets.load_notebook_assets()
 
         return DashBoard(
-            charts, self, layout, theme, title, data_size_widget, warnings
+            charts,
+            self,
+            layout,
+            theme,
+            title,
+            data_size_widget,
+            warnings,
+            datatile_cache_size=datatile_cache_size,
+            datatile_store=datatile_store,
+            datatile_store_size=datatile_store_size,
+            frame_budget=frame_budget,
+            datatile_memory_limit=datatile_memory_limit,
+            filter_cache_size=filter_cache_size,
+            refresh_workers=refresh_workers,
         )
@@ -1,8 +1,26 @@
-from typing import Type
+from typing import Dict, List, Type
+import numpy as np
 
+from .assets.datatiles import (
+    DataTilePyramid,
+    DenseDataTile,
+    HLLDataTile,
+    QuantileDataTile,
+    RangeMinMaxDataTile,
+    SparseDataTile,
+    coo_to_dense,
+    get_quantile,
+)
+from .assets.datatiles.pyramid import PYRAMID_MIN_BINS
 from .assets.numba_kernels import gpu_datatile
 from .charts.core.core_chart import BaseChart
 
+# datatiles with at least SPARSE_DATATILE_MIN_CELLS cells are built from
+# their non-empty cells only, and kept sparse if the fraction of non-empty
+# cells is below the sparse_density of the DataTile
+SPARSE_DATATILE_MIN_CELLS = 1_000_000
+SPARSE_DATATILE_DENSITY = 0.1
+
 
 class DataTile:
     dtype: str = "pandas"
@@ -10,6 +28,9 @@ class DataTile:
     dimensions: int = 2
     active_chart: Type[BaseChart] = None
     passive_chart: Type[BaseChart] = None
+    active_bins = None
+    sparse_density: float = SPARSE_DATATILE_DENSITY
+    pyramid: bool = False
 
     def __init__(
         self,
@@ -18,15 +39,128 @@ class DataTile:
         dtype: str = "pandas",
         dimensions: int = 2,
         cumsum: bool = True,
+        active_bins=None,
+        sparse_density: float = SPARSE_DATATILE_DENSITY,
+        pyramid: bool = False,
     ):
         """
         init function
+
+        dtype: pandas/arrow/ColumnDataSource, or "array" for
+            assets.datatiles.DenseDataTile/SparseDataTile datatiles
+        active_bins: (bin_ids, n_bins) of the active chart for the data
+            the datatile is calculated on, see cudf_utils.get_bin_ids.
+            Taken from active_chart.get_bin_ids if None
+        sparse_density: "array" datatiles of at least
+            SPARSE_DATATILE_MIN_CELLS cells with a smaller fraction of
+            non-empty cells are stored as SparseDataTile, 0 disables
+            sparse datatiles
+        pyramid: wrap "array" datatiles with more than PYRAMID_MIN_BINS
+            active bins in a DataTilePyramid of coarser levels, for range
+            queries within a time budget
         """
         self.dtype = dtype
         self.dimensions = dimensions
         self.active_chart = active_chart
         self.passive_chart = passive_chart
         self.cumsum = cumsum
+        self.active_bins = active_bins
+        self.sparse_density = sparse_density
+        self.pyramid = pyramid
+
+    def _get_active_bins(self, data):
+        """
+        bin-ids of the active chart, cached by the chart for the dataframe
+        of the dashboard, None for dask dataframes
+        """
+        if self.active_bins is None:
+            self.active_bins = self.active_chart.get_bin_ids(data)
+        return self.active_bins
+
+    @property
+    def _return_format(self):
+        return "numpy" if self.dtype == "array" else self.dtype
+
+    def _get_return_format(self, data):
+        """
+        return format of the 2d datatiles, large "array" datatiles are
+        computed as non-empty cells only (coo)
+        """
+        if (
+            self.dtype == "array"
+            and self.sparse_density
+            and self._get_active_bins(data) is not None
+        ):
+            chart = self.passive_chart
+            n_cells = self.active_bins[1] * (
+                int(round((chart.max_value - chart.min_value) / chart.stride))
+                + 1
+            )
+            if n_cells >= SPARSE_DATATILE_MIN_CELLS:
+                return "coo"
+        return self._return_format
+
+    def _to_array_datatile(self, result, aggregate_fn, cumsum, data, column):
+        """
+        wrap the numpy/coo result of gpu_datatile as a DenseDataTile
+        (RangeMinMaxDataTile for min/max, QuantileDataTile for
+        median/percentiles, HLLDataTile for nunique), or a SparseDataTile
+        below sparse_density, with its rows in the order of the passive
+        chart x-axis, in a DataTilePyramid if pyramid is set and the
+        datatile has more than PYRAMID_MIN_BINS active bins
+        """
+        if self.dtype != "array":
+            return result
+        datatile = self._build_array_datatile(
+            result, aggregate_fn, cumsum, data, column
+        )
+        if self.pyramid and datatile.n_bins > PYRAMID_MIN_BINS:
+            datatile = DataTilePyramid(datatile, PYRAMID_MIN_BINS)
+        return datatile
+
+    def _build_array_datatile(
+        self, result, aggregate_fn, cumsum, data, column
+    ):
+        rows = self.passive_chart.get_datatile_indices()
+        if get_quantile(aggregate_fn) is not None:
+            sketches, edges = result
+            return QuantileDataTile(
+                sketches, edges, aggregate_fn, cumsum=cumsum, rows=rows
+            )
+        if aggregate_fn == "nunique":
+            return HLLDataTile(result, rows=rows)
+        if isinstance(result, tuple):
+            passive_ids, active_ids, values, shape = result
+            if len(passive_ids) < self.sparse_density * shape[0] * shape[1]:
+                return SparseDataTile(
+                    passive_ids,
+                    active_ids,
+                    values,
+                    shape,
+                    aggregate_fn,
+                    cumsum=cumsum,
+                    rows=rows,
+                )
+            result = coo_to_dense(
+                passive_ids, active_ids, values, shape, aggregate_fn, cumsum
+            )
+        dtype = None
+        if column is not None and aggregate_fn != "count":
+            dtype = data[column].dtype
+            if dtype != np.float32:
+                dtype = None
+        if aggregate_fn in ["min", "max"]:
+            # sparse table for constant time min/max range queries
+            return RangeMinMaxDataTile(
+                result, aggregate_fn, rows=rows, dtype=dtype
+            )
+        return DenseDataTile(
+            result,
+            aggregate_fn,
+            cumsum=cumsum,
+            rows=rows,
+            dtype=dtype,
+        )
 
     def calc_data_tile(self, data, query=""):
         """
@@ -45,14 +179,48 @@ class DataTile:
         """
         calc data tiles for dataset size
         """
-        return gpu_datatile.calc_data_tile_for_size(
+        result = gpu_datatile.calc_data_tile_for_size(
             data,
             self.active_chart.x,
             self.active_chart.min_value,
             self.active_chart.max_value,
             self.active_chart.stride,
             cumsum=self.cumsum,
-            return_format=self.dtype,
+            return_format=self._return_format,
+            active_bins=self._get_active_bins(data),
+        )
+        return self._to_array_datatile(
+            result, "count", self.cumsum, data, None
+        )
+
+    def _get_stacked_args(self, data):
+        """
+        (passive_bins, column, aggregate_fn, cumsum, return_format) of the
+        datatile for gpu_datatile.calc_stacked_data_tiles, None for the
+        datatiles built on their own (datasize, choropleth, min/max,
+        quantile, nunique, coo and dask datatiles)
+        """
+        chart = self.passive_chart
+        if (
+            self.dimensions != 2
+            or chart.chart_type in ["datasize_indicator", "choropleth"]
+            or chart.aggregate_fn not in ["count", "sum", "mean"]
+            or self._get_active_bins(data) is None
+        ):
+            return None
+        return_format = self._get_return_format(data)
+        if return_format == "coo":
+            return None
+        passive_bins = chart.get_bin_ids(data)
+        if passive_bins is None:
+            return None
+        column = chart.y if chart.y is not None else chart.x
+        return (
+            passive_bins,
+            column,
+            chart.aggregate_fn,
+            self.cumsum,
+            return_format,
         )
 
     def _calc_2d_data_tile(self, data):
@@ -60,7 +228,12 @@ class DataTile:
         calc data tiles
         """
         # cumsum has to be false for aggregate charts with agg_fn = min/max
-        if self.cumsum and self.passive_chart.aggregate_fn in ["min", "max"]:
+        # or nunique
+        if self.cumsum and self.passive_chart.aggregate_fn in [
+            "min",
+            "max",
+            "nunique",
+        ]:
             self.cumsum = False
         return_result = gpu_datatile.calc_data_tile(
             data,
@@ -68,51 +241,166 @@ class DataTile:
             self.passive_chart,
             self.passive_chart.aggregate_fn,
             cumsum=self.cumsum,
-            return_format=self.dtype,
+            return_format=self._get_return_format(data),
+            active_bins=self._get_active_bins(data),
+            passive_bins=self.passive_chart.get_bin_ids(data),
+        )
+        return self._to_array_datatile(
+            return_result,
+            self.passive_chart.aggregate_fn,
+            self.cumsum,
+            data,
+            self.passive_chart.y,
         )
-        return return_result
 
     def _calc_choropleth_data_tile(self, data):
         """
         calc multiple data tiles for color and elevation agg for 3d choropleth
         """
         ret_datatile = {}
+        active_bins = self._get_active_bins(data)
+        # bin-ids of the choropleth are shared by color and elevation
+        passive_bins = self.passive_chart.get_bin_ids(data)
         self.passive_chart.y = self.passive_chart.color_column
         cumsum = self.cumsum
         # cumsum has to be false for aggregate charts with agg_fn = min/max
+        # or nunique
         if self.cumsum and self.passive_chart.color_aggregate_fn in [
             "min",
             "max",
+            "nunique",
         ]:
             cumsum = False
 
-        ret_datatile[
-            self.passive_chart.color_column
-        ] = gpu_datatile.calc_data_tile(
-            data,
-            self.active_chart,
-            self.passive_chart,
-            self.passive_chart.color_aggregate_fn,
-            cumsum=cumsum,
-            return_format=self.dtype,
+        ret_datatile[self.passive_chart.color_column] = (
+            self._to_array_datatile(
+                gpu_datatile.calc_data_tile(
+                    data,
+                    self.active_chart,
+                    self.passive_chart,
+                    self.passive_chart.color_aggregate_fn,
+                    cumsum=cumsum,
+                    return_format=self._get_return_format(data),
+                    active_bins=active_bins,
+                    passive_bins=passive_bins,
+                ),
+                self.passive_chart.color_aggregate_fn,
+                cumsum,
+                data,
+                self.passive_chart.color_column,
+            )
         )
         if self.passive_chart.elevation_column is not None:
             cumsum = self.cumsum
             # cumsum has to be false for aggregate charts with agg_fn = min/max
+            # or nunique
             if self.cumsum and self.passive_chart.elevation_aggregate_fn in [
                 "min",
                 "max",
+                "nunique",
             ]:
                 cumsum = False
             self.passive_chart.y = self.passive_chart.elevation_column
-            ret_datatile[
-                self.passive_chart.elevation_column
-            ] = gpu_datatile.calc_data_tile(
-                data,
-                self.active_chart,
-                self.passive_chart,
-                self.passive_chart.elevation_aggregate_fn,
-                cumsum=cumsum,
-                return_format=self.dtype,
+            ret_datatile[self.passive_chart.elevation_column] = (
+                self._to_array_datatile(
+                    gpu_datatile.calc_data_tile(
+                        data,
+                        self.active_chart,
+                        self.passive_chart,
+                        self.passive_chart.elevation_aggregate_fn,
+                        cumsum=cumsum,
+                        return_format=self._get_return_format(data),
+                        active_bins=active_bins,
+                        passive_bins=passive_bins,
+                    ),
+                    self.passive_chart.elevation_aggregate_fn,
+                    cumsum,
+                    data,
+                    self.passive_chart.elevation_column,
+                )
             )
         return ret_datatile
+
+
+def calc_data_tiles(
+    data,
+    active_chart: Type[BaseChart],
+    passive_charts: List[Type[BaseChart]],
+    dtype: str = "pandas",
+    cumsum: bool = True,
+    sparse_density: float = SPARSE_DATATILE_DENSITY,
+    pyramid: bool = False,
+    profiler=None,
+) -> Dict[str, object]:
+    """
+    calc the datatiles of all passive_charts for active_chart in a single
+    pass over data: the caller filters data once, the bin-ids of the active
+    chart are computed once (or taken from the chart, when data is the
+    dataframe of the dashboard) and shared by every datatile, including
+    the datasize indicator and choropleth color/elevation datatiles, and
+    data is never copied or modified. The dense count/sum/mean datatiles
+    are all built together, in a single stacked bincount pass over data,
+    see gpu_datatile.calc_stacked_data_tiles, the others one at a time.
+    With a profiler, the stacked pass is timed as a "datatile" span of the
+    active chart, and the build of each other datatile as a "datatile" span
+    of its passive chart.
+
+    Returns
+    -------
+    dict of passive chart name -> datatile
+    """
+    active_bins = active_chart.get_bin_ids(data)
+
+    datatiles = {}
+    stacked = []
+    for chart in passive_charts:
+        datatile = DataTile(
+            active_chart,
+            chart,
+            dtype=dtype,
+            cumsum=cumsum,
+            active_bins=active_bins,
+            sparse_density=sparse_density,
+            pyramid=pyramid,
+        )
+        datatiles[chart.name] = None
+        args = datatile._get_stacked_args(data)
+        if args is not None:
+            stacked.append((datatile, args))
+        elif profiler is None:
+            datatiles[chart.name] = datatile.calc_data_tile(data)
+        else:
+            with profiler.span("datatile", chart.name):
+                datatiles[chart.name] = datatile.calc_data_tile(data)
+
+    if len(stacked) > 0:
+        if profiler is None:
+            datatiles.update(_calc_stacked_data_tiles(data, stacked))
+        else:
+            with profiler.span("datatile", active_chart.name):
+                datatiles.update(_calc_stacked_data_tiles(data, stacked))
+    return datatiles
+
+
+def _calc_stacked_data_tiles(data, stacked):
+    """
+    build the (datatile, stacked args) pairs of stacked in one pass over
+    data, sharing the active bins of the first datatile
+
+    Returns
+    -------
+    dict of passive chart name -> datatile
+    """
+    results = gpu_datatile.calc_stacked_data_tiles(
+        data,
+        stacked[0][0].active_bins,
+        [args for _, args in stacked],
+    )
+    return {
+        datatile.passive_chart.name: datatile._to_array_datatile(
+            result, aggregate_fn, cumsum, data, datatile.passive_chart.y
+        )
+        for (datatile, (_, _, aggregate_fn, cumsum, _)), result in zip(
+            stacked, results
+        )
+    }
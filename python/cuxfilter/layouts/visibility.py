@@ -0,0 +1,125 @@
+from functools import partial
+
+import panel as pn
+
+
+def _children(obj):
+    """
+    description:
+        children of a panel layout or template, with whether obj shows
+        them: the inactive tabs of a Tabs and the objects of a collapsed
+        Card are hidden
+    output:
+        - list of (child, shown)
+    """
+    if isinstance(obj, pn.Tabs):
+        return [
+            (child, i == obj.active) for i, child in enumerate(obj.objects)
+        ]
+    card = getattr(pn, "Card", None)
+    if card is not None and isinstance(obj, card):
+        return [(child, not obj.collapsed) for child in obj.objects]
+    render_items = getattr(obj, "_render_items", None)
+    if isinstance(render_items, dict):
+        return [
+            (item[0] if isinstance(item, tuple) else item, True)
+            for item in render_items.values()
+        ]
+    objects = getattr(obj, "objects", None)
+    if isinstance(objects, list):
+        return [(child, True) for child in objects]
+    return []
+
+
+def get_layout_path(model, roots):
+    """
+    description:
+        ancestors of a chart model in panel layouts, from the root
+    input:
+        - model: bokeh model or panel object of a chart, found as is or as
+        the object of a pane
+        - roots: list of panel layouts/templates
+    output:
+        - list of (ancestor, whether it shows the next one), None if model
+        is not in roots
+    """
+    seen = set()
+
+    def find(node):
+        if node is model or getattr(node, "object", None) is model:
+            return []
+        if id(node) in seen:
+            return None
+        seen.add(id(node))
+        for child, shown in _children(node):
+            path = find(child)
+            if path is not None:
+                return [(node, shown)] + path
+        return None
+
+    for root in roots:
+        path = find(root)
+        if path is not None:
+            return path
+    return None
+
+
+def is_visible(model, roots=()):
+    """
+    description:
+        whether a chart model is rendered: it is not hidden
+        (visible=False), has no zero width/height, and none of its
+        ancestors in roots is hidden, an inactive tab or a collapsed card
+    input:
+        - model: bokeh model or panel object of a chart
+        - roots: list of panel layouts/templates the model is served in
+    output:
+        - bool
+    """
+    if getattr(model, "visible", True) is False:
+        return False
+    if 0 in (getattr(model, "width", None), getattr(model, "height", None)):
+        return False
+    for node, shown in get_layout_path(model, roots) or []:
+        if not shown or getattr(node, "visible", True) is False:
+            return False
+    return True
+
+
+def watch_visibility(model, roots, callback):
+    """
+    description:
+        call callback() when a chart model, or one of its ancestors in
+        roots, is shown or hidden, see is_visible
+    input:
+        - model: bokeh model or panel object of a chart
+        - roots: list of panel layouts/templates
+        - callback: callable without arguments
+    output:
+        - callable removing the watchers
+    """
+    unwatch = []
+    ancestors = [node for node, _ in get_layout_path(model, roots) or []]
+    for obj in [model] + ancestors:
+        if hasattr(obj, "param"):
+            names = [
+                name
+                for name in ["visible", "active", "collapsed"]
+                if name in obj.param
+            ]
+            if len(names) > 0:
+                watcher = obj.param.watch(lambda event: callback(), names)
+                unwatch.append(partial(obj.param.unwatch, watcher))
+        elif hasattr(obj, "on_change"):
+
+            def on_change(attr, old, new):
+                callback()
+
+            obj.on_change("visible", on_change)
+            unwatch.append(partial(obj.remove_on_change, "visible", on_change))
+
+    def remove():
+        for fn in unwatch:
+            fn()
+
+    return remove
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from cuxfilter.assets.cache import LRUCache, parse_bytes, sizeof
+
+
+@pytest.mark.parametrize(
+    "value, result",
+    [
+        (None, None),
+        (1024, 1024),
+        ("512", 512),
+        ("2KB", 2000),
+        ("1.5MB", 1_500_000),
+        ("2GB", 2_000_000_000),
+        ("1GiB", 2 ** 30),
+    ],
+)
+def test_parse_bytes(value, result):
+    assert parse_bytes(value) == result
+
+
+def test_parse_bytes_invalid():
+    with pytest.raises(ValueError):
+        parse_bytes("2 lightyears")
+
+
+def test_sizeof():
+    arr = np.zeros(10, dtype=np.float64)
+    df = pd.DataFrame(np.zeros((2, 2)))
+
+    assert sizeof(None) == 0
+    assert sizeof(arr) == 80
+    assert sizeof([arr, arr]) == 160
+    assert sizeof({"a": arr}) == 80
+    assert sizeof(df) == df.memory_usage(index=True).sum()
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(max_bytes=200)
+    a, b, c = (np.zeros(10, dtype=np.float64) for _ in range(3))
+    cache.put("a", a)
+    cache.put("b", b)
+    # touch "a", so "b" is the least recently used entry
+    assert cache.get("a") is a
+    cache.put("c", c)
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.current_bytes == 160
+    assert cache.info() == {
+        "hits": 1,
+        "misses": 0,
+        "evictions": 1,
+        "entries": 2,
+        "current_bytes": 160,
+        "max_bytes": 200,
+    }
+
+
+def test_lru_cache_hits_misses_and_clear():
+    cache = LRUCache(max_bytes="1KB")
+    assert cache.get("key") is None
+    cache.put("key", np.zeros(2))
+    assert cache.get("key") is not None
+    # values larger than the budget are not cached
+    cache.put("large", np.zeros(1000))
+
+    assert "large" not in cache
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+
+
+def test_lru_cache_disabled():
+    cache = LRUCache(max_bytes=0)
+    cache.put("key", np.zeros(2))
+    assert len(cache) == 0
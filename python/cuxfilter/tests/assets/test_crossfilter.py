@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+from cuxfilter.assets.crossfilter import CrossFilterIndex
+
+
+def selection(x, y, x_range=None, y_range=None):
+    selected = np.ones(len(x), dtype=bool)
+    for values, value_range in [(x, x_range), (y, y_range)]:
+        if value_range is not None:
+            selected &= (values >= value_range[0]) & (values <= value_range[1])
+    return selected
+
+
+@pytest.mark.parametrize(
+    "x_ranges",
+    [
+        [(2, 7), (3, 8), (0, 4), (6, 9), (5, 5), (10, 20), (0, 9)],
+        [(4, 6), (0, 9), (9, 0), (1, 2), (7, 8)],
+    ],
+)
+def test_crossfilter_index(x_ranges):
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 10, 1000).astype(np.float64)
+    x[::50] = np.nan
+    y = rng.normal(size=1000)
+    index = CrossFilterIndex(1000)
+    index.add_dimension("x", x)
+    index.add_dimension("y", y)
+
+    added, removed = index.filter_range("y", -1, 1)
+    previous = selection(x, y, y_range=(-1, 1))
+    assert len(added) == 0
+    np.testing.assert_array_equal(np.sort(removed), np.where(~previous)[0])
+
+    for x_range in x_ranges:
+        added, removed = index.filter_range("x", *x_range)
+        expected = selection(x, y, x_range, (-1, 1))
+        np.testing.assert_array_equal(index.selected, expected)
+        assert index.n_selected == expected.sum()
+        # only the rows whose selection changed are reported
+        np.testing.assert_array_equal(
+            np.sort(added), np.where(expected & ~previous)[0]
+        )
+        np.testing.assert_array_equal(
+            np.sort(removed), np.where(~expected & previous)[0]
+        )
+        previous = expected
+
+    # unfiltered dimensions select null values
+    index.filter_all("x")
+    index.remove_dimension("y")
+    assert index.selected.all()
+    assert index.n_selected == 1000
+    assert list(index.dimensions) == ["x"]
+
+
+def test_crossfilter_index_datetime():
+    dates = np.array(
+        ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04"],
+        dtype="datetime64[ns]",
+    )
+    index = CrossFilterIndex(4)
+    index.add_dimension("date", dates.astype(np.int64), datetime=True)
+    index.filter_range(
+        "date", np.datetime64("2020-01-02"), np.datetime64("2020-01-03")
+    )
+    np.testing.assert_array_equal(index.selected, [False, True, True, False])
+
+    with pytest.raises(ValueError):
+        index.add_dimension("other", np.arange(3))
+
+
+def test_crossfilter_index_mask():
+    x = np.arange(10, dtype=np.float64)
+    index = CrossFilterIndex(10)
+    index.add_dimension("x", x)
+    index.filter_range("x", 2, 7)
+
+    mask = x % 2 == 0
+    added, removed = index.filter_mask(mask, key="even")
+    np.testing.assert_array_equal(index.selected, mask & (x >= 2) & (x <= 7))
+    assert len(added) == 0 and sorted(removed) == [3, 5, 7]
+    assert index.mask_key == "even"
+
+    # only the rows whose mask value changes are visited
+    added, removed = index.filter_mask(x < 5, key="low")
+    assert sorted(added) == [3] and sorted(removed) == [6]
+    added, removed = index.filter_mask(None)
+    assert sorted(added) == [5, 6, 7] and len(removed) == 0
+    assert index.n_selected == 6
+
+
+@pytest.mark.parametrize("kind", ["count", "sum", "nunique"])
+def test_crossfilter_index_group(kind):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=1000)
+    bin_ids = rng.integers(0, 6, 1000)
+    # bin id 5 is out of range
+    n_bins = 5
+    weights = rng.normal(size=1000)
+    codes = rng.integers(-1, 7, 1000)
+    kwargs = {
+        "count": {},
+        "sum": {"weights": weights},
+        "nunique": {"codes": codes, "n_codes": 7},
+    }[kind]
+
+    def expected(selected):
+        result = []
+        for bin_id in range(n_bins):
+            rows = selected & (bin_ids == bin_id)
+            if kind == "count":
+                result.append(rows.sum())
+            elif kind == "sum":
+                result.append(weights[rows].sum())
+            else:
+                result.append(len(np.unique(codes[rows & (codes >= 0)])))
+        return result
+
+    index = CrossFilterIndex(1000)
+    index.add_dimension("x", x)
+    index.filter_range("x", -1, 1)
+    group = index.add_group("group", bin_ids, n_bins, **kwargs)
+    np.testing.assert_allclose(group.get_values(), expected(index.selected))
+
+    for x_range, mask in [
+        ((-2, 0), None),
+        ((0.5, 3), x < 2),
+        ((-0.1, 0.1), x > 0),
+        ((-3, 3), None),
+    ]:
+        index.filter_range("x", *x_range)
+        index.filter_mask(mask)
+        np.testing.assert_allclose(
+            group.get_values(), expected(index.selected), atol=1e-9
+        )
+    np.testing.assert_allclose(
+        group.get_values(rows=[4, 0]), group.get_values()[[4, 0]]
+    )
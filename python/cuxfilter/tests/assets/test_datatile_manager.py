@@ -0,0 +1,114 @@
+import gc
+import weakref
+
+import numpy as np
+
+from cuxfilter.assets.datatiles import (
+    DataTileManager,
+    DataTilePyramid,
+    DenseDataTile,
+)
+
+
+def pyramid(n_bins=1024):
+    return DataTilePyramid(
+        DenseDataTile(np.ones((2, n_bins)).cumsum(axis=1), "count")
+    )
+
+
+def test_datatile_manager_downgrade():
+    manager = DataTileManager()
+    manager["a"] = pyramid()
+    manager["b"] = pyramid()
+    manager["c"] = None
+    full_bytes = manager.current_bytes
+    assert manager.info()["charts"]["c"]["bytes"] == 0
+
+    # the least recently queried datatile is downgraded first
+    manager.max_bytes = full_bytes - 1
+    manager.touch("a")
+    manager.enforce()
+    assert manager.info()["charts"]["b"]["resolution"] == 1
+    assert manager.info()["charts"]["a"]["resolution"] == 0
+    assert manager.current_bytes < full_bytes
+    assert manager.downgrades == 1
+
+    # downgraded datatiles answer queries at the coarser resolution
+    np.testing.assert_array_equal(manager["b"].query_range(0, 1), [2, 2])
+    np.testing.assert_array_equal(manager["b"].query_range(0, 0), [2, 2])
+    np.testing.assert_array_equal(manager["b"].query_indices([2]), [2, 2])
+
+
+def test_datatile_manager_eviction():
+    manager = DataTileManager("1KB")
+    manager["a"] = DenseDataTile(np.ones((2, 100)), "count")
+    manager["b"] = DenseDataTile(np.ones((2, 100)), "count")
+
+    assert manager.is_evicted("a")
+    assert manager["a"] is None
+    assert manager.current_bytes == manager.info()["charts"]["b"]["bytes"]
+    assert manager.info()["evicted"] == ["a"]
+
+    # a datatile that does not fit on its own is kept
+    manager["a"] = DenseDataTile(np.ones((2, 1000)), "count")
+    assert manager.info()["rebuilds"] == 1
+    assert manager.is_evicted("b")
+    assert not manager.is_evicted("a")
+
+    manager.clear()
+    assert len(manager) == 0
+    assert manager.current_bytes == 0
+
+
+def test_datatile_manager_cache():
+    manager = DataTileManager(cache_bytes="2KB")
+    a = DenseDataTile(np.ones((2, 100)), "count")
+    manager.set("chart", a, key="a")
+    assert manager.get_cached("a") is a
+
+    # the previous datatile of a chart is cached under its key, and
+    # counted once in the memory usage
+    b = DenseDataTile(np.ones((2, 100)), "count")
+    manager.set("chart", b, key="b")
+    assert manager.get_cached("a") is a
+    assert manager.current_bytes == a.nbytes + b.nbytes
+    assert manager.info()["cached_bytes"] == a.nbytes
+    assert manager.cache_info()["entries"] == 2
+
+    manager.set("chart", a, key="a")
+    assert manager.current_bytes == a.nbytes + b.nbytes
+    assert manager.info()["cached_bytes"] == b.nbytes
+
+    assert manager.get_cached("c") is None
+    assert manager.cache_info()["hits"] == 2
+    assert manager.cache_info()["misses"] == 1
+
+    manager.clear_cache()
+    assert manager.cache_info()["entries"] == 0
+    assert manager.current_bytes == a.nbytes
+    assert manager["chart"] is a
+
+
+def test_datatile_manager_eviction_frees_memory():
+    manager = DataTileManager("2KB", cache_bytes="1MB")
+    a = DenseDataTile(np.ones((2, 100)), "count")
+    ref = weakref.ref(a)
+    manager.set("a", a, key="a")
+    manager.set("b", DenseDataTile(np.ones((2, 100)), "count"), key="b")
+    manager.pop("a")
+    # cached datatiles count against the memory budget
+    assert manager.get_cached("a") is a
+    assert manager.current_bytes == 2 * a.nbytes
+
+    # the cached datatile is dropped first, then the least recently
+    # queried datatile of a chart is evicted, and not cached
+    manager.set("c", DenseDataTile(np.ones((2, 100)), "count"), key="c")
+    assert manager.cache_info()["evictions"] == 1
+    manager.set("d", DenseDataTile(np.ones((2, 100)), "count"), key="d")
+    assert manager.info()["evicted"] == ["b"]
+    assert manager.get_cached("b") is None
+    assert manager.current_bytes <= manager.max_bytes
+
+    del a
+    gc.collect()
+    assert ref() is None
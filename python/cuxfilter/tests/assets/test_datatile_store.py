@@ -0,0 +1,130 @@
+import numpy as np
+import cudf
+
+from cuxfilter.assets.datatiles import (
+    DataTilePyramid,
+    DataTileStore,
+    DenseDataTile,
+    HLLDataTile,
+    QuantileDataTile,
+    RangeMinMaxDataTile,
+    SparseDataTile,
+    dataset_fingerprint,
+)
+
+tile = np.array([[1.0, 0.0, 2.0], [0.0, 3.0, 1.0]])
+
+
+def test_dataset_fingerprint():
+    df = cudf.DataFrame({"key": [0, 1, 2], "val": [1.0, 2.0, 3.0]})
+    fingerprint = dataset_fingerprint(df)
+
+    assert fingerprint == dataset_fingerprint(df.copy())
+    assert fingerprint != dataset_fingerprint(df.head(2))
+    assert fingerprint != dataset_fingerprint(df.assign(val=df.val * 2))
+    assert fingerprint != dataset_fingerprint(df.rename(columns={"val": "v"}))
+
+
+def test_datatile_store_roundtrip(tmp_path):
+    store = DataTileStore(str(tmp_path), "fingerprint")
+    datatiles = {
+        "dense": DenseDataTile(tile.cumsum(axis=1), "count", rows=[1, 0]),
+        "mean": DenseDataTile(
+            [tile.cumsum(axis=1), tile.cumsum(axis=1)], "mean"
+        ),
+        "minmax": RangeMinMaxDataTile(tile, "max"),
+        "nunique": HLLDataTile(
+            np.stack([tile, tile[::-1]], axis=2).astype(np.uint8)
+        ),
+        "quantile": QuantileDataTile(
+            np.stack([tile, tile], axis=2), [0.0, 1.0, 2.0], "median"
+        ),
+        "sparse": SparseDataTile([0, 1], [2, 1], [2.0, 3.0], (2, 3), "sum"),
+    }
+    for key, datatile in datatiles.items():
+        assert key not in store
+        store.put(key, datatile)
+    store.put("dict", {"color": datatiles["dense"]})
+
+    for key, datatile in datatiles.items():
+        loaded = DataTileStore(str(tmp_path), "fingerprint").get(key)
+        assert type(loaded) is type(datatile)
+        arrays = loaded.keys if key == "sparse" else loaded.data
+        assert isinstance(arrays, np.memmap)
+        np.testing.assert_array_equal(
+            loaded.query_range(1, 2), datatile.query_range(1, 2)
+        )
+        np.testing.assert_array_equal(
+            loaded.query_indices([0, 2]), datatile.query_indices([0, 2])
+        )
+    loaded = store.get("dict")
+    np.testing.assert_array_equal(
+        loaded["color"].query_all(), datatiles["dense"].query_all()
+    )
+    assert store.info()["entries"] == 7
+    assert store.info()["writes"] == 7
+
+
+def test_datatile_store_fingerprint(tmp_path):
+    DataTileStore(str(tmp_path), "a").put(
+        "key", DenseDataTile(tile, "count", cumsum=False)
+    )
+    store = DataTileStore(str(tmp_path), "b")
+
+    assert store.get("key") is None
+    assert store.info()["misses"] == 1
+
+    store.clear()
+    assert store.info()["entries"] == 0
+
+
+def test_datatile_store_pyramid(tmp_path):
+    store = DataTileStore(str(tmp_path), "fingerprint")
+    pyramid = DataTilePyramid(
+        DenseDataTile(np.ones((2, 8)).cumsum(axis=1), "count"), min_bins=2
+    )
+    store.put("pyramid", pyramid)
+
+    loaded = store.get("pyramid")
+    assert type(loaded) is DataTilePyramid
+    assert [level.n_bins for level in loaded.levels] == [8, 4, 2]
+    assert loaded.query_times == [None] * 3
+    loaded.budget = pyramid.budget = 0.0
+    loaded.query_times = pyramid.query_times = [1.0, 1.0, 1.0]
+    np.testing.assert_array_equal(
+        loaded.query_range(1, 5), pyramid.query_range(1, 5)
+    )
+
+
+def test_datatile_store_max_bytes(tmp_path):
+    datatile = DenseDataTile(np.ones((2, 1000)).cumsum(axis=1), "count")
+    store = DataTileStore(str(tmp_path), "fingerprint")
+    store.put("a", datatile)
+    nbytes = store.info()["current_bytes"]
+
+    store = DataTileStore(str(tmp_path), "fingerprint", max_bytes=2 * nbytes)
+    assert store.info()["current_bytes"] == nbytes
+    store.put("b", datatile)
+    # "a" is now the most recently used entry
+    assert store.get("a") is not None
+    store.put("c", datatile)
+
+    info = store.info()
+    assert info["entries"] == 2
+    assert info["evictions"] == 1
+    assert info["current_bytes"] <= info["max_bytes"]
+    assert "a" in store and "b" not in store and "c" in store
+
+
+def test_datatile_store_submit(tmp_path):
+    store = DataTileStore(str(tmp_path), "fingerprint")
+    datatile = DenseDataTile(tile, "count", cumsum=False)
+
+    future = store.submit("key", datatile)
+    store.flush()
+
+    assert future.done()
+    assert store.info()["writes"] == 1
+    np.testing.assert_array_equal(
+        store.get("key").query_all(), datatile.query_all()
+    )
@@ -0,0 +1,444 @@
+import pytest
+import numpy as np
+
+from cuxfilter.assets.datatiles import (
+    DataTilePyramid,
+    DenseDataTile,
+    HLLDataTile,
+    QuantileDataTile,
+    RangeMinMaxDataTile,
+    SparseDataTile,
+    coo_to_dense,
+    estimate_distinct,
+    get_quantile,
+    get_sketch_edges,
+    hll_nbytes,
+    set_query_budget,
+    to_datatile_index,
+)
+
+
+class Chart:
+    min_value = 10.0
+    stride = 2.0
+
+
+# 3 passive bins x 4 active bins
+counts = np.array([[1, 0, 2, 1], [0, 3, 0, 1], [4, 0, 0, 0]], dtype=float)
+sums = counts * 1.5
+maxs = np.array(
+    [[1.0, np.nan, 2.0, 5.0], [np.nan, 3.0, np.nan, 1.0], [4.0] + [np.nan] * 3]
+)
+
+
+def test_to_datatile_index():
+    assert to_datatile_index(Chart, 14.0) == 2
+    assert list(to_datatile_index(Chart, [10.0, 16.0])) == [0, 3]
+    assert len(to_datatile_index(Chart, [])) == 0
+
+
+@pytest.mark.parametrize("cumsum", [True, False])
+@pytest.mark.parametrize(
+    "index_min, index_max", [(0, 3), (1, 2), (2, 2), (-5, 1), (3, 10)]
+)
+def test_dense_datatile_query_range(cumsum, index_min, index_max):
+    tile = counts.cumsum(axis=1) if cumsum else counts
+    datatile = DenseDataTile(tile, "count", cumsum=cumsum)
+    expected = counts[:, max(index_min, 0) : index_max + 1].sum(axis=1)
+
+    assert datatile.data.dtype == np.int32
+    assert datatile.data.flags["C_CONTIGUOUS"]
+    assert np.array_equal(datatile.query_range(index_min, index_max), expected)
+
+
+@pytest.mark.parametrize("cumsum", [True, False])
+def test_dense_datatile_query_indices(cumsum):
+    tile = counts.cumsum(axis=1) if cumsum else counts
+    datatile = DenseDataTile(tile, "count", cumsum=cumsum)
+
+    assert np.array_equal(
+        datatile.query_indices([0, 3]), counts[:, [0, 3]].sum(axis=1)
+    )
+    assert np.array_equal(datatile.query_indices([]), np.zeros(3))
+    assert np.array_equal(datatile.query_all(), counts.sum(axis=1))
+    assert np.array_equal(datatile.to_numpy(), tile)
+
+
+def test_dense_datatile_rows():
+    datatile = DenseDataTile(
+        counts.cumsum(axis=1), "count", cumsum=True, rows=[2, 0]
+    )
+
+    assert datatile.n_rows == 2
+    assert datatile.n_bins == 4
+    assert np.array_equal(datatile.query_range(0, 1), [4.0, 1.0])
+
+
+def test_dense_datatile_mean():
+    datatile = DenseDataTile(
+        [sums.cumsum(axis=1), counts.cumsum(axis=1)], "mean", cumsum=True
+    )
+
+    assert datatile.data.dtype == np.float64
+    assert datatile.counts.dtype == np.int32
+    assert np.array_equal(datatile.query_range(0, 3), [1.5, 1.5, 1.5])
+    assert np.isnan(datatile.query_range(2, 3)[2])
+    assert datatile.nbytes == datatile.data.nbytes + datatile.counts.nbytes
+
+
+def test_dense_datatile_max():
+    datatile = DenseDataTile(maxs, "max", cumsum=False)
+
+    np.testing.assert_array_equal(datatile.query_range(0, 3), [5.0, 3.0, 4.0])
+    np.testing.assert_array_equal(
+        datatile.query_indices([1, 2]), [2.0, 3.0, np.nan]
+    )
+    with pytest.raises(ValueError):
+        DenseDataTile(maxs, "max", cumsum=True)
+
+
+def test_dense_datatile_float32_sums():
+    datatile = DenseDataTile(
+        sums.astype(np.float32), "sum", cumsum=False, dtype=np.float32
+    )
+
+    assert datatile.data.dtype == np.float32
+    assert datatile.query_all().dtype == np.float64
+
+
+@pytest.mark.parametrize("aggregate_fn", ["sum", "mean"])
+def test_dense_datatile_float32_cumsum(aggregate_fn):
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 1000, (2, 10_000)).astype(np.float32)
+    counts = np.ones_like(values, dtype=np.int64)
+    data = np.cumsum(values.astype(np.float64), axis=1)
+    if aggregate_fn == "mean":
+        data = [data, np.cumsum(counts, axis=1)]
+    datatile = DenseDataTile(data, aggregate_fn, dtype=np.float32)
+
+    # prefix sums are kept in float64
+    assert datatile.data.dtype == np.float64
+    # a range far from bin 0 is the difference of two large prefix sums
+    expected = values[:, 9000:9003].astype(np.float64).sum(axis=1)
+    if aggregate_fn == "mean":
+        expected = expected / 3
+    np.testing.assert_allclose(
+        datatile.query_range(9000, 9002), expected, rtol=1e-9
+    )
+
+
+def test_dense_datatile_1d():
+    datatile = DenseDataTile(np.array([1.0, 3.0, 6.0]), "count", cumsum=True)
+
+    assert datatile.n_rows == 1
+    assert datatile.query_range(1, 2)[0] == 5.0
+    assert datatile.query_indices([0, 2])[0] == 4.0
+
+
+def sparse_from_dense(tile, aggregate_fn, rows=None):
+    values = [tile] if aggregate_fn != "mean" else tile
+    if aggregate_fn in ["min", "max"]:
+        passive_ids, active_ids = np.nonzero(~np.isnan(values[-1]))
+    else:
+        passive_ids, active_ids = np.nonzero(values[-1])
+    cells = [value[passive_ids, active_ids] for value in values]
+    return SparseDataTile(
+        passive_ids,
+        active_ids,
+        cells if aggregate_fn == "mean" else cells[0],
+        values[0].shape,
+        aggregate_fn,
+        rows=rows,
+    )
+
+
+@pytest.mark.parametrize("aggregate_fn", ["count", "sum", "mean", "max"])
+@pytest.mark.parametrize("rows", [None, [2, 0]])
+def test_sparse_datatile_matches_dense(aggregate_fn, rows):
+    tile = {
+        "count": counts,
+        "sum": sums,
+        "mean": [sums, counts],
+        "max": maxs,
+    }[aggregate_fn]
+    cumsum = aggregate_fn != "max"
+    dense = DenseDataTile(
+        [t.cumsum(axis=1) for t in tile]
+        if aggregate_fn == "mean"
+        else (tile.cumsum(axis=1) if cumsum else tile),
+        aggregate_fn,
+        cumsum=cumsum,
+        rows=rows,
+    )
+    sparse = sparse_from_dense(tile, aggregate_fn, rows=rows)
+
+    assert sparse.n_rows == dense.n_rows
+    for index_min, index_max in [(0, 3), (1, 2), (3, 3), (2, 1)]:
+        np.testing.assert_array_equal(
+            sparse.query_range(index_min, index_max),
+            dense.query_range(index_min, index_max),
+        )
+    for indices in [[0], [1, 3], []]:
+        np.testing.assert_array_equal(
+            sparse.query_indices(indices), dense.query_indices(indices)
+        )
+    np.testing.assert_array_equal(sparse.to_numpy(), dense.to_numpy())
+
+
+def test_sparse_datatile_memory():
+    passive_ids = np.arange(1000)
+    sparse = SparseDataTile(
+        passive_ids, passive_ids, np.ones(1000), (1000, 1000), "count"
+    )
+
+    assert sparse.nnz == 1000
+    assert sparse.density == 0.001
+    assert sparse.nbytes < 1000 * 1000 * 4 / 100
+    assert sparse.query_range(0, 499).sum() == 500
+
+
+def test_coo_to_dense():
+    result = coo_to_dense(
+        np.array([0, 1]), np.array([1, 0]), np.array([2.0, 3.0]), (2, 2)
+    )
+
+    assert np.array_equal(result, [[0.0, 2.0], [3.0, 3.0]])
+
+
+@pytest.mark.parametrize("aggregate_fn", ["min", "max"])
+@pytest.mark.parametrize("n_bins", [1, 7, 16])
+def test_range_minmax_datatile(aggregate_fn, n_bins):
+    rng = np.random.default_rng(0)
+    tile = rng.random((4, n_bins))
+    tile[rng.random((4, n_bins)) < 0.3] = np.nan
+    dense = DenseDataTile(tile, aggregate_fn, cumsum=False, rows=[3, 1, 0])
+    rmq = RangeMinMaxDataTile(tile, aggregate_fn, rows=[3, 1, 0])
+
+    for index_min in range(-1, n_bins):
+        for index_max in range(index_min, n_bins + 1):
+            np.testing.assert_array_equal(
+                rmq.query_range(index_min, index_max),
+                dense.query_range(index_min, index_max),
+            )
+    np.testing.assert_array_equal(
+        rmq.query_indices([0, n_bins - 1]),
+        dense.query_indices([0, n_bins - 1]),
+    )
+    assert rmq.nbytes >= dense.nbytes
+
+
+def test_range_minmax_datatile_aggregate_fn():
+    with pytest.raises(ValueError):
+        RangeMinMaxDataTile(counts, "sum")
+
+
+@pytest.mark.parametrize("aggregate_fn", ["count", "mean", "max"])
+@pytest.mark.parametrize("n_bins", [4, 7])
+def test_datatile_coarsen(aggregate_fn, n_bins):
+    rng = np.random.default_rng(0)
+    tile = rng.integers(0, 3, (3, n_bins)).astype(float)
+    if aggregate_fn == "max":
+        tile[tile == 0] = np.nan
+    datatiles = [
+        sparse_from_dense(
+            [tile, tile] if aggregate_fn == "mean" else tile, aggregate_fn
+        )
+    ]
+    if aggregate_fn == "max":
+        datatiles += [
+            DenseDataTile(tile, aggregate_fn, cumsum=False),
+            RangeMinMaxDataTile(tile, aggregate_fn),
+        ]
+    else:
+        cumulated = tile.cumsum(axis=1)
+        datatiles += [
+            DenseDataTile(
+                [cumulated] * 2 if aggregate_fn == "mean" else cumulated,
+                aggregate_fn,
+            ),
+            DenseDataTile(
+                [tile, tile] if aggregate_fn == "mean" else tile,
+                aggregate_fn,
+                cumsum=False,
+            ),
+        ]
+
+    for datatile in datatiles:
+        coarse = datatile.coarsen()
+        assert coarse.n_bins == (n_bins + 1) // 2
+        for index_min in range(coarse.n_bins):
+            for index_max in range(index_min, coarse.n_bins):
+                np.testing.assert_array_equal(
+                    coarse.query_range(index_min, index_max),
+                    datatile.query_range(2 * index_min, 2 * index_max + 1),
+                )
+
+
+def test_datatile_pyramid():
+    tile = np.ones((2, 1000))
+    pyramid = DataTilePyramid(DenseDataTile(tile.cumsum(axis=1), "count"))
+
+    assert [level.n_bins for level in pyramid.levels] == [1000, 500, 250]
+    assert pyramid.nbytes == sum(level.nbytes for level in pyramid.levels)
+    np.testing.assert_array_equal(pyramid.query_range(1, 2), [2.0, 2.0])
+    np.testing.assert_array_equal(pyramid.query_indices([1, 5]), [2.0, 2.0])
+
+    # levels that exceeded the budget are skipped, the range is snapped to
+    # the bins of the coarser level
+    pyramid.query_times = [1.0, 1.0, None]
+    set_query_budget({"chart": pyramid}, 0.5)
+    assert pyramid.level_for_budget(0.5) == 2
+    np.testing.assert_array_equal(pyramid.query_range(1, 2), [4.0, 4.0])
+    assert pyramid.query_times[2] is not None
+
+    set_query_budget(pyramid, None)
+    np.testing.assert_array_equal(pyramid.query_range(1, 2), [2.0, 2.0])
+
+
+@pytest.mark.parametrize(
+    "aggregate_fn, quantile",
+    [
+        ("median", 0.5),
+        ("p95", 0.95),
+        ("p99.9", pytest.approx(0.999)),
+        ("mean", None),
+    ],
+)
+def test_get_quantile(aggregate_fn, quantile):
+    assert get_quantile(aggregate_fn) == quantile
+
+
+@pytest.mark.parametrize("aggregate_fn", ["median", "p95"])
+@pytest.mark.parametrize("cumsum", [True, False])
+def test_quantile_datatile(aggregate_fn, cumsum):
+    rng = np.random.default_rng(0)
+    passive_ids = rng.integers(0, 3, 10_000)
+    active_ids = rng.integers(0, 8, 10_000)
+    values = rng.normal(passive_ids, 1.0)
+    edges = get_sketch_edges(values.min(), values.max())
+    buckets = np.minimum(
+        ((values - edges[0]) / (edges[1] - edges[0])).astype(int), 63
+    )
+    sketches = np.zeros((3, 8, 64))
+    np.add.at(sketches, (passive_ids, active_ids, buckets), 1)
+    datatile = QuantileDataTile(
+        sketches.cumsum(axis=1) if cumsum else sketches,
+        edges,
+        aggregate_fn,
+        cumsum=cumsum,
+        rows=[2, 0],
+    )
+
+    def expected(active):
+        return [
+            np.quantile(
+                values[(passive_ids == row) & active],
+                get_quantile(aggregate_fn),
+            )
+            for row in [2, 0]
+        ]
+
+    # the error is bounded by the width of a value bucket
+    width = edges[1] - edges[0]
+    np.testing.assert_allclose(
+        datatile.query_range(2, 5),
+        expected((active_ids >= 2) & (active_ids <= 5)),
+        atol=width,
+    )
+    np.testing.assert_allclose(
+        datatile.query_indices([0, 7]),
+        expected(np.isin(active_ids, [0, 7])),
+        atol=width,
+    )
+    np.testing.assert_allclose(
+        datatile.coarsen().query_range(1, 2),
+        datatile.query_range(2, 5),
+    )
+    assert np.isnan(datatile.query_range(9, 10)).all()
+    assert datatile.to_numpy().shape == (2, 8, 64)
+
+
+def test_quantile_datatile_aggregate_fn():
+    with pytest.raises(ValueError):
+        QuantileDataTile(np.zeros((1, 2, 4)), np.arange(5), "sum")
+
+
+def _hll_registers(passive_ids, active_ids, values, shape, precision=8):
+    """
+    HyperLogLog registers built with numpy, values being random 64-bit
+    hashes
+    """
+    registers = (values >> np.uint64(64 - precision)).astype(int)
+    rest = values << np.uint64(precision)
+    rank = np.array(
+        [64 - int(value).bit_length() + 1 for value in rest]
+    ).clip(max=64 - precision + 1)
+    data = np.zeros(shape + (1 << precision,), dtype=np.uint8)
+    np.maximum.at(data, (passive_ids, active_ids, registers), rank)
+    return data
+
+
+def _random_hashes(rng, n):
+    return np.frombuffer(rng.bytes(8 * n), dtype=np.uint64)
+
+
+def test_estimate_distinct():
+    rng = np.random.default_rng(0)
+    for n_distinct in [10, 1000, 100_000]:
+        zeros = np.zeros(n_distinct, dtype=int)
+        registers = _hll_registers(
+            zeros, zeros, _random_hashes(rng, n_distinct), (1, 1)
+        )
+        # 3 standard errors of 1.04 / sqrt(256)
+        assert estimate_distinct(registers[0]) == pytest.approx(
+            [n_distinct], rel=0.2
+        )
+    assert estimate_distinct(np.zeros((1, 256))) == [0]
+
+
+def test_hll_datatile():
+    rng = np.random.default_rng(0)
+    values = rng.choice(_random_hashes(rng, 5_000), 20_000)
+    passive_ids = rng.integers(0, 3, 20_000)
+    active_ids = rng.integers(0, 8, 20_000)
+    datatile = HLLDataTile(
+        _hll_registers(passive_ids, active_ids, values, (3, 8)), rows=[2, 0]
+    )
+
+    def expected(active):
+        return [
+            len(np.unique(values[(passive_ids == row) & active]))
+            for row in [2, 0]
+        ]
+
+    assert datatile.aggregate_fn == "nunique" and not datatile.cumsum
+    np.testing.assert_allclose(
+        datatile.query_range(2, 5),
+        expected((active_ids >= 2) & (active_ids <= 5)),
+        rtol=0.2,
+    )
+    np.testing.assert_allclose(
+        datatile.query_indices([0, 7]),
+        expected(np.isin(active_ids, [0, 7])),
+        rtol=0.2,
+    )
+    # registers merge exactly, whatever the order of the merges
+    np.testing.assert_array_equal(
+        datatile.query_indices([2, 3, 4, 5]), datatile.query_range(2, 5)
+    )
+    np.testing.assert_array_equal(
+        datatile.coarsen().query_range(1, 2), datatile.query_range(2, 5)
+    )
+    np.testing.assert_array_equal(datatile.query_range(9, 10), [0, 0])
+    assert datatile.to_numpy().shape == (2, 8, 256)
+    assert datatile.to_numpy().dtype == np.uint8
+
+
+@pytest.mark.parametrize("n_rows, n_bins", [(1, 1), (3, 8), (2, 13)])
+def test_hll_nbytes(n_rows, n_bins):
+    datatile = HLLDataTile(np.zeros((n_rows, n_bins, 256), dtype=np.uint8))
+    assert datatile.nbytes <= hll_nbytes(n_rows, n_bins)
+    # registers and sparse table levels
+    assert hll_nbytes(n_rows, n_bins) == n_rows * n_bins * 256 * len(
+        datatile.levels
+    )
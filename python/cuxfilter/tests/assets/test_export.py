@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from cuxfilter.assets.export import iter_chunks, write_chunks
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+@pytest.mark.parametrize("row_ids", [None, np.array([1, 3, 4, 8], np.int32)])
+def test_write_chunks(tmp_path, format, row_ids):
+    df = pd.DataFrame(
+        {"a": np.arange(10), "b": np.arange(10) * 0.5, "c": list("abcdefghij")}
+    )
+    path = str(tmp_path / f"export.{format}")
+    progress = []
+
+    n_rows = write_chunks(
+        path,
+        iter_chunks(df, ["c", "a"], 3, row_ids),
+        format,
+        total_rows=10 if row_ids is None else len(row_ids),
+        progress=lambda *args: progress.append(args),
+    )
+
+    expected = df if row_ids is None else df.iloc[row_ids]
+    if format == "parquet":
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    assert n_rows == len(expected)
+    assert table.column_names == ["c", "a"]
+    pd.testing.assert_frame_equal(
+        table.to_pandas(), expected[["c", "a"]].reset_index(drop=True)
+    )
+    assert progress[-1] == (n_rows, n_rows)
+    assert len(progress) == -(-n_rows // 3)
+
+
+def test_write_chunks_empty(tmp_path):
+    df = pd.DataFrame({"a": np.arange(4)})
+    path = str(tmp_path / "export.parquet")
+    rows = np.array([], dtype=np.int32)
+
+    assert write_chunks(path, iter_chunks(df, ["a"], 2, rows)) == 0
+    assert pq.read_table(path).column_names == ["a"]
+
+    with pytest.raises(ValueError):
+        write_chunks(path, iter_chunks(df, ["a"], 2), format="csv")
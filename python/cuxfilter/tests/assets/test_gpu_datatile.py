@@ -3,100 +3,14 @@ import pytest
 from cuxfilter.assets.numba_kernels import gpu_datatile
 import numpy as np
 import cudf
-from numba import cuda
 import pandas as pd
 import bokeh
+import pyarrow as pa
+import dask.dataframe as dd
+import dask_cudf
 from cuxfilter.charts.core.core_chart import BaseChart
 
 
-def test_calc_cumsum_data_tile():
-    df = cudf.DataFrame(
-        {
-            "key": [float(i) for i in range(5)] * 5,
-            "val": [float(i * 2) for i in range(5, 0, -1)] * 5,
-        }
-    )
-    max_s = int(df["key"].max() - df["key"].min()) + 1
-    min_s = int(df["val"].max() - df["val"].min()) + 1
-    df["val_mod"] = ((df["val"] - df["val"].min()) / 1).round().astype("int32")
-    groupby_as_ndarray = cuda.to_device(
-        df.groupby(by=["key", "val_mod"], sort=True, as_index=False)
-        .agg({"val": "count"})
-        .to_pandas()
-        .values.astype(float)
-    )
-
-    result = cuda.to_device(np.zeros(shape=(min_s, max_s)).astype(np.float64))
-
-    assert np.array_equal(
-        groupby_as_ndarray.copy_to_host(),
-        np.array(
-            [
-                [0.0, 8.0, 5.0],
-                [1.0, 6.0, 5.0],
-                [2.0, 4.0, 5.0],
-                [3.0, 2.0, 5.0],
-                [4.0, 0.0, 5.0],
-            ]
-        ),
-    )
-
-    assert np.array_equal(
-        result.copy_to_host(),
-        np.array(
-            [
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-            ]
-        ),
-    )
-
-    gpu_datatile.calc_cumsum_data_tile[64, 64](groupby_as_ndarray, result)
-
-    assert np.array_equal(
-        result.copy_to_host(),
-        np.array(
-            [
-                [0.0, 0.0, 0.0, 0.0, 5.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 5.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 5.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 5.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [5.0, 0.0, 0.0, 0.0, 0.0],
-            ]
-        ),
-    )
-
-    result_np = np.cumsum(result.copy_to_host(), axis=1)
-
-    assert np.array_equal(
-        result_np,
-        np.array(
-            [
-                [0.0, 0.0, 0.0, 0.0, 5.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 0.0, 5.0, 5.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 0.0, 5.0, 5.0, 5.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [0.0, 5.0, 5.0, 5.0, 5.0],
-                [0.0, 0.0, 0.0, 0.0, 0.0],
-                [5.0, 5.0, 5.0, 5.0, 5.0],
-            ]
-        ),
-    )
-
-
 @pytest.mark.parametrize(
     "result, return_format_str, return_format",
     [
@@ -108,7 +22,7 @@ def test_calc_cumsum_data_tile():
         (
             np.array([[0.0, 0.0, 0.0, 0.0, 5.0], [0.0, 0.0, 0.0, 0.0, 0.0]]),
             "arrow",
-            bytes,
+            pa.Buffer,
         ),
         (
             np.array([[0.0, 0.0, 0.0, 0.0, 5.0], [0.0, 0.0, 0.0, 0.0, 0.0]]),
@@ -123,6 +37,21 @@ def test_format_result(result, return_format_str, return_format):
     )
 
 
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int32])
+def test_format_result_arrow_roundtrip(dtype):
+    result = np.arange(10, dtype=dtype).reshape(2, 5)
+    buffer = gpu_datatile.format_result(result, "arrow")
+    result_arrow = gpu_datatile.read_arrow_tensor(buffer)
+
+    assert result_arrow.dtype == dtype
+    assert np.array_equal(result_arrow, result)
+    # the ndarray is a view of the message body, not a copy
+    assert not result_arrow.flags["OWNDATA"]
+    assert buffer.address <= result_arrow.ctypes.data < (
+        buffer.address + buffer.size
+    )
+
+
 def test_calc_data_tile_for_size():
     df = cudf.DataFrame(
         {
@@ -146,6 +75,37 @@ def test_calc_data_tile_for_size():
     result = pd.DataFrame({0: {0: 5.0, 1: 10.0, 2: 15.0, 3: 20.0, 4: 25.0}})
 
     assert return_result.equals(result)
+    # the input frame is not modified
+    assert list(df.columns) == ["key", "val"]
+
+
+@pytest.mark.parametrize(
+    "n_bins, dtype",
+    [(2, np.uint8), (254, np.uint8), (255, np.uint16), (70_000, np.int32)],
+)
+def test_get_bin_ids(n_bins, dtype):
+    df = cudf.DataFrame({"key": [0.0, None, n_bins - 1.0, n_bins, -2.0]})
+
+    bin_ids, _n_bins = gpu_datatile.get_bin_ids(
+        df, "key", 0.0, n_bins - 1.0, 1
+    )
+
+    assert _n_bins == n_bins
+    assert bin_ids.dtype == dtype
+    # null and out of range values are marked with n_bins
+    assert np.array_equal(bin_ids, [0, n_bins, n_bins - 1, n_bins, n_bins])
+    assert list(df.columns) == ["key"]
+
+
+def test_calc_data_tile_for_size_nulls():
+    df = cudf.DataFrame({"key": [0.0, None, 1.0, 1.0, 7.0, 2.0]})
+
+    return_result = gpu_datatile.calc_data_tile_for_size(
+        df, "key", 0.0, 2.0, 1, cumsum=False, return_format="numpy"
+    )
+
+    # null and out of range values are not counted
+    assert np.array_equal(return_result, [1.0, 2.0, 1.0])
 
 
 def test_calc_data_tile():
@@ -231,3 +191,275 @@ def test_calc_data_tile():
     )
 
     assert return_result.equals(result)
+
+
+@pytest.mark.parametrize(
+    "aggregate_fn, result",
+    [
+        ("count", [[2.0, 0.0, 1.0], [0.0, 1.0, 0.0]]),
+        ("sum", [[3.0, 0.0, 4.0], [0.0, 5.0, 0.0]]),
+        ("min", [[1.0, np.nan, 4.0], [np.nan, 5.0, np.nan]]),
+        ("max", [[2.0, np.nan, 4.0], [np.nan, 5.0, np.nan]]),
+    ],
+)
+def test_calc_data_tile_aggregates(aggregate_fn, result):
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 2.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 1.0],
+            "measure": [1.0, 2.0, 4.0, 5.0],
+        }
+    )
+    active_chart, passive_chart = BaseChart(), BaseChart()
+    active_chart.x, active_chart.min_value = "key", 0.0
+    active_chart.max_value, active_chart.stride = 2.0, 1
+
+    passive_chart.x, passive_chart.y = "val", "measure"
+    passive_chart.min_value, passive_chart.max_value = 0.0, 1.0
+    passive_chart.stride = 1
+
+    return_result = gpu_datatile.calc_data_tile(
+        df=df,
+        active_view=active_chart,
+        passive_view=passive_chart,
+        aggregate_fn=aggregate_fn,
+        cumsum=False,
+    )
+
+    assert np.array_equal(
+        return_result.values, np.array(result), equal_nan=True
+    )
+
+
+def test_calc_data_tile_mean():
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 2.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 1.0],
+            "measure": [1.0, 2.0, 4.0, 5.0],
+        }
+    )
+    active_chart, passive_chart = BaseChart(), BaseChart()
+    active_chart.x, active_chart.min_value = "key", 0.0
+    active_chart.max_value, active_chart.stride = 2.0, 1
+
+    passive_chart.x, passive_chart.y = "val", "measure"
+    passive_chart.min_value, passive_chart.max_value = 0.0, 1.0
+    passive_chart.stride = 1
+
+    datatile_sum, datatile_count = gpu_datatile.calc_data_tile(
+        df=df,
+        active_view=active_chart,
+        passive_view=passive_chart,
+        aggregate_fn="mean",
+        cumsum=True,
+    )
+
+    assert np.array_equal(
+        datatile_sum.values, np.array([[3.0, 3.0, 7.0], [0.0, 5.0, 5.0]])
+    )
+    assert np.array_equal(
+        datatile_count.values, np.array([[2.0, 2.0, 3.0], [0.0, 1.0, 1.0]])
+    )
+
+
+def test_calc_data_tile_coo():
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 2.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 1.0],
+            "measure": [1.0, 2.0, 4.0, 5.0],
+        }
+    )
+    active_chart, passive_chart = BaseChart(), BaseChart()
+    active_chart.x, active_chart.min_value = "key", 0.0
+    active_chart.max_value, active_chart.stride = 2.0, 1
+
+    passive_chart.x, passive_chart.y = "val", "measure"
+    passive_chart.min_value, passive_chart.max_value = 0.0, 1.0
+    passive_chart.stride = 1
+
+    passive_ids, active_ids, values, shape = gpu_datatile.calc_data_tile(
+        df=df,
+        active_view=active_chart,
+        passive_view=passive_chart,
+        aggregate_fn="sum",
+        return_format="coo",
+    )
+
+    assert shape == (2, 3)
+    assert list(passive_ids) == [0, 0, 1]
+    assert list(active_ids) == [0, 2, 1]
+    assert list(values) == [3.0, 4.0, 5.0]
+
+
+def test_calc_stacked_data_tiles():
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 2.0, 1.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 1.0, 2.0],
+            "measure": [1.0, 2.0, 4.0, 5.0, None],
+        }
+    )
+    active_bins = gpu_datatile.get_bin_ids(df, "key", 0.0, 2.0, 1)
+    passives = [
+        (gpu_datatile.get_bin_ids(df, "val", 0.0, 1.0, 1), "measure"),
+        (gpu_datatile.get_bin_ids(df, "val", 0.0, 2.0, 1), "measure"),
+        (gpu_datatile.get_bin_ids(df, "measure", 0.0, 5.0, 1), "val"),
+    ]
+    aggregate_fns = ["count", "sum", "mean"]
+
+    results = gpu_datatile.calc_stacked_data_tiles(
+        df,
+        active_bins,
+        [
+            (passive_bins, key, aggregate_fn, True, "pandas")
+            for (passive_bins, key), aggregate_fn in zip(
+                passives, aggregate_fns
+            )
+        ],
+    )
+
+    # same datatiles as one pass per passive chart
+    assert len(results) == 3
+    for (passive_bins, key), aggregate_fn, result in zip(
+        passives, aggregate_fns, results
+    ):
+        passive_chart = BaseChart()
+        passive_chart.x, passive_chart.y = None, key
+        expected = gpu_datatile.calc_data_tile(
+            df,
+            None,
+            passive_chart,
+            aggregate_fn,
+            cumsum=True,
+            active_bins=active_bins,
+            passive_bins=passive_bins,
+        )
+        if aggregate_fn != "mean":
+            result, expected = [result], [expected]
+        for datatile, expected_datatile in zip(result, expected):
+            assert np.array_equal(datatile.values, expected_datatile.values)
+    assert np.array_equal(
+        results[0].values, np.array([[2.0, 2.0, 3.0], [0.0, 1.0, 1.0]])
+    )
+
+
+@pytest.mark.parametrize(
+    "aggregate_fn", ["count", "sum", "mean", "min", "max"]
+)
+@pytest.mark.parametrize("npartitions", [1, 3])
+@pytest.mark.parametrize("backend", ["dask_cudf", "dask"])
+def test_calc_data_tile_partitions(aggregate_fn, npartitions, backend):
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 2.0, 1.0, 2.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+            "measure": [1.0, 2.0, 4.0, 5.0, None, 3.0],
+        }
+    )
+    if backend == "dask_cudf":
+        ddf = dask_cudf.from_cudf(df, npartitions=npartitions)
+    else:
+        ddf = dd.from_pandas(df.to_pandas(), npartitions=npartitions)
+    active_chart, passive_chart = BaseChart(), BaseChart()
+    active_chart.x, active_chart.min_value = "key", 0.0
+    active_chart.max_value, active_chart.stride = 2.0, 1
+
+    passive_chart.x, passive_chart.y = "val", "measure"
+    passive_chart.min_value, passive_chart.max_value = 0.0, 1.0
+    passive_chart.stride = 1
+
+    cumsum = aggregate_fn not in ["min", "max"]
+    results = [
+        gpu_datatile.calc_data_tile(
+            df=data,
+            active_view=active_chart,
+            passive_view=passive_chart,
+            aggregate_fn=aggregate_fn,
+            cumsum=cumsum,
+            return_format="numpy",
+        )
+        for data in [ddf, df]
+    ]
+
+    assert np.array_equal(
+        np.array(results[0]), np.array(results[1]), equal_nan=True
+    )
+    assert list(ddf.columns) == ["key", "val", "measure"]
+
+    datatile_for_size = gpu_datatile.calc_data_tile_for_size(
+        ddf, "key", 0.0, 2.0, 1, return_format="numpy"
+    )
+    assert np.array_equal(datatile_for_size, [2.0, 4.0, 6.0])
+
+
+@pytest.mark.parametrize("partitioned", [False, True])
+def test_calc_data_tile_quantile(partitioned):
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 2.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 1.0],
+            "measure": [0.0, 2.0, 4.0, 8.0],
+        }
+    )
+    if partitioned:
+        df = dask_cudf.from_cudf(df, npartitions=2)
+    active_chart, passive_chart = BaseChart(), BaseChart()
+    active_chart.x, active_chart.min_value = "key", 0.0
+    active_chart.max_value, active_chart.stride = 2.0, 1
+
+    passive_chart.x, passive_chart.y = "val", "measure"
+    passive_chart.min_value, passive_chart.max_value = 0.0, 1.0
+    passive_chart.stride = 1
+
+    sketches, edges = gpu_datatile.calc_data_tile(
+        df=df,
+        active_view=active_chart,
+        passive_view=passive_chart,
+        aggregate_fn="median",
+        cumsum=False,
+        return_format="numpy",
+    )
+
+    assert sketches.shape == (2, 3, len(edges) - 1)
+    assert edges[0] == 0.0 and edges[-1] == 8.0
+    assert np.array_equal(sketches.sum(axis=2), [[2, 0, 1], [0, 1, 0]])
+    # the rows of a cell are counted in the bucket of their value
+    assert sketches[0, 0, 0] == 1 and sketches[1, 1, -1] == 1
+
+
+@pytest.mark.parametrize("partitioned", [False, True])
+def test_calc_data_tile_nunique(partitioned):
+    df = cudf.DataFrame(
+        {
+            "key": [0.0, 0.0, 0.0, 2.0, 1.0],
+            "val": [0.0, 0.0, 0.0, 0.0, 1.0],
+            "measure": [3, 3, 5, None, 8],
+        }
+    )
+    if partitioned:
+        df = dask_cudf.from_cudf(df, npartitions=2)
+    active_chart, passive_chart = BaseChart(), BaseChart()
+    active_chart.x, active_chart.min_value = "key", 0.0
+    active_chart.max_value, active_chart.stride = 2.0, 1
+
+    passive_chart.x, passive_chart.y = "val", "measure"
+    passive_chart.min_value, passive_chart.max_value = 0.0, 1.0
+    passive_chart.stride = 1
+
+    registers = gpu_datatile.calc_data_tile(
+        df=df,
+        active_view=active_chart,
+        passive_view=passive_chart,
+        aggregate_fn="nunique",
+        cumsum=True,
+        return_format="numpy",
+    )
+
+    assert registers.shape == (2, 3, 256)
+    assert registers.dtype == np.uint8
+    # registers are never cumulated, every distinct value sets a register
+    assert np.array_equal(
+        (registers > 0).sum(axis=2), [[2, 0, 0], [0, 1, 0]]
+    )
@@ -1,6 +1,7 @@
 import pytest
 
 from cuxfilter.assets.numba_kernels import gpu_histogram
+from cuxfilter.assets.cudf_utils import get_bin_ids
 import cudf
 import numpy as np
 from numba import cuda
@@ -48,6 +49,22 @@ def test_calc_value_counts(custom_binning, result):
     assert np.array_equal(_result, result)
 
 
+def test_calc_value_counts_bin_ids():
+    x = cudf.Series(np.array(test_arr3 * 50))
+    stride = (x.max() - x.min()) / 8
+    bin_ids = get_bin_ids(
+        cudf.DataFrame({"x": x}), "x", x.min(), x.max(), stride
+    )
+
+    _result, data_points = gpu_histogram.calc_value_counts(
+        x, stride, x.min(), None, custom_binning=True, bin_ids=bin_ids
+    )
+    assert np.array_equal(
+        _result, [[0, 1, 2, 3, 7, 8], [100, 150, 300, 100, 50, 150]]
+    )
+    assert data_points == 6
+
+
 @pytest.mark.parametrize(
     "aggregate_fn, result",
     [
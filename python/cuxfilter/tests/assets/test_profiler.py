@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+import numpy as np
+
+from cuxfilter.assets.profiler import InteractionProfiler, payload_nbytes
+
+
+class Chart:
+    name = "chart"
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+    def reload_chart(self, data):
+        if self.pool is not None:
+            # spans of other threads are part of the open interaction
+            return self.pool.submit(self.format_source_data, data).result()
+        return self.format_source_data(data)
+
+    def format_source_data(self, source_dict):
+        return len(source_dict)
+
+
+def test_payload_nbytes():
+    source = {"x": np.zeros(10), "y": np.zeros(10, dtype=np.int32)}
+    assert payload_nbytes((source,), {"patch_update": True}) == 120
+    assert payload_nbytes((np.zeros(4),), {}) == 32
+
+
+def test_interaction_profiler(tmp_path):
+    profiler = InteractionProfiler(max_interactions=2)
+    chart = Chart(ThreadPoolExecutor(max_workers=1))
+    profiler.instrument(chart, "reload_chart", "reload", chart.name)
+    profiler.instrument(
+        chart, "format_source_data", "model_update", chart.name, True
+    )
+    profiler.instrument(chart, "reload_chart", "reload", chart.name)
+    source = {"x": np.zeros(8)}
+
+    # disabled, nothing is recorded
+    assert chart.reload_chart(source) == 1
+    assert len(profiler.interactions) == 0
+
+    profiler.enabled = True
+    for _ in range(3):
+        assert profiler.run("slider", lambda: chart.reload_chart(source)) == 1
+    # a span without an interaction opens its own
+    chart.format_source_data(source)
+
+    interactions = profiler.get_interactions()
+    assert [record["name"] for record in interactions] == ["slider", "chart"]
+    spans = interactions[0]["spans"]
+    assert [span["phase"] for span in spans] == ["model_update", "reload"]
+    assert spans[0]["thread"] != spans[1]["thread"]
+    assert spans[0]["payload_bytes"] == 64
+    assert interactions[0]["payload_bytes"] == 64
+    assert interactions[0]["duration_ms"] >= spans[1]["duration_ms"]
+
+    summary = {row["phase"]: row for row in profiler.summary()}
+    assert summary["model_update"]["calls"] == 2
+    assert summary["model_update"]["payload_bytes"] == 128
+    assert summary["reload"]["calls"] == 1
+    assert summary["reload"]["payload_bytes"] == 0
+
+    path = str(tmp_path / "profile.json")
+    result = json.loads(profiler.to_json(path, last=1))
+    with open(path) as f:
+        assert json.load(f) == result
+    assert [record["name"] for record in result["interactions"]] == ["chart"]
+
+    profiler.restore()
+    assert "reload_chart" not in chart.__dict__
+    assert "format_source_data" not in chart.__dict__
+
+
+def test_interaction_profiler_self_time():
+    profiler = InteractionProfiler()
+    profiler.enabled = True
+    with profiler.interaction("a"):
+        with profiler.span("reload", "chart"):
+            with profiler.span("render", "chart"):
+                sum(range(10000))
+            # nested interactions are part of the open one
+            with profiler.interaction("b"):
+                pass
+
+    (record,) = profiler.get_interactions()
+    render, reload = record["spans"]
+    assert np.isclose(
+        reload["self_ms"], reload["duration_ms"] - render["duration_ms"]
+    )
+    assert render["self_ms"] == render["duration_ms"]
+
+
+def test_interaction_profiler_run_split():
+    profiler = InteractionProfiler()
+    chart = Chart()
+    profiler.instrument(
+        chart, "format_source_data", "model_update", chart.name, True
+    )
+    profiler.enabled = True
+    source = {"x": np.zeros(8)}
+
+    def compute():
+        with profiler.span("compute", chart.name):
+            return lambda: chart.format_source_data(source)
+
+    apply = profiler.run_split("slider", compute)
+    # the interaction is closed once its apply step ran
+    assert len(profiler.interactions) == 0
+    apply()
+    (interaction,) = profiler.get_interactions()
+    assert interaction["name"] == "slider"
+    assert [span["phase"] for span in interaction["spans"]] == [
+        "compute",
+        "model_update",
+    ]
@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
+
+from cuxfilter.assets.scheduler import InteractionScheduler
+
+
+class Document:
+    """
+    served document stub, next tick callbacks are run by the test
+    """
+
+    session_context = object()
+
+    def __init__(self):
+        self.callbacks = []
+        self.holds = 0
+
+    def add_next_tick_callback(self, callback):
+        self.callbacks.append(callback)
+
+    @contextmanager
+    def hold(self, policy="combine"):
+        self.holds += 1
+        yield
+
+    def run_next_tick(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class Executor:
+    """
+    executor stub, submitted work is run by the test
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append(partial(fn, *args))
+
+    def run(self):
+        jobs, self.jobs = self.jobs, []
+        for job in jobs:
+            job()
+
+
+def event(applied, value):
+    """
+    event computing value, and appending it to applied in its apply step
+    """
+    return lambda: partial(applied.append, value)
+
+
+def test_interaction_scheduler_without_document():
+    scheduler = InteractionScheduler()
+    applied = []
+    scheduler.submit("a", event(applied, 1))
+    scheduler.submit("a", event(applied, 2))
+    scheduler.submit("b", lambda: None)
+    assert applied == [1, 2]
+    assert scheduler.info() == {
+        "submitted": 3,
+        "dropped": 0,
+        "batches": 3,
+        "pending": 0,
+    }
+
+
+def test_interaction_scheduler_latest_wins():
+    docs = [Document(), Document()]
+    executor = Executor()
+    scheduler = InteractionScheduler(executor)
+    applied = []
+
+    for value in [1, 2, 3]:
+        scheduler.submit("a", event(applied, value), docs[0])
+    scheduler.submit("b", event(applied, "b"), docs[0])
+    # the events of each session are queued and computed separately
+    scheduler.submit("a", event(applied, "other"), docs[1])
+    assert len(executor.jobs) == 2
+    assert scheduler.info()["pending"] == 3
+
+    executor.run()
+    assert scheduler.info()["pending"] == 0
+    assert [len(doc.callbacks) for doc in docs] == [1, 1]
+    assert applied == []
+
+    docs[0].run_next_tick()
+    assert applied == [3, "b"]
+    docs[1].run_next_tick()
+    assert applied == [3, "b", "other"]
+    assert [doc.holds for doc in docs] == [1, 1]
+    assert scheduler.info() == {
+        "submitted": 5,
+        "dropped": 2,
+        "batches": 2,
+        "pending": 0,
+    }
+
+
+def test_interaction_scheduler_failures():
+    doc = Document()
+    executor = Executor()
+    scheduler = InteractionScheduler(executor)
+    applied = []
+
+    def fail():
+        raise ValueError()
+
+    # failing compute and apply steps do not prevent the next ones
+    scheduler.submit("a", fail, doc)
+    scheduler.submit("b", lambda: fail, doc)
+    scheduler.submit("c", event(applied, "c"), doc)
+    executor.run()
+    doc.run_next_tick()
+    assert applied == ["c"]
+
+    # events of a document refusing callbacks are dropped
+    def closed(callback):
+        raise RuntimeError("session closed")
+
+    doc.add_next_tick_callback = closed
+    scheduler.submit("a", event(applied, 1), doc)
+    executor.run()
+    assert scheduler.info()["pending"] == 0
+    assert applied == ["c"]
+
+
+def test_interaction_scheduler_compute_off_loop():
+    doc = Document()
+    executor = ThreadPoolExecutor(max_workers=1)
+    scheduler = InteractionScheduler(executor)
+    started, release = threading.Event(), threading.Event()
+    threads = []
+
+    def compute(value, block=False):
+        threads.append(threading.current_thread())
+        started.set()
+        if block:
+            release.wait(10)
+        return lambda: threads.append((value, threading.current_thread()))
+
+    # the loop thread is not blocked while the event is computed, and the
+    # events submitted meanwhile are coalesced
+    scheduler.submit("a", partial(compute, 1, block=True), doc)
+    assert started.wait(10)
+    for value in [2, 3]:
+        scheduler.submit("a", partial(compute, value), doc)
+    assert scheduler.info()["pending"] == 1
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert len(doc.callbacks) == 2
+    doc.run_next_tick()
+    main = threading.current_thread()
+    assert all(thread is not main for thread in threads[:2])
+    assert threads[2:] == [(1, main), (3, main)]
+    assert scheduler.info() == {
+        "submitted": 3,
+        "dropped": 1,
+        "batches": 2,
+        "pending": 0,
+    }
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from cuxfilter.assets.selection import RowSelection
+
+
+@pytest.mark.parametrize("n_selected, bitmask", [(3, False), (500, True)])
+def test_row_selection(n_selected, bitmask):
+    mask = np.zeros(1000, dtype=bool)
+    mask[np.random.default_rng(0).choice(1000, n_selected, False)] = True
+
+    selection = RowSelection.from_mask(mask)
+
+    # row ids for sparse selections, a bitmask otherwise
+    assert (selection.bitmask is not None) == bitmask
+    assert selection.nbytes == (125 if bitmask else 4 * n_selected)
+    assert len(selection) == n_selected
+    np.testing.assert_array_equal(selection.to_mask(), mask)
+    assert repr(selection) != repr(RowSelection.from_mask(mask))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from cuxfilter.assets.spatial import GridIndex, points_in_polygon
+
+
+def test_points_in_polygon():
+    x = np.array([0.5, 1.5, 0.5, np.nan])
+    y = np.array([0.5, 0.5, 1.5, 0.5])
+    # unit square, then an L shape without the (1, 1) corner
+    assert points_in_polygon(x, y, [0, 1, 1, 0], [0, 0, 1, 1]).tolist() == [
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert points_in_polygon(
+        x, y, [0, 2, 2, 1, 1, 0], [0, 0, 1, 1, 2, 2]
+    ).tolist() == [True, True, True, False]
+
+
+@pytest.mark.parametrize("points_per_cell", [1, 4, 32])
+def test_grid_index_query_polygon(points_per_cell):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=5000)
+    y = rng.uniform(-2, 2, size=5000)
+    x[::97] = np.nan
+    index = GridIndex(x, y, points_per_cell)
+
+    for _ in range(10):
+        n = rng.integers(3, 12)
+        center = rng.uniform(-1, 1, size=2)
+        radius = rng.uniform(0.05, 2, size=n)
+        angle = np.sort(rng.uniform(0, 2 * np.pi, size=n))
+        xs = center[0] + radius * np.cos(angle)
+        ys = center[1] + radius * np.sin(angle)
+
+        expected = np.nonzero(points_in_polygon(x, y, xs, ys))[0]
+        np.testing.assert_array_equal(index.query_polygon(xs, ys), expected)
+        np.testing.assert_array_equal(
+            index.query_polygon_mask(xs, ys), points_in_polygon(x, y, xs, ys)
+        )
+
+
+def test_grid_index_degenerate():
+    empty = GridIndex(np.zeros(0), np.zeros(0))
+    assert len(empty.query_polygon([0, 1, 1], [0, 0, 1])) == 0
+
+    # all points on a single location
+    index = GridIndex(np.ones(10), np.ones(10))
+    assert index.query_polygon([0, 2, 2, 0], [0, 0, 2, 2]).tolist() == list(
+        range(10)
+    )
+    # outside the points, and less than 3 vertices
+    assert len(index.query_polygon([3, 4, 4], [3, 3, 4])) == 0
+    assert len(index.query_polygon([0, 2], [0, 2])) == 0
@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 
 from cuxfilter.charts.core.aggregate.core_aggregate import BaseAggregateChart
+from cuxfilter.assets.datatiles import DenseDataTile
 import cuxfilter
 from cuxfilter.layouts import chart_view
 
@@ -48,6 +49,29 @@ class TestBaseAggregateChart:
         assert bb.stride == 1
         assert bb.stride_type == int
 
+    def test_bin_ids(self, monkeypatch):
+        bb = BaseAggregateChart(x="key", data_points=5)
+        bb.initiate_chart(self.dashboard)
+        data = self.dashboard._cuxfilter_df.data
+
+        bin_ids, n_bins = bb.get_bin_ids(data)
+        assert n_bins == 5
+        assert bin_ids.dtype == np.uint8
+        assert np.array_equal(bin_ids, [0, 1, 2, 3, 4])
+        # computed once, and kept outside of the dataframe
+        assert bb.get_bin_ids(data)[0] is bin_ids
+        assert bb.get_bin_ids(data.head(2))[0] is not bin_ids
+        assert list(data.columns) == ["key", "val"]
+
+        # the bin ids of the rows of a registered frame are gathered
+        row_ids = np.array([1, 3], dtype=np.int32)
+        rows = data.iloc[row_ids]
+        bb._bin_id_cache.add_rows(data, rows, row_ids)
+        monkeypatch.setattr(cuxfilter.assets.cudf_utils, "get_bin_ids", None)
+        bin_ids, n_bins = bb.get_bin_ids(rows)
+        assert n_bins == 5
+        assert np.array_equal(bin_ids, [1, 3])
+
     @pytest.mark.parametrize("chart, _chart", [(None, None), (1, 1)])
     def test_view(self, chart, _chart):
         bnac = BaseAggregateChart(x="test_x")
@@ -200,16 +224,30 @@ class TestBaseAggregateChart:
             }
         )
 
-        datatile = pd.DataFrame(
-            {
-                0: {0: 1.0, 1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0},
-                1: {0: 1.0, 1: 1.0, 2: 0.0, 3: 0.0, 4: 0.0},
-                2: {0: 1.0, 1: 1.0, 2: 1.0, 3: 0.0, 4: 0.0},
-                3: {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 0.0},
-                4: {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 1.0},
-            }
+        datatile = DenseDataTile(
+            pd.DataFrame(
+                {
+                    0: {0: 1.0, 1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0},
+                    1: {0: 1.0, 1: 1.0, 2: 0.0, 3: 0.0, 4: 0.0},
+                    2: {0: 1.0, 1: 1.0, 2: 1.0, 3: 0.0, 4: 0.0},
+                    3: {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 0.0},
+                    4: {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 1.0},
+                }
+            ).values,
+            "count",
+            cumsum=True,
+            rows=active_chart.get_datatile_indices(),
+        )
+
+        apply = active_chart.compute_update(
+            "query_chart_by_range", active_chart, query_tuple, datatile
         )
+        # the chart is only reset by the apply step
+        assert self.result == ""
+        apply()
+        assert all(result == self.result)
 
+        self.result = ""
         active_chart.query_chart_by_range(active_chart, query_tuple, datatile)
 
         assert all(result == self.result)
@@ -264,14 +302,19 @@ class TestBaseAggregateChart:
             }
         )
         passive_chart.data_x_axis = "x"
-        datatile = pd.DataFrame(
-            {
-                0: {0: 1.0, 1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0},
-                1: {0: 0.0, 1: 1.0, 2: 0.0, 3: 0.0, 4: 0.0},
-                2: {0: 0.0, 1: 0.0, 2: 1.0, 3: 0.0, 4: 0.0},
-                3: {0: 0.0, 1: 0.0, 2: 0.0, 3: 1.0, 4: 0.0},
-                4: {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0, 4: 1.0},
-            }
+        datatile = DenseDataTile(
+            pd.DataFrame(
+                {
+                    0: {0: 1.0, 1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0},
+                    1: {0: 0.0, 1: 1.0, 2: 0.0, 3: 0.0, 4: 0.0},
+                    2: {0: 0.0, 1: 0.0, 2: 1.0, 3: 0.0, 4: 0.0},
+                    3: {0: 0.0, 1: 0.0, 2: 0.0, 3: 1.0, 4: 0.0},
+                    4: {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0, 4: 1.0},
+                }
+            ).values,
+            "count",
+            cumsum=False,
+            rows=passive_chart.get_datatile_indices(),
         )
 
         passive_chart.query_chart_by_indices(
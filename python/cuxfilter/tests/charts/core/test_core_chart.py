@@ -84,6 +84,21 @@ class TestBaseChart:
         assert bc.apply_mappers() == -1
         assert bc.get_source_y_axis() == []
 
+    def test_compute_update(self):
+        bc = BaseChart()
+        updates = []
+
+        bc.reload_chart = lambda *args: updates.append(("reload", args))
+        bc.reset_chart = lambda *args: updates.append(("reset", args))
+
+        # without a compute step, the whole update is the apply step
+        apply = bc.compute_update("reload_chart", [1, 2], True)
+        apply_reset = bc.compute_update("reset_chart", [3])
+        assert updates == []
+        apply_reset()
+        apply()
+        assert updates == [("reset", ([3],)), ("reload", ([1, 2], True))]
+
     def test_add_event(self):
         bc = BaseChart()
 
@@ -1,5 +1,5 @@
 import pytest
-import pandas as pd
+import numpy as np
 import cudf
 
 import cuxfilter
@@ -7,6 +7,7 @@ from cuxfilter.charts.core.aggregate.core_datasize_indicator import (
     BaseDataSizeIndicator,
 )
 from cuxfilter.charts import bar
+from cuxfilter.assets.datatiles import DenseDataTile
 from cuxfilter.layouts import chart_view
 
 
@@ -76,7 +77,9 @@ class TestBaseDataSizeIndicator:
             self.result = datatile_result
 
         bdsi.reset_chart = reset_chart
-        datatile = pd.DataFrame({0: {0: 1.0, 1: 2.0, 2: 3.0, 3: 4.0, 4: 5.0}})
+        datatile = DenseDataTile(
+            np.array([1.0, 2.0, 3.0, 4.0, 5.0]), "count", cumsum=True
+        )
         bdsi.query_chart_by_range(active_chart, query_tuple, datatile)
 
         assert result == self.result
@@ -102,7 +105,9 @@ class TestBaseDataSizeIndicator:
             self.result = datatile_result
 
         bdsi.reset_chart = reset_chart
-        datatile = pd.DataFrame({0: {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0, 4: 1.0}})
+        datatile = DenseDataTile(
+            np.array([1.0, 1.0, 1.0, 1.0, 1.0]), "count", cumsum=False
+        )
         bdsi.query_chart_by_indices(
             active_chart, old_indices, new_indices, datatile
         )
@@ -1,6 +1,5 @@
 import pytest
 import cudf
-import mock
 
 from cuxfilter.charts.core.non_aggregate.core_graph import BaseGraph
 from cuxfilter.dashboard import DashBoard
@@ -128,22 +127,19 @@ class TestCoreGraph:
         bg.inspect_neighbors = CustomInspectTool(_active=False)
 
         def t_function(nodes, edges=None, patch_update=False):
-            pass
+            self.result = nodes
 
         bg.reload_chart = t_function
 
         class evt:
-            geometry = dict(x=[1, 1, 2], y=[1, 2, 1], type="poly")
+            geometry = dict(
+                x=[0.5, 1.5, 1.5, 0.5], y=[0.5, 0.5, 2.5, 2.5], type="poly"
+            )
             final = True
 
         t = bg.get_selection_geometry_callback(dashboard)
-        with mock.patch("cuspatial.point_in_polygon") as pip:
-
-            pip.return_value = cudf.DataFrame(
-                {"selection": [True, False, True, False]}
-            )
-            t(evt)
-            assert pip.called
+        t(evt)
+        assert self.result.equals(nodes.iloc[[1, 2]])
 
     @pytest.mark.parametrize(
         "x_range, y_range, query, local_dict",
@@ -1,6 +1,5 @@
 import pytest
 import cudf
-import mock
 
 from cuxfilter.charts.core.non_aggregate.core_non_aggregate import (
     BaseNonAggregate,
@@ -116,17 +115,26 @@ class TestCoreNonAggregateChart:
         dashboard = DashBoard(dataframe=DataFrame.from_dataframe(df))
 
         class evt:
-            geometry = dict(x=[1, 1, 2], y=[1, 2, 1], type="poly")
+            geometry = dict(x=[0, 3, 3, 0], y=[3.5, 3.5, 6, 6], type="poly")
             final = True
 
         t = bnac.get_selection_geometry_callback(dashboard)
-        with mock.patch("cuspatial.point_in_polygon") as pip:
+        t(evt)
 
-            pip.return_value = cudf.DataFrame(
-                {"selection": [True, False, True]}
-            )
-            t(evt)
-            assert pip.called
+        # the lasso is kept as selected row ids in the filter state
+        assert len(bnac.selection) == 2
+        assert self.result.equals(df.iloc[[1, 2]])
+        assert dashboard._filter(include_charts=[bnac]).equals(
+            df.iloc[[1, 2]]
+        )
+
+        # the selection is not a query clause
+        dashboard._charts[bnac.name] = bnac
+        dashboard._compute_query_dict(bnac)
+        assert dashboard._query_str_dict == {}
+        assert dashboard._generate_query_str() == ""
+        assert dashboard._selection_dict == {bnac.name: bnac.selection}
+        assert dashboard._filter().equals(df.iloc[[1, 2]])
 
     @pytest.mark.parametrize(
         "data, _data",
@@ -192,6 +200,25 @@ class TestCoreNonAggregateChart:
                 dashboard._query_local_variables_dict[key] == local_dict[key]
             )
 
+    @pytest.mark.parametrize(
+        "x_range, y_range, query",
+        [
+            ((1, 2), (3, 4), "1<=x<=2 and 3<=y<=4"),
+            ((0, 2), (4, 5), "0<=x<=2 and 4<=y<=5"),
+        ],
+    )
+    def test_compute_filter_mask(self, x_range, y_range, query):
+        bnac = BaseNonAggregate()
+        bnac.x = "x"
+        bnac.y = "y"
+        df = cudf.DataFrame({"x": [1, 2, 2], "y": [3, 4, 5]})
+
+        assert bnac.compute_filter_mask(df) is None
+
+        bnac.x_range = x_range
+        bnac.y_range = y_range
+        assert df[bnac.compute_filter_mask(df)].equals(df.query(query))
+
     @pytest.mark.parametrize(
         "add_interaction, reset_event, event_1, event_2",
         [
@@ -1,6 +1,8 @@
+import panel as pn
 import pytest
+from types import SimpleNamespace
 
-from cuxfilter.charts.core.core_widget import BaseWidget
+from cuxfilter.charts.core.core_widget import BaseWidget, is_slider_drag
 from cuxfilter.layouts import chart_view
 
 
@@ -50,3 +52,22 @@ class TestBaseWidget:
         bw.add_event(ButtonClick, callback)
 
         assert ButtonClick.event_name in bw.chart.subscribed_events
+
+
+@pytest.mark.parametrize(
+    "name, new, value_throttled, result",
+    [
+        # dragged: the value is ahead of value_throttled
+        ("value", (1, 3), (0, 4), True),
+        # set programmatically, or released
+        ("value", (1, 3), (1, 3), False),
+        ("value_throttled", (1, 3), (1, 3), False),
+    ],
+)
+def test_is_slider_drag(name, new, value_throttled, result):
+    slider = pn.widgets.RangeSlider(start=0, end=4, value=new)
+    slider.value_throttled = value_throttled
+    event = SimpleNamespace(name=name, new=new)
+
+    assert is_slider_drag(slider, event) is result
+    assert is_slider_drag(pn.widgets.Select(), event) is False
@@ -0,0 +1,67 @@
+import panel as pn
+
+# module under test
+import cuxfilter.layouts.visibility as m
+
+
+def _chart():
+    return pn.pane.Markdown("chart", width=100, height=100)
+
+
+def test_is_visible_hidden_or_zero_size():
+    chart = _chart()
+    assert m.is_visible(chart)
+
+    chart.visible = False
+    assert not m.is_visible(chart)
+
+    assert not m.is_visible(pn.pane.Markdown("chart", width=0))
+
+
+def test_is_visible_inactive_tab():
+    chart, other = _chart(), _chart()
+    tabs = pn.Tabs(("a", other), ("b", pn.Column(chart)))
+    roots = [pn.Column(tabs)]
+
+    assert m.get_layout_path(chart, roots) is not None
+    assert not m.is_visible(chart, roots)
+    assert m.is_visible(other, roots)
+
+    tabs.active = 1
+    assert m.is_visible(chart, roots)
+    assert not m.is_visible(other, roots)
+
+
+def test_is_visible_collapsed_card():
+    chart = _chart()
+    card = pn.Card(chart, collapsed=True)
+    roots = [pn.Row(card)]
+
+    assert not m.is_visible(chart, roots)
+
+    card.collapsed = False
+    assert m.is_visible(chart, roots)
+
+    card.visible = False
+    assert not m.is_visible(chart, roots)
+
+
+def test_is_visible_not_in_roots():
+    assert m.is_visible(_chart(), [pn.Column(_chart())])
+
+
+def test_watch_visibility():
+    chart = _chart()
+    tabs = pn.Tabs(("a", _chart()), ("b", chart))
+    calls = []
+    remove = m.watch_visibility(chart, [tabs], lambda: calls.append(1))
+
+    tabs.active = 1
+    assert calls == [1]
+    chart.visible = False
+    assert calls == [1, 1]
+
+    remove()
+    tabs.active = 0
+    chart.visible = True
+    assert calls == [1, 1]
@@ -1,10 +1,13 @@
+import json
 import pytest
 
 import cuxfilter
 from cuxfilter.charts import bokeh
+from cuxfilter.assets.selection import RowSelection
 import cudf
 import pandas as pd
 import numpy as np
+import threading
 
 
 class TestDashBoard:
@@ -25,7 +28,7 @@ class TestDashBoard:
         assert self.dashboard._theme == cuxfilter.themes.light
         assert self.dashboard.data_size_widget is True
         assert list(self.dashboard._charts.keys()) == ["_datasize_indicator"]
-        assert self.dashboard._data_tiles == {}
+        assert len(self.dashboard._data_tiles) == 0
         assert self.dashboard._query_str_dict == {}
         assert self.dashboard._active_view == ""
 
@@ -64,6 +67,274 @@ class TestDashBoard:
 
         assert query_res.to_string() == result
 
+    def test_filter(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.bar("key", data_points=5)
+        bac1 = bokeh.bar("val", data_points=5)
+        dashboard = cux_df.dashboard(charts=[bac, bac1])
+
+        assert dashboard._filter() is dashboard._cuxfilter_df.data
+
+        bac.filter_widget.value = (1, 3)
+        bac1.filter_widget.value = (12, 14)
+        for chart in [bac, bac1]:
+            chart.compute_query_dict(
+                dashboard._query_str_dict,
+                dashboard._query_local_variables_dict,
+            )
+        assert dashboard._filter().equals(
+            df.query(
+                dashboard._generate_query_str(),
+                local_dict=dashboard._query_local_variables_dict,
+            )
+        )
+        assert dashboard._filter().equals(df.query("key == 2 or key == 3"))
+        assert dashboard._filter(ignore_chart=bac).equals(
+            df.query("12 <= val <= 14")
+        )
+
+        # masks are cached until the selection of the chart changes
+        mask = dashboard._filter_masks[bac.name][2]
+        dashboard._filter(ignore_chart=bac1)
+        assert dashboard._filter_masks[bac.name][2] is mask
+        bac.filter_widget.value = (0, 2)
+        bac.compute_query_dict(
+            dashboard._query_str_dict, dashboard._query_local_variables_dict
+        )
+        assert dashboard._filter().equals(df.query("key == 2"))
+
+    def test_filter_bin_ids(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.bar("key", data_points=5)
+        bac1 = bokeh.bar("val", data_points=5)
+        dashboard = cux_df.dashboard(charts=[bac, bac1])
+        bac.filter_widget.value = (1, 3)
+        dashboard._compute_query_dict(bac)
+
+        # the bin ids of the filtered rows are gathered from the bin ids of
+        # the dataframe of the dashboard
+        data = dashboard._filter()
+        row_ids = dashboard._get_bin_id_cache().get_row_ids(data)
+        assert np.array_equal(row_ids, [1, 2, 3])
+        bin_ids, n_bins = bac1.get_bin_ids(data)
+        assert n_bins == 5
+        assert np.array_equal(bin_ids, [1, 2, 3])
+        assert bac1._bin_id_cache is dashboard._get_bin_id_cache()
+
+    def test_filter_cache(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.bar("key", data_points=5)
+        bac1 = bokeh.bar("val", data_points=5)
+        dashboard = cux_df.dashboard(charts=[bac, bac1])
+        bac.filter_widget.value = (1, 3)
+        bac.compute_query_dict(
+            dashboard._query_str_dict, dashboard._query_local_variables_dict
+        )
+
+        result = dashboard._filter(ignore_chart=bac1)
+        assert dashboard.filter_cache_info()["misses"] == 1
+        # the same filter state is served from the cached row ids
+        assert dashboard._filter(ignore_chart=bac1).equals(result)
+        assert dashboard._filter().equals(result)
+        assert dashboard.filter_cache_info()["hits"] == 2
+        assert dashboard.filter_cache_info()["entries"] == 1
+
+        # the cache is invalidated when the data changes
+        dashboard._cuxfilter_df.data = df.iloc[::-1]
+        assert dashboard._filter().equals(df.query("1 <= key <= 3")[::-1])
+        assert dashboard.filter_cache_info()["entries"] == 1
+
+    def test_reload_charts(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.bar("key", data_points=5)
+        bac1 = bokeh.bar("val", data_points=5)
+        dashboard = cux_df.dashboard(
+            charts=[bac, bac1], data_size_widget=False
+        )
+        reloads = []
+
+        def reload_fn(chart):
+            def reload_chart(data, patch_update=False):
+                reloads.append((chart.name, len(data)))
+
+            return reload_chart
+
+        for chart in [bac, bac1]:
+            chart.reload_chart = reload_fn(chart)
+
+        dashboard._reload_charts()
+        assert reloads == [(bac.name, 5), (bac1.name, 5)]
+        # charts whose filter state did not change are not reloaded
+        dashboard._reload_charts()
+        assert len(reloads) == 2
+
+        bac.filter_widget.value = (1, 3)
+        bac.compute_query_dict(
+            dashboard._query_str_dict, dashboard._query_local_variables_dict
+        )
+        reloads.clear()
+        # reloads of hidden charts are deferred until they are shown
+        bac1.chart.visible = False
+        dashboard._reload_charts()
+        assert reloads == [(bac.name, 3)]
+        bac1.chart.visible = True
+        dashboard._reload_deferred_charts()
+        assert reloads == [(bac.name, 3), (bac1.name, 3)]
+        assert dashboard._deferred_reloads == {}
+
+    def test_update_charts(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        charts = [
+            bokeh.bar("key", data_points=5),
+            bokeh.bar("val", data_points=5),
+            bokeh.line("key", data_points=5),
+            bokeh.line("val", data_points=5),
+        ]
+        dashboard = cux_df.dashboard(
+            charts=charts, data_size_widget=False, refresh_workers=4
+        )
+        applied = []
+
+        def format_fn(chart):
+            def format_source_data(source_dict, patch_update=False):
+                applied.append((chart.name, threading.current_thread()))
+
+            return format_source_data
+
+        for chart in charts:
+            chart.format_source_data = format_fn(chart)
+
+        dashboard._reload_charts()
+        # sources are computed in the refresh pool, and the model changes
+        # applied on the calling thread in chart order
+        assert applied == [
+            (chart.name, threading.current_thread()) for chart in charts
+        ]
+
+    def test_update_charts_concurrent(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        charts = [
+            bokeh.bar("key", data_points=5),
+            bokeh.bar("val", data_points=5),
+            bokeh.line("key", data_points=5),
+        ]
+        dashboard = cux_df.dashboard(
+            charts=charts, data_size_widget=False, refresh_workers=4
+        )
+        computed = []
+        applied = []
+
+        def compute_fn(chart):
+            compute_source = chart.compute_source
+
+            def compute(data, patch_update=False):
+                computed.append((chart.name, threading.current_thread()))
+                if chart is charts[1] and len(data) == 1:
+                    raise ValueError("failed update")
+                return compute_source(data, patch_update)
+
+            return compute
+
+        def format_fn(chart):
+            def format_source_data(source_dict, patch_update=False):
+                applied.append((chart.name, threading.current_thread()))
+
+            return format_source_data
+
+        for chart in charts:
+            chart.compute_source = compute_fn(chart)
+            chart.format_source_data = format_fn(chart)
+
+        threads = [
+            threading.Thread(
+                target=dashboard._reload_charts, kwargs={"data": df[:n]}
+            )
+            for n in [2, 5]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # overlapping refreshes run one after the other, each applying
+        # the changes of all the charts on its own thread, in order
+        assert len(applied) == 6
+        first, second = applied[:3], applied[3:]
+        for refresh in [first, second]:
+            assert [name for name, _ in refresh] == [c.name for c in charts]
+            assert len({thread for _, thread in refresh}) == 1
+        assert first[0][1] is not second[0][1]
+        # the compute steps ran in the refresh pool
+        assert all(
+            thread.name.startswith("cuxfilter-refresh")
+            for _, thread in computed
+        )
+
+        # a failed update is raised once all the compute steps are done,
+        # and leaves the charts as they were
+        computed.clear()
+        applied.clear()
+        with pytest.raises(ValueError):
+            dashboard._reload_charts(data=df[:1])
+        assert len(computed) == 3
+        assert applied == [(charts[0].name, threading.current_thread())]
+        for chart in charts:
+            assert "reload_chart" not in chart.__dict__
+            assert "reset_chart" not in chart.__dict__
+        dashboard._reload_charts(data=df)
+        assert len(applied) == 4
+
+    def test_filter_by_range(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.bar("key", data_points=5)
+        bac1 = bokeh.bar("val", data_points=5)
+        dashboard = cux_df.dashboard(charts=[bac, bac1])
+
+        bac.filter_widget.value = (1, 3)
+        assert dashboard._filter_by_range(bac, (1, 3)).equals(
+            df.query("1 <= key <= 3")
+        )
+        # the indexed range of bac applies while it is the filter of bac
+        dashboard._compute_query_dict(bac)
+        assert dashboard._filter_by_range(bac1, (12, 14)).equals(
+            df.query("key == 2 or key == 3")
+        )
+        # any other filter of bac applies as the mask of the index
+        bac.filter_widget.value = (0, 2)
+        dashboard._compute_query_dict(bac)
+        assert dashboard._filter_by_range(bac1, (12, 14)).equals(
+            df.query("key == 2")
+        )
+        bac.filter_widget.value = (0, 4)
+        dashboard._compute_query_dict(bac)
+        assert dashboard._filter_by_range(bac1, (12, 14)).equals(
+            df.query("12 <= val <= 14")
+        )
+        index = dashboard._crossfilter[1]
+        assert sorted(index.dimensions) == sorted([bac.name, bac1.name])
+        assert index.n_selected == 3
+
     @pytest.mark.parametrize(
         "query_dict, query_str",
         [({"col_1_chart": "6<=col_1<=9"}, "6<=col_1<=9"), ({}, "")],
@@ -102,6 +373,92 @@ class TestDashBoard:
 
         assert dashboard.export().to_string() == result
 
+    @pytest.mark.parametrize("background", [False, True])
+    def test_export_file(self, tmp_path, background):
+        dashboard = self.cux_df.dashboard(charts=[], title="test_title")
+        bac = bokeh.bar("key")
+        bac.chart_type = "chart_1"
+        dashboard.add_charts([bac])
+        bac.filter_widget.value = (1, 3)
+        dashboard._active_view = bac.name
+        path = str(tmp_path / "export.parquet")
+        progress = []
+
+        n_rows = dashboard.export(
+            path,
+            columns=["val"],
+            chunk_rows=2,
+            progress=lambda *args: progress.append(args),
+            background=background,
+        )
+        if background:
+            n_rows = n_rows.result()
+
+        assert n_rows == 3
+        assert progress == [(2, 3), (3, 3)]
+        assert cudf.read_parquet(path).equals(
+            cudf.DataFrame({"val": [11.0, 12.0, 13.0]})
+        )
+        with pytest.raises(ValueError):
+            dashboard.export(path, format="csv")
+
+    def test_compute_interaction(self):
+        bac = bokeh.bar("key", data_points=5)
+        dashboard = self.cux_df.dashboard(charts=[bac], data_size_widget=False)
+        applied = []
+        bac.format_source_data = lambda *args: applied.append(args)
+
+        # the models are updated in the apply step of the interaction
+        apply = dashboard._compute_interaction(
+            lambda: dashboard._reload_charts(data=self.cux_df.data)
+        )
+        assert applied == []
+        apply()
+        assert len(applied) == 1
+
+    def test_profile(self, tmp_path):
+        bac = bokeh.bar("key", data_points=5)
+        bac1 = bokeh.bar("val", data_points=5)
+        dashboard = self.cux_df.dashboard(
+            charts=[bac, bac1], data_size_widget=False
+        )
+        dashboard.enable_profiling(max_interactions=10)
+        bac.filter_widget.value = (1, 3)
+        dashboard._query_str_dict[bac.name] = "@key_min <= key <= @key_max"
+        dashboard._schedule(
+            bac, lambda: dashboard._reload_charts(ignore_cols=[bac.name])
+        )
+        path = str(tmp_path / "profile.json")
+        table = dashboard.profile(path=path)
+
+        table = table.fillna({"chart": ""})
+        rows = {(row.chart, row.phase): row for row in table.itertuples()}
+        # the reload of bac1 is split in its compute step and the model
+        # update of its apply step, both recorded in the interaction
+        assert set(rows) == {
+            ("", "query"),
+            (bac1.name, "compute"),
+            (bac1.name, "model_update"),
+        }
+        assert rows[(bac1.name, "compute")].calls == 1
+        assert rows[(bac1.name, "model_update")].payload_bytes > 0
+        with open(path) as f:
+            (interaction,) = json.load(f)["interactions"]
+        assert interaction["name"] == bac.name
+
+        # DashBoard._query is reported under its own name
+        dashboard._query(dashboard._generate_query_str())
+        table = dashboard.profile(last=1).fillna({"chart": ""})
+        assert set(zip(table.chart, table.phase)) == {
+            ("", "_query"),
+            ("", "query"),
+        }
+
+        dashboard.disable_profiling()
+        assert "reload_chart" not in bac1.__dict__
+        dashboard._reload_charts()
+        assert len(dashboard.profile()) == 3
+
     # unit tests for datatile and query functions are already
     # present in core_aggregate and core_non_aggregate test files
 
@@ -144,13 +501,139 @@ class TestDashBoard:
         if result is None:
             assert dashboard._data_tiles[passive_view] is result
         else:
-            assert dashboard._data_tiles[passive_view].equals(result)
+            assert np.array_equal(
+                dashboard._data_tiles[passive_view].to_numpy(), result.values
+            )
 
         assert (
             dashboard._charts[dashboard._active_view].datatile_loaded_state
             is True
         )
 
+    def test_calc_data_tiles_cache(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.line("key", "val")
+        bac1 = bokeh.bar("val")
+        dashboard = cux_df.dashboard(
+            charts=[bac, bac1],
+            title="test_title",
+            layout=cuxfilter.layouts.double_feature,
+        )
+        dashboard._active_view = bac.name
+        dashboard._calc_data_tiles()
+        datatile = dashboard._data_tiles[bac1.name]
+        dashboard._calc_data_tiles()
+
+        assert dashboard._data_tiles[bac1.name] is datatile
+        assert dashboard.datatile_cache_info()["hits"] == 2
+        assert dashboard.datatile_cache_info()["misses"] == 2
+
+        # a different filter state is a cache miss, keyed like the filter
+        # cache
+        bac1.filter_widget.value = (10, 12)
+        dashboard._compute_query_dict(bac1)
+        dashboard._calc_data_tiles()
+        assert dashboard.datatile_cache_info()["misses"] == 4
+        filter_state = dashboard._get_filter_state(ignore_chart=bac)
+        assert [state[0] for state in filter_state] == [bac1.name]
+        cache_key = dashboard._datatile_cache_key(bac1, filter_state, True)
+        assert (
+            dashboard._data_tiles.get_cached(cache_key)
+            is dashboard._data_tiles[bac1.name]
+        )
+
+        dashboard._reinit_all_charts()
+        assert dashboard.datatile_cache_info()["entries"] == 0
+
+    def test_calc_data_tiles_store(self, tmp_path):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        datatiles = []
+        for _ in range(2):
+            bac = bokeh.line("key", "val")
+            bac1 = bokeh.bar("val")
+            dashboard = cux_df.dashboard(
+                charts=[bac, bac1], datatile_store=str(tmp_path)
+            )
+            dashboard._active_view = bac.name
+            dashboard._calc_data_tiles()
+            # datatiles are written in the background
+            dashboard._datatile_store.flush()
+            datatiles.append(dashboard._data_tiles[bac1.name])
+
+        # the second dashboard loads the datatiles written by the first one
+        store_info = dashboard.datatile_cache_info()["store"]
+        assert store_info["hits"] == 2
+        assert store_info["writes"] == 0
+        assert np.array_equal(
+            datatiles[0].to_numpy(), datatiles[1].to_numpy()
+        )
+
+        # states with a row selection are not persisted
+        bac1.selection = RowSelection.from_row_ids(np.array([1, 2]), len(df))
+        dashboard._compute_query_dict(bac1)
+        cache_key = dashboard._datatile_cache_key(
+            bac1, dashboard._get_filter_state(ignore_chart=bac), True
+        )
+        assert dashboard._datatile_store_key(bac1, cache_key) is None
+
+    def test_calc_data_tiles_memory_limit(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.line("key", "val")
+        bac1 = bokeh.bar("val")
+        dashboard = cux_df.dashboard(
+            charts=[bac, bac1], datatile_memory_limit=1
+        )
+        dashboard._active_view = bac.name
+        dashboard._calc_data_tiles()
+
+        # only the most recently built datatile is kept within the limit
+        info = dashboard.datatile_memory_info()
+        assert info["evicted"] == ["_datasize_indicator"]
+        assert info["charts"][bac1.name]["bytes"] > 0
+
+        # evicted datatiles are rebuilt when their chart is queried, which
+        # evicts the datatile of the previously queried chart
+        dashboard._query_datatiles_by_range((1, 2))
+        info = dashboard.datatile_memory_info()
+        assert info["rebuilds"] == 2
+        assert info["evicted"] == ["_datasize_indicator"]
+
+    def test_calc_data_tiles_nunique_fallback(self):
+        df = cudf.DataFrame(
+            {"key": [0, 1, 2, 3, 4], "val": [float(i + 10) for i in range(5)]}
+        )
+        cux_df = cuxfilter.DataFrame.from_dataframe(df)
+        bac = bokeh.line("key", "val")
+        bac1 = bokeh.bar("val", "key", aggregate_fn="nunique")
+        dashboard = cux_df.dashboard(
+            charts=[bac, bac1], datatile_memory_limit=1000
+        )
+        dashboard._active_view = bac.name
+        dashboard._calc_data_tiles()
+
+        # 5 x 5 cells of 256 registers do not fit in 1000 bytes, bac1 is
+        # updated from the filtered data instead
+        assert bac1.name in dashboard._datatile_fallbacks
+        assert dashboard._data_tiles[bac1.name] is None
+
+        dashboard._query_datatiles_by_range((2, 4))
+        assert all(bac1.source.data["top"] == [0, 0, 1, 1, 1])
+        # a crossfilter group of the index, updated with the rows whose
+        # selection changes
+        index = dashboard._crossfilter[1]
+        assert [name[0] for name in index.groups] == [bac1.name]
+        dashboard._query_datatiles_by_range((0, 1))
+        assert all(bac1.source.data["top"] == [1, 1, 0, 0, 0])
+
     @pytest.mark.parametrize(
         "query_tuple, result",
         [
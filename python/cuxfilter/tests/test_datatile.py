@@ -1,10 +1,16 @@
 import pytest
 
-from cuxfilter.datatile import DataTile
+from cuxfilter.datatile import DataTile, calc_data_tiles
+from cuxfilter.assets.datatiles import (
+    DataTilePyramid,
+    DenseDataTile,
+    SparseDataTile,
+)
 from cuxfilter.charts import bokeh
 import cuxfilter
 import cudf
 import pandas as pd
+import numpy as np
 
 
 class TestDataTile:
@@ -71,3 +77,73 @@ class TestDataTile:
             }
         )
         assert data_tile._calc_2d_data_tile(self.df).equals(result)
+
+    def test_calc_2d_data_tile_array(self):
+        data_tile = DataTile(
+            active_chart=self.bac, passive_chart=self.bac1, dtype="array"
+        )
+        result = data_tile._calc_2d_data_tile(self.df)
+
+        assert isinstance(result, DenseDataTile)
+        assert result.data.dtype == np.int32
+        assert np.array_equal(
+            result.to_numpy(),
+            DataTile(self.bac, self.bac1)._calc_2d_data_tile(self.df).values,
+        )
+        assert np.array_equal(
+            result.query_range(1, 3), [0.0, 1.0, 1.0, 1.0, 0.0]
+        )
+
+    def test_calc_2d_data_tile_sparse(self, monkeypatch):
+        monkeypatch.setattr(
+            cuxfilter.datatile, "SPARSE_DATATILE_MIN_CELLS", 0
+        )
+        dense = DataTile(self.bac, self.bac1, dtype="array", sparse_density=0)
+        sparse = DataTile(
+            self.bac, self.bac1, dtype="array", sparse_density=0.5
+        )
+        dense_result = dense._calc_2d_data_tile(self.df)
+        sparse_result = sparse._calc_2d_data_tile(self.df)
+
+        assert isinstance(dense_result, DenseDataTile)
+        assert isinstance(sparse_result, SparseDataTile)
+        assert sparse_result.nnz == 5
+        assert np.array_equal(
+            sparse_result.to_numpy(), dense_result.to_numpy()
+        )
+        assert np.array_equal(
+            sparse_result.query_range(1, 3), dense_result.query_range(1, 3)
+        )
+
+    def test_calc_2d_data_tile_pyramid(self, monkeypatch):
+        data_tile = DataTile(self.bac, self.bac1, dtype="array", pyramid=True)
+        # 5 active bins, below PYRAMID_MIN_BINS
+        assert isinstance(
+            data_tile._calc_2d_data_tile(self.df), DenseDataTile
+        )
+
+        monkeypatch.setattr(cuxfilter.datatile, "PYRAMID_MIN_BINS", 2)
+        result = data_tile._calc_2d_data_tile(self.df)
+
+        assert isinstance(result, DataTilePyramid)
+        assert [level.n_bins for level in result.levels] == [5, 3, 2]
+        assert np.array_equal(
+            result.query_range(1, 3), [0.0, 1.0, 1.0, 1.0, 0.0]
+        )
+
+    def test_calc_data_tiles(self):
+        df = self.df.copy()
+        datasize_chart = self.dashboard._charts["_datasize_indicator"]
+        result = calc_data_tiles(
+            df, self.bac, [self.bac1, datasize_chart], cumsum=True
+        )
+
+        assert list(result.keys()) == [self.bac1.name, datasize_chart.name]
+        assert result[self.bac1.name].equals(
+            DataTile(self.bac, self.bac1)._calc_2d_data_tile(self.df)
+        )
+        assert result[datasize_chart.name].equals(
+            pd.DataFrame({0: {0: 1.0, 1: 2.0, 2: 3.0, 3: 4.0, 4: 5.0}})
+        )
+        # the dataframe is not modified while computing the datatiles
+        assert list(df.columns) == ["key", "val"]